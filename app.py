@@ -2,29 +2,244 @@
 Web interface for ATP Finals tennis tournament
 Flask application for tournament management
 """
-from flask import Flask, render_template, jsonify, request, session
+from flask import Flask, g, render_template, jsonify, request, session, url_for
+from werkzeug.middleware.proxy_fix import ProxyFix
 from tennis_tournament import Player, Group, Tournament, ScheduledMatch
+from court_dispatcher import CourtDispatcher, parse_time
+from result_graph import ResultGraph
+from schedule_editor import MIN_REST_MINUTES, ScheduleConflict, ScheduleEditor
 from players_database import PlayerDatabase
+import notifications
+from rate_limiter import RateLimiter, RevisionCache, parse_budgets
+import serialization
+from tournament_state import (
+    ChangeLog, PlayerMatchIndex, SectionCache, find_match_id, iter_matches, player_ids,
+    serialize_groups, serialize_match, serialize_state
+)
+from functools import lru_cache, wraps
+import hashlib
 import os
+import sys
+import threading
+import time
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+# Compressed responses are cached by compression_cache_key() (defined below)
+serialization.init_app(app, cache_key=lambda: compression_cache_key())
+
+# Reverse proxies in front of the app (e.g. 1 on Render), so request.remote_addr
+# is the client's address from X-Forwarded-For
+PROXY_HOPS = int(os.environ.get('PROXY_HOPS', 0))
+if PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_HOPS)
 
 # Global tournament (shared by all users)
 global_tournament = None
 
-# Player database
+# Tournament revision, bumped on every successful mutation
+# (starts from the clock so revisions keep growing across restarts)
+tournament_revision = int(time.time() * 1000)
+
+# What changed in recent revisions (for delta sync of reconnecting clients)
+change_log = ChangeLog(tournament_revision)
+
+# Live court dispatcher of the current tournament (created on first use)
+court_dispatcher = None
+
+# Conflict-checking schedule editor of the current tournament (created on first use)
+schedule_editor = None
+
+# Result dependency graph of the current tournament (created on first use)
+result_graph = None
+
+# Player -> matches index of the current tournament (created on first use)
+player_index = None
+
+# Cached parts of the current tournament for the granular read API (created on first use)
+section_cache = None
+
+# Serializes tournament mutations against readers on other threads (ASGI mode)
+tournament_lock = threading.RLock()
+
+# Callbacks invoked with the new revision after every mutation
+_change_listeners = []
+
+# Player database (loaded once; under gunicorn --preload in the master, and
+# shared copy-on-write with the workers)
 player_db = PlayerDatabase()
 
+# Per-client rate limits, e.g. "tournament_info=2/20,default=10/50" or "off".
+# Created at import, so with a preloading server the workers share the buckets
+RATE_LIMITS = os.environ.get('RATE_LIMITS', '')
+rate_limiter = None if RATE_LIMITS == 'off' else RateLimiter(parse_budgets(RATE_LIMITS))
+
+# Reads whose response depends only on the tournament revision, the query
+# and the admin flag: answered from the revision's cache when a client is over
+# budget, and compressed once per revision
+REVISION_ENDPOINTS = {
+    'tournament_info', 'tournament_schedule', 'tournament_changes', 'final_results',
+    'get_group', 'get_playoffs', 'get_matches'
+}
+shed_cache = RevisionCache()
+
+
+@app.before_request
+def remember_revision():
+    """Notes the revision a request started at (responses are at least this fresh)"""
+    g.revision = tournament_revision
+
+
+def compression_cache_key():
+    """Key of a response in the compression cache (None for other than revision reads)"""
+    if request.endpoint in REVISION_ENDPOINTS and 'revision' in g:
+        return (request.full_path, is_admin(), g.revision)
+    return None
+
+
+@app.before_request
+def limit_rate():
+    """Sheds anonymous requests over budget (admin requests are never limited)"""
+    if rate_limiter is None or request.endpoint == 'static' or is_admin():
+        return None
+
+    wait = rate_limiter.check(request.remote_addr or '', request.endpoint)
+    if not wait:
+        return None
+
+    if request.method == 'GET' and request.endpoint in REVISION_ENDPOINTS:
+        cached = shed_cache.get(request.full_path, g.revision)
+        if cached is not None:
+            g.shed = True
+            body, mimetype = cached
+            return app.response_class(body, mimetype=mimetype)
+
+    response = jsonify({'error': 'Too many requests'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(int(min(wait, 3600)) + 1)
+    return response
+
+
+@app.after_request
+def cache_sheddable_read(response):
+    """Keeps anonymous reads of the current revision for clients over budget"""
+    if (rate_limiter is not None and not g.get('shed') and request.method == 'GET'
+            and response.status_code == 200 and request.endpoint in REVISION_ENDPOINTS
+            and not is_admin()):
+        shed_cache.put(request.full_path, g.revision, response.get_data(), response.mimetype)
+    return response
+
+
+@app.before_request
+def sync_player_registry():
+    """Picks up registry changes written by other workers (one stat() per request)"""
+    player_db.refresh_if_stale()
+
+# Directory for the static export of the public view (disabled if not set)
+STATIC_EXPORT_DIR = os.environ.get('STATIC_EXPORT_DIR')
+_static_export_worker = None
+
+# Notification transports, e.g. "log:notifications.log" (disabled if not set)
+NOTIFY_TRANSPORTS = os.environ.get('NOTIFY_TRANSPORTS')
+NOTIFY_QUEUE = os.environ.get('NOTIFY_QUEUE', 'notifications.sqlite3')
+# Parsed at import, so a bad setting stops the app at startup
+notification_transports = notifications.parse_transports(NOTIFY_TRANSPORTS or '')
+_notification_worker = None
+
+# Directory of the columnar archive of completed tournaments
+ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', 'archive')
+_match_archive = None
+
+# Box-league ladder file (the ladder runs between tournaments)
+LADDER_FILE = os.environ.get('LADDER_FILE', 'box_league.json')
+_box_league = None
+
+# Minimum rest between two matches of a player when the schedule is edited
+# (0 allows back-to-back matches)
+SCHEDULE_MIN_REST = int(os.environ.get('SCHEDULE_MIN_REST', MIN_REST_MINUTES))
+
 # Admin password (change to your own!)
 ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'tennis2024')
 
+# Static files precached by the service worker
+PRECACHED_ASSETS = ['css/style.css', 'js/app.js', 'manifest.json']
+
+
+@lru_cache(maxsize=None)
+def asset_hash(filename):
+    """Returns a content hash of a static file (files don't change while the app runs)"""
+    with open(os.path.join(app.static_folder, filename), 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()[:12]
+
+
+@app.template_global()
+def asset_url(filename):
+    """URL of a static file fingerprinted with its content hash"""
+    return url_for('static', filename=filename, v=asset_hash(filename))
+
+
+@app.after_request
+def cache_fingerprinted_assets(response):
+    """Fingerprinted static files never change, so they can be cached forever"""
+    if request.endpoint == 'static' and request.args.get('v') and response.status_code == 200:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = 31536000
+        response.cache_control.immutable = True
+    return response
+
 
 def get_tournament():
     """Gets the global tournament"""
     return global_tournament
 
 
+def add_change_listener(callback):
+    """Registers a callback called with the new revision after each tournament change"""
+    _change_listeners.append(callback)
+
+
+def mark_tournament_changed():
+    """Bumps the tournament revision and notifies change listeners"""
+    global tournament_revision
+    tournament_revision += 1
+    change_log.commit(tournament_revision)
+    for listener in _change_listeners:
+        listener(tournament_revision)
+
+
+def start_background_workers():
+    """Starts the static export and notification threads, if configured
+
+    Called once the serving process exists rather than at import: with a
+    preloading server the app is imported in the master, whose threads don't
+    survive the fork. gunicorn.conf.py calls it after forking a worker, the
+    ASGI lifespan on startup and the development server before serving.
+    Calling it again in the same process does nothing.
+    """
+    global _static_export_worker, _notification_worker
+    if STATIC_EXPORT_DIR and _static_export_worker is None:
+        import static_export
+        _static_export_worker = static_export.start(sys.modules[__name__], STATIC_EXPORT_DIR)
+    if notification_transports and _notification_worker is None:
+        _notification_worker = notifications.start(
+            sys.modules[__name__], notification_transports, NOTIFY_QUEUE
+        )
+
+
+def mutates_tournament(view):
+    """Runs a view under the tournament lock and bumps the revision if it succeeded"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with tournament_lock:
+            response = view(*args, **kwargs)
+            status = response[1] if isinstance(response, tuple) else 200
+            if status < 400:
+                mark_tournament_changed()
+        return response
+    return wrapper
+
+
 def create_tournament():
     """Creates a new tournament"""
     global global_tournament
@@ -83,84 +298,28 @@ def create_tournament():
     return tournament
 
 
-def is_admin():
-    """Checks if the user is an admin"""
-    return session.get('is_admin', False)
-
-
-@app.route('/')
-def index():
-    """Main page"""
-    return render_template('index.html')
-
-
-@app.route('/api/auth/login', methods=['POST'])
-def admin_login():
-    """Admin login"""
-    data = request.json
-    password = data.get('password')
-
-    if password == ADMIN_PASSWORD:
-        session['is_admin'] = True
-        return jsonify({'success': True, 'message': 'Login successful'})
-    else:
-        return jsonify({'success': False, 'message': 'Invalid password'}), 401
-
-
-@app.route('/api/auth/logout', methods=['POST'])
-def admin_logout():
-    """Admin logout"""
-    session['is_admin'] = False
-    return jsonify({'success': True, 'message': 'Logout successful'})
-
-
-@app.route('/api/auth/status')
-def auth_status():
-    """Checks authorization status"""
-    return jsonify({'is_admin': is_admin()})
-
-
-@app.route('/api/tournament/new', methods=['POST'])
-def new_tournament():
-    """Creates a new tournament (admin only)"""
-    if not is_admin():
-        return jsonify({'error': 'Only administrator can create tournament'}), 403
-
-    tournament = create_tournament()
-
-    return jsonify({
-        'success': True,
-        'message': 'Tournament created successfully'
-    })
+def build_standings_row(player):
+    """Builds a group standings row"""
+    return {
+        'name': player.name,
+        'seed': player.seed,
+        'level': player.level,
+        'wins': player.wins,
+        'losses': player.losses,
+        'games_won': player.games_won,
+        'games_lost': player.games_lost,
+        'game_difference': player.game_difference()
+    }
 
 
-@app.route('/api/tournament/info')
-def tournament_info():
-    """Returns tournament information"""
-    tournament = get_tournament()
-
-    if not tournament:
-        return jsonify({'error': 'Tournament not found'}), 404
-
+def build_tournament_info(tournament):
+    """Builds the tournament info payload (groups standings and group matches)"""
     # Format group data
     groups_data = []
     for group in tournament.groups:
-        players_data = []
-        for player in group.get_standings():
-            players_data.append({
-                'name': player.name,
-                'seed': player.seed,
-                'level': player.level,
-                'wins': player.wins,
-                'losses': player.losses,
-                'games_won': player.games_won,
-                'games_lost': player.games_lost,
-                'game_difference': player.game_difference()
-            })
-
         groups_data.append({
             'name': group.name,
-            'players': players_data
+            'players': [build_standings_row(player) for player in group.get_standings()]
         })
 
     # Format group stage match data
@@ -177,21 +336,14 @@ def tournament_info():
                 'played': match.score is not None
             })
 
-    return jsonify({
+    return {
         'groups': groups_data,
-        'group_matches': group_matches,
-        'is_admin': is_admin()
-    })
-
+        'group_matches': group_matches
+    }
 
-@app.route('/api/tournament/schedule')
-def tournament_schedule():
-    """Returns tournament schedule"""
-    tournament = get_tournament()
-
-    if not tournament:
-        return jsonify({'error': 'Tournament not found'}), 404
 
+def build_schedule(tournament):
+    """Builds the full tournament schedule payload"""
     schedule = []
 
     # Group stage
@@ -249,10 +401,346 @@ def tournament_schedule():
             'playoff_type': 'third_place'
         })
 
-    return jsonify({'schedule': schedule})
+    return {'schedule': schedule, 'stale_results': stale_results(tournament)}
+
+
+def get_result_graph(tournament):
+    """Gets the result dependency graph of the tournament"""
+    global result_graph
+    if result_graph is None or result_graph.tournament is not tournament:
+        result_graph = ResultGraph(tournament)
+    return result_graph
+
+
+def stale_results(tournament):
+    """Results invalidated by corrections upstream, waiting to be played again"""
+    if result_graph is None or result_graph.tournament is not tournament:
+        return []
+    return list(result_graph.stale.values())
+
+
+def build_results(tournament):
+    """Builds the final results payload, or None if the final is not played yet"""
+    if not tournament.final or not tournament.final.winner:
+        return None
+
+    runner_up = (tournament.final.player2 if tournament.final.winner == tournament.final.player1
+                 else tournament.final.player1)
+
+    fourth_place = None
+    if tournament.third_place_match and tournament.third_place_match.winner:
+        fourth_place = (tournament.third_place_match.player2
+                       if tournament.third_place_match.winner == tournament.third_place_match.player1
+                       else tournament.third_place_match.player1)
+
+    third_place = tournament.third_place_match.winner if tournament.third_place_match else None
+
+    return {
+        'champion': tournament.final.winner.name,
+        'runner_up': runner_up.name,
+        'third_place': third_place.name if third_place else None,
+        'fourth_place': fourth_place.name if fourth_place else None
+    }
+
+
+def is_admin():
+    """Checks if the user is an admin"""
+    return session.get('is_admin', False)
+
+
+@app.route('/')
+def index():
+    """Main page (with the current tournament state embedded)"""
+    initial_state = {
+        'revision': tournament_revision,
+        'is_admin': is_admin(),
+        'tournament': None,
+        'results': None
+    }
+
+    tournament = get_tournament()
+    if tournament:
+        with tournament_lock:
+            initial_state['revision'] = tournament_revision
+            initial_state['tournament'] = serialize_state(tournament)
+            initial_state['results'] = build_results(tournament)
+
+    return render_template('index.html', initial_state=initial_state)
+
+
+@app.route('/sw.js')
+def service_worker():
+    """Service worker (served from the root so it controls the whole app)"""
+    precache = [asset_url(filename) for filename in PRECACHED_ASSETS]
+    version = hashlib.md5(''.join(precache).encode()).hexdigest()[:12]
+
+    response = app.response_class(
+        render_template('sw.js', precache=precache, version=version),
+        mimetype='application/javascript'
+    )
+    response.cache_control.no_cache = True
+    return response
+
+
+@app.route('/api/auth/login', methods=['POST'])
+def admin_login():
+    """Admin login"""
+    data = request.json
+    password = data.get('password')
+
+    if password == ADMIN_PASSWORD:
+        session['is_admin'] = True
+        return jsonify({'success': True, 'message': 'Login successful'})
+    else:
+        return jsonify({'success': False, 'message': 'Invalid password'}), 401
+
+
+@app.route('/api/auth/logout', methods=['POST'])
+def admin_logout():
+    """Admin logout"""
+    session['is_admin'] = False
+    return jsonify({'success': True, 'message': 'Logout successful'})
+
+
+@app.route('/api/auth/status')
+def auth_status():
+    """Checks authorization status"""
+    return jsonify({'is_admin': is_admin()})
+
+
+@app.route('/api/tournament/new', methods=['POST'])
+@mutates_tournament
+def new_tournament():
+    """Creates a new tournament (admin only)"""
+    if not is_admin():
+        return jsonify({'error': 'Only administrator can create tournament'}), 403
+
+    global court_dispatcher, schedule_editor, result_graph, player_index, section_cache
+
+    # Keep the finished tournament for club analytics before replacing it
+    previous = get_tournament()
+    if previous is not None and build_results(previous) is not None:
+        archive_tournament(previous)
+
+    tournament = create_tournament()
+    court_dispatcher = None
+    schedule_editor = None
+    result_graph = None
+    player_index = None
+    section_cache = None
+    change_log.reset()
+
+    return jsonify({
+        'success': True,
+        'message': 'Tournament created successfully'
+    })
+
+
+@app.route('/api/tournament/info')
+def tournament_info():
+    """Returns tournament information"""
+    tournament = get_tournament()
+
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
+
+    with tournament_lock:
+        data = build_tournament_info(tournament)
+    data['is_admin'] = is_admin()
+    return jsonify(data)
+
+
+@app.route('/api/tournament/schedule')
+def tournament_schedule():
+    """Returns tournament schedule"""
+    tournament = get_tournament()
+
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
+
+    with tournament_lock:
+        data = build_schedule(tournament)
+
+    return jsonify(data)
+
+
+@app.route('/api/tournament/changes')
+def tournament_changes():
+    """Returns what changed since a revision (or a full snapshot if it is too old)"""
+    tournament = get_tournament()
+
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
+
+    since = request.args.get('since', type=int)
+
+    with tournament_lock:
+        changes = None
+        if since is not None and since <= tournament_revision:
+            changes = change_log.changes_since(since)
+
+        if changes is None:
+            return jsonify({
+                'revision': tournament_revision,
+                'full': True,
+                'state': serialize_state(tournament),
+                'results': build_results(tournament)
+            })
+
+        changed_matches, changed_groups = changes
+        ids = player_ids(tournament)
+        matches = [
+            serialize_match(ids, match_id, match, match_type, key)
+            for match_id, match, match_type, key in iter_matches(tournament)
+            if match_id in changed_matches
+        ]
+        # Changed matches that no longer exist (e.g. a final whose semifinal was re-seeded)
+        removed = sorted(changed_matches - {match['id'] for match in matches})
+        return jsonify({
+            'revision': tournament_revision,
+            'full': False,
+            'matches': matches,
+            'removed': removed,
+            'groups': serialize_groups(tournament, ids, changed_groups),
+            'results': build_results(tournament)
+        })
+
+
+# ===== Granular read API =====
+#
+# Smaller reads for displays that show one group or only the playoffs. Every
+# part (a group, the playoffs, each match) is cached separately and only
+# rebuilt when the change log says it changed.
+
+def get_section_cache(tournament):
+    """Gets the cache of tournament parts, caught up with the current revision"""
+    global section_cache
+    if (section_cache is None or section_cache.tournament is not tournament
+            or not section_cache.sync(change_log, tournament_revision)):
+        section_cache = SectionCache(tournament, tournament_revision)
+    return section_cache
+
+
+def build_match_record(match_id, match, match_type, key):
+    """Builds a match record of the granular read API"""
+    record = {
+        'id': match_id,
+        'type': match_type,
+        'time': match.time,
+        'court': match.court,
+        'stage': match.stage,
+        'player1': match.player1.name,
+        'player2': match.player2.name,
+        'score': match.score,
+        'played': match.score is not None
+    }
+    if match_type == 'group':
+        record['group'] = key
+    else:
+        record['playoff_type'] = key
+    return record
+
+
+def cached_match_records(tournament, cache, match_type=None, key=None):
+    """Match records (from the per-match cache) in schedule order"""
+    return [
+        cache.get(match_id, lambda: build_match_record(match_id, match, entry_type, entry_key))
+        for match_id, match, entry_type, entry_key in iter_matches(tournament)
+        if (match_type is None or entry_type == match_type) and (key is None or entry_key == key)
+    ]
+
+
+@app.route('/api/groups/<name>')
+def get_group(name):
+    """Returns one group's standings and matches; ?fields=standings,matches picks the parts"""
+    tournament = get_tournament()
+
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
+
+    group = next((g for g in tournament.groups if g.name.lower() == name.lower()), None)
+    if group is None:
+        return jsonify({'error': 'Group not found'}), 404
+
+    fields = parse_fields()
+    with tournament_lock:
+        cache = get_section_cache(tournament)
+        data = cache.get(f"group:{group.name}", lambda: {
+            'name': group.name,
+            'standings': [build_standings_row(player) for player in group.get_standings()],
+            'matches': cached_match_records(tournament, cache, 'group', group.name)
+        })
+        revision = tournament_revision
+
+    return jsonify({'revision': revision, **project(data, None if fields is None else ['name', *fields])})
+
+
+@app.route('/api/playoffs')
+def get_playoffs():
+    """Returns the playoff matches (?fields= projects each match)"""
+    tournament = get_tournament()
+
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
+
+    fields = parse_fields()
+    with tournament_lock:
+        cache = get_section_cache(tournament)
+        data = cache.get('playoffs', lambda: {
+            'matches': cached_match_records(tournament, cache, 'playoff'),
+            'stale_results': stale_results(tournament)
+        })
+        revision = tournament_revision
+
+    return jsonify({
+        'revision': revision,
+        'matches': [project(record, fields) for record in data['matches']],
+        'stale_results': data['stale_results']
+    })
+
+
+@app.route('/api/matches')
+def get_matches():
+    """Returns matches filtered by ?stage= (stage, group or playoff type), ?time= and ?court=
+
+    ?fields= projects each match.
+    """
+    tournament = get_tournament()
+
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
+
+    stage = request.args.get('stage')
+    match_time = request.args.get('time')
+    court = request.args.get('court')
+    if court is not None:
+        if not court.isdigit():
+            return jsonify({'error': 'court must be a number'}), 400
+        court = int(court)
+    fields = parse_fields()
+
+    with tournament_lock:
+        records = cached_match_records(tournament, get_section_cache(tournament))
+        revision = tournament_revision
+
+    matches = [
+        project(record, fields) for record in records
+        if (stage is None or stage in (record['stage'], record.get('group'), record.get('playoff_type')))
+        and (match_time is None or record['time'] == match_time)
+        and (court is None or record['court'] == court)
+    ]
+    return jsonify({'revision': revision, 'matches': matches})
+
+
+@app.route('/api/live')
+def live_updates():
+    """Live update stream (only available in the asyncio serving mode, see asgi.py)"""
+    # 204 tells EventSource clients to stop reconnecting
+    return '', 204
 
 
 @app.route('/api/match/submit', methods=['POST'])
+@mutates_tournament
 def submit_match():
     """Submits match result (admin only)"""
     if not is_admin():
@@ -285,8 +773,11 @@ def submit_match():
                     if (match.player1.name == player1_name and
                         match.player2.name == player2_name):
 
-                        # Save new result
-                        match.play(p1_sets, p2_sets)
+                        # Save new result (and re-seed the playoffs if needed)
+                        changed, invalidated = get_result_graph(tournament).record(
+                            find_match_id(tournament, match), p1_sets, p2_sets
+                        )
+                        change_log.touch(matches=changed, groups=[group.name])
                         match_found = True
                         break
                 if match_found:
@@ -295,13 +786,14 @@ def submit_match():
         if not match_found:
             return jsonify({'error': 'Match not found'}), 404
 
-        return jsonify({'success': True, 'message': 'Result saved'})
+        return jsonify({'success': True, 'message': 'Result saved', 'invalidated': invalidated})
 
     except ValueError:
         return jsonify({'error': 'Invalid score format'}), 400
 
 
 @app.route('/api/playoffs/setup', methods=['POST'])
+@mutates_tournament
 def setup_playoffs():
     """Sets up playoffs (admin only)"""
     if not is_admin():
@@ -324,11 +816,13 @@ def setup_playoffs():
         return jsonify({'error': 'Not all group matches are played'}), 400
 
     tournament.setup_playoffs()
+    change_log.touch(matches=['SF1', 'SF2'])
 
     return jsonify({'success': True, 'message': 'Playoffs setup complete'})
 
 
 @app.route('/api/playoffs/match', methods=['POST'])
+@mutates_tournament
 def submit_playoff_match():
     """Submits playoff match result (admin only)"""
     if not is_admin():
@@ -352,59 +846,23 @@ def submit_playoff_match():
             return jsonify({'error': 'Invalid score. Valid: 2-0, 2-1, 0-2, 1-2'}), 400
 
         # Find corresponding match
-        if playoff_type == 'semifinal':
-            for match in tournament.scheduled_semifinals:
-                if (match.player1.name == player1_name and
+        match_id = None
+        for candidate_id, match, _, key in iter_matches(tournament):
+            if (key == playoff_type and match.player1.name == player1_name and
                     match.player2.name == player2_name):
+                match_id = candidate_id
+                break
 
-                    match.play(p1_sets, p2_sets)
-
-                    # If both semifinals are played, create/update final
-                    if all(m.score is not None for m in tournament.scheduled_semifinals):
-                        winners = [m.winner for m in tournament.scheduled_semifinals]
-                        losers = []
-                        for m in tournament.scheduled_semifinals:
-                            loser = m.player2 if m.winner == m.player1 else m.player1
-                            losers.append(loser)
-
-                        # Check if final already exists
-                        if tournament.scheduled_final:
-                            # Reset old final stats if it was played
-                            if tournament.scheduled_final.score is not None:
-                                tournament.scheduled_final.score = None
-                                tournament.scheduled_final.winner = None
-
-                        if tournament.scheduled_third_place:
-                            # Reset 3rd place match stats if it was played
-                            if tournament.scheduled_third_place.score is not None:
-                                tournament.scheduled_third_place.score = None
-                                tournament.scheduled_third_place.winner = None
-
-                        tournament.scheduled_final = ScheduledMatch(
-                            winners[0], winners[1], "20:00", 1, 0, "Final"
-                        )
-                        tournament.scheduled_third_place = ScheduledMatch(
-                            losers[0], losers[1], "19:00", 1, 0, "3rd Place Match"
-                        )
-                        tournament.final = tournament.scheduled_final
-                        tournament.third_place_match = tournament.scheduled_third_place
-
-                    return jsonify({'success': True, 'message': 'Result saved'})
-
-        elif playoff_type == 'final' and tournament.scheduled_final:
-            if (tournament.scheduled_final.player1.name == player1_name and
-                tournament.scheduled_final.player2.name == player2_name):
-
-                tournament.scheduled_final.play(p1_sets, p2_sets)
-
-                return jsonify({'success': True, 'message': 'Final completed!'})
-
-        elif playoff_type == 'third_place' and tournament.scheduled_third_place:
-            if (tournament.scheduled_third_place.player1.name == player1_name and
-                tournament.scheduled_third_place.player2.name == player2_name):
-
-                tournament.scheduled_third_place.play(p1_sets, p2_sets)
-                return jsonify({'success': True, 'message': 'Third place match completed!'})
+        if match_id is not None:
+            # Corrections only rebuild the playoff matches whose players change
+            changed, invalidated = get_result_graph(tournament).record(match_id, p1_sets, p2_sets)
+            change_log.touch(matches=changed)
+            messages = {'final': 'Final completed!', 'third_place': 'Third place match completed!'}
+            return jsonify({
+                'success': True,
+                'message': messages.get(playoff_type, 'Result saved'),
+                'invalidated': invalidated
+            })
 
         return jsonify({'error': 'Match not found'}), 404
 
@@ -420,33 +878,356 @@ def final_results():
     if not tournament:
         return jsonify({'error': 'Tournament not found'}), 404
 
-    if not tournament.final or not tournament.final.winner:
+    results = build_results(tournament)
+    if results is None:
         return jsonify({'error': 'Tournament not yet completed'}), 400
 
-    runner_up = (tournament.final.player2 if tournament.final.winner == tournament.final.player1
-                 else tournament.final.player1)
+    return jsonify(results)
+
+
+# ===== Match archive and club analytics =====
+
+def get_match_archive():
+    """Gets the match archive (NumPy is only imported when it's first used)"""
+    global _match_archive
+    if _match_archive is None:
+        from match_archive import MatchArchive
+        _match_archive = MatchArchive(ARCHIVE_DIR)
+    return _match_archive
+
+
+def archive_tournament(tournament):
+    """
+    Appends the played matches of a tournament to the archive (once per tournament,
+    also across restarts and workers: the archive skips tournaments it already has)
+
+    Returns:
+        Number of archived matches, or None if the tournament was already archived
+    """
+    from match_table import MatchTable
+
+    with tournament_lock:
+        table = MatchTable.from_tournament(tournament)
+    return get_match_archive().append(table)
+
+
+@app.route('/api/archive', methods=['POST'])
+def archive_current_tournament():
+    """Archives the completed tournament (admin only)"""
+    if not is_admin():
+        return jsonify({'error': 'Only administrator can archive tournaments'}), 403
+
+    tournament = get_tournament()
+
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
+
+    if build_results(tournament) is None:
+        return jsonify({'error': 'Tournament not yet completed'}), 400
+
+    count = archive_tournament(tournament)
+    if count is None:
+        return jsonify({'error': 'Tournament already archived'}), 409
+
+    return jsonify({'success': True, 'matches': count, **get_match_archive().summary()})
 
-    fourth_place = None
-    if tournament.third_place_match and tournament.third_place_match.winner:
-        fourth_place = (tournament.third_place_match.player2
-                       if tournament.third_place_match.winner == tournament.third_place_match.player1
-                       else tournament.third_place_match.player1)
+
+@app.route('/api/analytics/<query>')
+def club_analytics(query):
+    """Runs an analytics query over the archive (admin only)"""
+    if not is_admin():
+        return jsonify({'error': 'Only administrator can view analytics'}), 403
+
+    from match_archive import QUERIES
+
+    if query not in QUERIES:
+        return jsonify({'error': f"Unknown query. Available: {', '.join(QUERIES)}"}), 404
+
+    return jsonify(QUERIES[query](get_match_archive()))
+
+
+# ===== API for live court dispatch =====
+
+def get_court_dispatcher(tournament):
+    """Gets the court dispatcher of the tournament (picks up new playoff matches)"""
+    global court_dispatcher
+    if court_dispatcher is None or court_dispatcher.tournament is not tournament:
+        courts = {match.court for group in tournament.groups for match in group.scheduled_matches}
+        court_dispatcher = CourtDispatcher(tournament, sorted(courts) or [1])
+    else:
+        court_dispatcher.sync()
+    return court_dispatcher
+
+
+def current_minutes():
+    now = time.localtime()
+    return now.tm_hour * 60 + now.tm_min
+
+
+@app.route('/api/courts')
+def courts_status():
+    """Returns running matches per court and estimated start times of the queue"""
+    tournament = get_tournament()
+
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
+
+    with tournament_lock:
+        status = get_court_dispatcher(tournament).status(current_minutes())
+    return jsonify(status)
+
+
+@app.route('/api/courts/<int:court>/free', methods=['POST'])
+@mutates_tournament
+def free_court(court):
+    """Marks a court free and dispatches the next match to it (admin only)"""
+    if not is_admin():
+        return jsonify({'error': 'Only administrator can dispatch matches'}), 403
+
+    tournament = get_tournament()
+
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
+
+    data = request.get_json(silent=True) or {}
+    try:
+        now = parse_time(data.get('time'), current_minutes())
+        dispatcher = get_court_dispatcher(tournament)
+        match_id = dispatcher.court_free(court, now)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Dispatching shifts the estimated start of the matches queued behind it
+    changed = dispatcher.refresh_schedule(now)
+    if match_id is not None:
+        changed.append(match_id)
+    change_log.touch(matches=changed)
 
     return jsonify({
-        'champion': tournament.final.winner.name,
-        'runner_up': runner_up.name,
-        'third_place': tournament.third_place_match.winner.name if tournament.third_place_match else None,
-        'fourth_place': fourth_place.name if fourth_place else None
+        'success': True,
+        'match_id': match_id,
+        'courts': dispatcher.court_status()
     })
 
 
+# ===== API for schedule editing =====
+
+def get_schedule_editor(tournament):
+    """Gets the schedule editor of the tournament, in sync with the current schedule"""
+    global schedule_editor
+    if schedule_editor is None or schedule_editor.tournament is not tournament:
+        schedule_editor = ScheduleEditor(tournament, min_rest=SCHEDULE_MIN_REST)
+    else:
+        schedule_editor.sync()
+    return schedule_editor
+
+
+def apply_schedule_edit(edit):
+    """Runs an edit against the schedule editor and builds the response"""
+    tournament = get_tournament()
+
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
+
+    editor = get_schedule_editor(tournament)
+    try:
+        moved = edit(editor)
+    except KeyError as e:
+        return jsonify({'error': f'Match {e.args[0]} not found'}), 404
+    except ScheduleConflict as e:
+        return jsonify({
+            'error': str(e),
+            'match_id': e.match_id,
+            'conflicting_match_id': e.conflicting_id
+        }), 409
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e) or 'Invalid request'}), 400
+
+    change_log.touch(matches=moved)
+    ids = player_ids(tournament)
+    return jsonify({
+        'success': True,
+        'matches': [
+            serialize_match(ids, match_id, match, match_type, key)
+            for match_id, match, match_type, key in iter_matches(tournament)
+            if match_id in moved
+        ]
+    })
+
+
+@app.route('/api/schedule/move', methods=['POST'])
+@mutates_tournament
+def move_match():
+    """Moves a match to another time and/or court (admin only)"""
+    if not is_admin():
+        return jsonify({'error': 'Only administrator can edit the schedule'}), 403
+
+    data = request.get_json(silent=True) or {}
+    court = data.get('court')
+    if court is not None and not isinstance(court, int):
+        return jsonify({'error': 'Court must be a number'}), 400
+
+    return apply_schedule_edit(lambda editor: editor.move(data.get('match_id'), data.get('time'), court))
+
+
+@app.route('/api/schedule/swap', methods=['POST'])
+@mutates_tournament
+def swap_matches():
+    """Swaps the time slots and courts of two matches (admin only)"""
+    if not is_admin():
+        return jsonify({'error': 'Only administrator can edit the schedule'}), 403
+
+    data = request.get_json(silent=True) or {}
+    return apply_schedule_edit(lambda editor: editor.swap(data.get('match_a'), data.get('match_b')))
+
+
 # ===== API for player management =====
 
+def parse_fields():
+    """Parses the ?fields= projection (None means all fields)"""
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+
+def project(record, fields):
+    """Keeps only the requested fields of a record"""
+    if fields is None:
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
 @app.route('/api/players')
 def get_players():
-    """Returns list of all players"""
-    players = player_db.get_all_players()
-    return jsonify({'players': players})
+    """Returns players; sorted and paginated when sort/limit/cursor are given"""
+    fields = parse_fields()
+
+    if not any(arg in request.args for arg in ('sort', 'order', 'limit', 'cursor')):
+        players = player_db.get_all_players()
+        return jsonify({'players': [project(p, fields) for p in players]})
+
+    sort = request.args.get('sort', 'level')
+    descending = request.args.get('order', 'desc') != 'asc'
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+
+    try:
+        players, next_cursor = player_db.get_leaderboard_page(
+            sort, descending, limit, request.args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'players': [project(p, fields) for p in players],
+        'next_cursor': next_cursor
+    })
+
+
+@app.route('/api/players/search')
+def search_players():
+    """Searches players by name (prefix and typo-tolerant, for autocomplete)"""
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+
+    return jsonify({'players': player_db.search_players(query, limit)})
+
+
+@app.route('/api/players/import', methods=['POST'])
+def import_players():
+    """Bulk-imports players from an NDJSON or CSV request body (admin only)"""
+    if not is_admin():
+        return jsonify({'error': 'Only administrator can import players'}), 403
+
+    import players_io
+
+    fmt = request.args.get('format') or players_io.detect_format(content_type=request.content_type)
+    if fmt not in players_io.FORMATS:
+        return jsonify({'error': f'Unknown format: {fmt}'}), 400
+
+    chunk_size = min(max(request.args.get('chunk_size', players_io.DEFAULT_CHUNK_SIZE, type=int), 1), 10000)
+    upsert = request.args.get('upsert') in ('1', 'true')
+
+    # Lines are decoded one by one, so a bad byte sequence is reported for its line
+    summary = players_io.import_rows(player_db, players_io.read_rows(request.stream, fmt), upsert, chunk_size)
+
+    return jsonify({'success': not summary['errors'], **summary})
+
+
+@app.route('/api/players/export')
+def export_players():
+    """Streams all players as NDJSON or CSV"""
+    import players_io
+
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in players_io.FORMATS:
+        return jsonify({'error': f'Unknown format: {fmt}'}), 400
+
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = app.response_class(players_io.export_rows(player_db, fmt), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=players.{fmt}'
+    return response
+
+
+def get_player_index(tournament):
+    """Gets the player -> matches index, caught up with the current revision"""
+    global player_index
+    if (player_index is None or player_index.tournament is not tournament
+            or not player_index.sync(change_log, tournament_revision)):
+        player_index = PlayerMatchIndex(tournament, tournament_revision)
+    return player_index
+
+
+@app.route('/api/players/<name>/schedule')
+def get_player_schedule(name):
+    """Returns a player's upcoming and completed matches in the current tournament"""
+    tournament = get_tournament()
+
+    if not tournament:
+        return jsonify({'error': 'Tournament not found'}), 404
+
+    with tournament_lock:
+        index = get_player_index(tournament)
+        group = index.groups.get(name)
+        if group is None:
+            return jsonify({'error': 'Player not in the tournament'}), 404
+
+        upcoming, completed = [], []
+        for match_id, match, match_type, key in index.matches_of(name):
+            is_player1 = match.player1.name == name
+            data = {
+                'id': match_id,
+                'type': match_type,
+                'stage': match.stage,
+                'court': match.court,
+                # Pending start times follow the court dispatcher's estimates
+                'time': match.time,
+                'opponent': (match.player2 if is_player1 else match.player1).name
+            }
+            if match_type == 'playoff':
+                data['playoff_type'] = key
+            if match.score is None:
+                upcoming.append(data)
+            else:
+                own, other = match.score if is_player1 else match.score[::-1]
+                data['score'] = f"{own}-{other}"
+                data['won'] = match.winner.name == name
+                completed.append(data)
+
+        standings = group.get_standings()
+        player = next(p for p in standings if p.name == name)
+        upcoming.sort(key=lambda m: (m['time'], m['court']))
+        completed.sort(key=lambda m: (m['time'], m['court']))
+        return jsonify({
+            'name': name,
+            'group': group.name,
+            'rank': standings.index(player) + 1,
+            'wins': player.wins,
+            'losses': player.losses,
+            'next': upcoming[0] if upcoming else None,
+            'upcoming': upcoming,
+            'completed': completed
+        })
 
 
 @app.route('/api/players/<name>')
@@ -526,8 +1307,104 @@ def delete_player(name):
     })
 
 
+
+# ===== API for the box-league ladder =====
+
+def get_box_league():
+    """Gets the ladder, reloaded if another worker changed it"""
+    global _box_league
+    if _box_league is None:
+        from box_league import BoxLeague
+        _box_league = BoxLeague(LADDER_FILE, player_db)
+    else:
+        _box_league.refresh_if_stale()
+    return _box_league
+
+
+@app.route('/api/ladder')
+def get_ladder():
+    """Returns the ladder boxes with standings and fixtures"""
+    with tournament_lock:
+        return jsonify(get_box_league().to_dict())
+
+
+@app.route('/api/ladder', methods=['POST'])
+def create_ladder():
+    """Starts a new ladder (admin only)
+
+    Players are given in ranking order, or default to all registered players by level.
+    """
+    if not is_admin():
+        return jsonify({'error': 'Only administrator can create the ladder'}), 403
+
+    data = request.get_json(silent=True) or {}
+    names = data.get('players') or player_db.get_top_players(len(player_db.players))
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        return jsonify({'error': 'players must be a list of names'}), 400
+    box_size = data.get('box_size', 5)
+    if not isinstance(box_size, int) or box_size < 2:
+        return jsonify({'error': 'box_size must be an integer of at least 2'}), 400
+
+    with tournament_lock:
+        league = get_box_league()
+        try:
+            league.create(names, box_size)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        league.save()
+        return jsonify({'success': True, **league.to_dict()})
+
+
+@app.route('/api/ladder/result', methods=['POST'])
+def submit_ladder_result():
+    """Submits (or corrects) a box match result (admin only)"""
+    if not is_admin():
+        return jsonify({'error': 'Only administrator can submit results'}), 403
+
+    data = request.get_json(silent=True) or {}
+    try:
+        sets1, sets2 = map(int, str(data.get('score')).split('-'))
+    except ValueError:
+        return jsonify({'error': 'Invalid score format'}), 400
+
+    with tournament_lock:
+        league = get_box_league()
+        try:
+            league.record_result(str(data.get('box')), data.get('player1'), data.get('player2'),
+                                 sets1, sets2)
+        except KeyError:
+            return jsonify({'error': 'Match not found'}), 404
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        league.save()
+    return jsonify({'success': True, 'message': 'Result saved'})
+
+
+@app.route('/api/ladder/close-month', methods=['POST'])
+def close_ladder_month():
+    """Month-end batch: career stats, promotion/relegation, new fixtures (admin only)"""
+    if not is_admin():
+        return jsonify({'error': 'Only administrator can close the month'}), 403
+
+    with tournament_lock:
+        league = get_box_league()
+        if not league.boxes:
+            return jsonify({'error': 'Ladder not found'}), 404
+        month = (request.get_json(silent=True) or {}).get('month')
+        if month is not None and not isinstance(month, str):
+            return jsonify({'error': 'month must be a string like "2024-05"'}), 400
+        try:
+            summary = league.close_month(month=month)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 409
+        league.save()
+    return jsonify({'success': True, **summary})
+
 if __name__ == '__main__':
     # Debug mode for local development only
     import os
     port = int(os.environ.get('PORT', 5001))
+    # The reloader runs this script twice; only the serving child starts the workers
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_workers()
     app.run(debug=True, port=port, host='0.0.0.0')
@@ -0,0 +1,314 @@
+"""
+Asyncio serving mode for the tournament app
+
+Exposes the same routes as app.py as an ASGI application. Read endpoints and
+the live update stream (/api/live, Server-Sent Events) are served directly on
+the event loop; every other route, including all mutations, is delegated to
+the Flask app in a worker thread so it still goes through the Tournament logic.
+
+The fast paths skip Flask's before_request hooks, so they apply the same
+per-client rate limits themselves: a client over budget gets the payload
+cached for the current revision if there is one, otherwise a 429. The
+lifespan startup starts the background workers (static export,
+notifications) of the serving process.
+
+Run with:
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+"""
+import asyncio
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.http import parse_cookie
+
+import app as flask_module
+from serialization import COMPRESSION_THRESHOLD, compression_cache, negotiate_encoding
+
+flask_app = flask_module.app
+
+# Seconds between keep-alive comments on idle live update streams
+KEEPALIVE_INTERVAL = 25
+
+
+class LiveUpdateHub:
+    """Fans out revision changes to all connected spectators
+
+    Every subscriber waits on the same asyncio.Event, so a change wakes all of
+    them with a single set() and an idle connection costs only its task.
+    """
+
+    def __init__(self):
+        self.revision = flask_module.tournament_revision
+        self._changed = asyncio.Event()
+
+    def publish(self, revision: int):
+        """Wakes all subscribers (must be called on the event loop)"""
+        self.revision = revision
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait(self, revision: int, timeout: float) -> int:
+        """Waits until the revision differs from the given one or the timeout expires"""
+        if self.revision == revision:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.revision
+
+
+class PayloadCache:
+    """Serialized read payloads, rebuilt at most once per revision
+
+    Hits are answered on the event loop without locking. A miss is built in a
+    worker thread: it needs the tournament lock, which a mutation may hold,
+    and the loop must never wait for it.
+    """
+
+    def __init__(self):
+        # (revision, {key: body}), replaced as a whole so the loop reads it atomically
+        self._entry = (None, {})
+
+    def peek(self, key):
+        """(revision, body) if the payload of the current revision is built, else None"""
+        revision, bodies = self._entry
+        if revision == flask_module.tournament_revision and key in bodies:
+            return revision, bodies[key]
+        return None
+
+    async def get(self, key, build):
+        """Returns (revision, body) of a payload"""
+        cached = self.peek(key)
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self._build, key, build)
+
+    def _build(self, key, build):
+        # The revision is bumped under the same lock, so it always matches the built body
+        with flask_module.tournament_lock:
+            revision = flask_module.tournament_revision
+            if revision != self._entry[0]:
+                self._entry = (revision, {})
+
+            bodies = self._entry[1]
+            body = bodies.get(key)
+            if body is None:
+                body = flask_app.json.dumps(build()).encode('utf-8')
+                bodies[key] = body
+        return revision, body
+
+
+hub = None
+payload_cache = PayloadCache()
+wsgi_app = WsgiToAsgi(flask_app)
+
+
+def is_admin(scope) -> bool:
+    """Reads the admin flag from the Flask session cookie"""
+    cookie_header = header(scope, b'cookie')
+    if not cookie_header:
+        return False
+
+    cookies = parse_cookie(cookie_header)
+    token = cookies.get(flask_app.config['SESSION_COOKIE_NAME'])
+    if not token:
+        return False
+
+    serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+    if serializer is None:
+        return False
+    try:
+        data = serializer.loads(
+            token, max_age=int(flask_app.permanent_session_lifetime.total_seconds())
+        )
+    except Exception:
+        return False
+    return bool(data.get('is_admin', False))
+
+
+def header(scope, name: bytes) -> str:
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def client_address(scope) -> str:
+    """Address of the client as Flask sees it behind PROXY_HOPS proxies (see ProxyFix)"""
+    hops = flask_module.PROXY_HOPS
+    if hops:
+        forwarded = [part.strip() for part in header(scope, b'x-forwarded-for').split(',')]
+        if len(forwarded) >= hops and forwarded[-hops]:
+            return forwarded[-hops]
+    client = scope.get('client')
+    return client[0] if client else ''
+
+
+async def send_json(send, body: bytes, status: int = 200, scope=None, cache_key=None,
+                    extra_headers=()):
+    """Sends a JSON body, compressed if large (cached under cache_key if given)"""
+    headers = [(b'content-type', b'application/json'), (b'vary', b'Accept-Encoding')]
+    headers.extend(extra_headers)
+
+    if scope is not None and len(body) >= COMPRESSION_THRESHOLD:
+        encoding = negotiate_encoding(header(scope, b'accept-encoding'))
+        if encoding is not None:
+            body = compression_cache.compress(body, encoding, cache_key)
+            headers.append((b'content-encoding', encoding.encode()))
+
+    headers.append((b'content-length', str(len(body)).encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def tournament_info(scope, receive, send):
+    tournament = flask_module.get_tournament()
+    if not tournament:
+        return await send_json(send, b'{"error":"Tournament not found"}', 404)
+
+    admin = is_admin(scope)
+
+    def build():
+        data = flask_module.build_tournament_info(tournament)
+        data['is_admin'] = admin
+        return data
+
+    key = ('info', admin)
+    revision, body = await payload_cache.get(key, build)
+    await send_json(send, body, scope=scope, cache_key=(key, revision))
+
+
+async def tournament_schedule(scope, receive, send):
+    tournament = flask_module.get_tournament()
+    if not tournament:
+        return await send_json(send, b'{"error":"Tournament not found"}', 404)
+
+    revision, body = await payload_cache.get('schedule', lambda: flask_module.build_schedule(tournament))
+    await send_json(send, body, scope=scope, cache_key=('schedule', revision))
+
+
+async def auth_status(scope, receive, send):
+    body = flask_app.json.dumps({'is_admin': is_admin(scope)}).encode('utf-8')
+    await send_json(send, body)
+
+
+async def live_updates(scope, receive, send):
+    """Server-Sent Events stream with the current tournament revision"""
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+
+    # Cancel the stream as soon as the client goes away
+    stream = asyncio.current_task()
+
+    async def watch_disconnect():
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                stream.cancel()
+                return
+
+    watcher = asyncio.ensure_future(watch_disconnect())
+    try:
+        sent_revision = None
+        while True:
+            revision = await hub.wait(sent_revision, KEEPALIVE_INTERVAL)
+            if revision != sent_revision:
+                event = f'event: revision\ndata: {{"revision": {revision}}}\n\n'
+                sent_revision = revision
+            else:
+                event = ': keep-alive\n\n'
+            await send({'type': 'http.response.body', 'body': event.encode(), 'more_body': True})
+    except asyncio.CancelledError:
+        pass
+    finally:
+        watcher.cancel()
+
+
+# Routes served on the event loop; everything else goes to Flask
+ASYNC_ROUTES = {
+    '/api/tournament/info': tournament_info,
+    '/api/tournament/schedule': tournament_schedule,
+    '/api/auth/status': auth_status,
+    '/api/live': live_updates,
+}
+
+# Flask endpoint of each fast path, whose rate limit budget it shares
+ENDPOINTS = {path: flask_app.url_map.bind('').match(path)[0] for path in ASYNC_ROUTES}
+
+# Payloads an anonymous client over budget may still get from the revision cache
+SHED_PAYLOADS = {
+    '/api/tournament/info': ('info', False),
+    '/api/tournament/schedule': 'schedule',
+}
+
+
+async def limit_rate(scope, send) -> bool:
+    """Sheds a fast path request over budget, like app.limit_rate
+
+    The limiter's lock is only ever held for a few struct reads, so checking
+    on the event loop doesn't stall it.
+
+    Returns:
+        True if the request was answered here
+    """
+    limiter = flask_module.rate_limiter
+    if limiter is None or is_admin(scope):
+        return False
+
+    path = scope['path']
+    wait = limiter.check(client_address(scope), ENDPOINTS[path])
+    if not wait:
+        return False
+
+    key = SHED_PAYLOADS.get(path)
+    cached = payload_cache.peek(key) if key is not None else None
+    if cached is not None:
+        revision, body = cached
+        await send_json(send, body, scope=scope, cache_key=(key, revision))
+    else:
+        retry_after = str(int(min(wait, 3600)) + 1).encode()
+        await send_json(send, b'{"error":"Too many requests"}', 429,
+                        extra_headers=[(b'retry-after', retry_after)])
+    return True
+
+
+async def lifespan(scope, receive, send):
+    global hub
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            loop = asyncio.get_running_loop()
+            hub = LiveUpdateHub()
+            # Mutations run in worker threads, so hand revisions over to the loop
+            flask_module.add_change_listener(
+                lambda revision: loop.call_soon_threadsafe(hub.publish, revision)
+            )
+            flask_module.start_background_workers()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        return await lifespan(scope, receive, send)
+
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        handler = ASYNC_ROUTES.get(scope['path'])
+        # Without lifespan support there is no hub, and Flask answers /api/live with 204
+        if handler is live_updates and hub is None:
+            handler = None
+        if handler is not None:
+            if await limit_rate(scope, send):
+                return
+            return await handler(scope, receive, send)
+
+    await wsgi_app(scope, receive, send)
@@ -0,0 +1,315 @@
+"""
+Box-league ladder between tournaments
+
+The club ladder is a list of "boxes" (box 1 is the strongest), each a small
+round-robin played over a month. A box is a regular Group, so fixtures and
+standings are exactly those of the tournament group stage.
+
+At month end close_month() runs the batch in one pass over all boxes:
+results go into the PlayerDatabase career stats (a single file write), the
+top players of each box move up a box and the bottom ones down, and the new
+boxes get fresh fixtures. Every step is linear in the number of players.
+A month is closed once: the batch refuses to start a month that is already
+running or was closed before, so a retry (or cron plus the admin endpoint)
+can't reshuffle the boxes again. Run it after the month boundary, or name
+the new month explicitly.
+
+The ladder is stored in a JSON file (written atomically) and reloaded when
+another worker process changed it.
+
+Usage:
+    python box_league.py show
+    python box_league.py close-month
+"""
+import argparse
+import os
+import sys
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import fast_json
+from tennis_tournament import Group, Match, Player
+
+# Players per box
+BOX_SIZE = 5
+
+# Players moving up / down between neighbouring boxes each month
+PROMOTED = 1
+RELEGATED = 1
+
+
+def current_month() -> str:
+    return date.today().strftime('%Y-%m')
+
+
+class BoxLeague:
+    """Ladder of round-robin boxes with monthly promotion and relegation
+
+    Args:
+        path: JSON file the ladder is stored in
+        player_db: PlayerDatabase for levels and career stats
+    """
+
+    def __init__(self, path: str = 'box_league.json', player_db=None):
+        self.path = path
+        self.player_db = player_db
+        self.month = current_month()
+        # Months closed by the batch, oldest first
+        self.closed_months: List[str] = []
+        self.boxes: List[Group] = []
+        # box name -> {frozenset of the two names -> match}
+        self._fixtures: Dict[str, Dict[frozenset, Match]] = {}
+        self._file_stamp = None
+        self._load()
+
+    # ===== Storage =====
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _load(self):
+        self._file_stamp = self._stat()
+        if self._file_stamp is None:
+            self.boxes = []
+            self._fixtures = {}
+            self.closed_months = []
+            return
+        with open(self.path, 'rb') as f:
+            data = fast_json.loads(f.read())
+        self.month = data['month']
+        self.closed_months = data.get('closed_months', [])
+        self._set_boxes([box['players'] for box in data['boxes']])
+        for box, box_data in zip(self.boxes, data['boxes']):
+            for name1, name2, sets1, sets2 in box_data['results']:
+                self._fixtures[box.name][frozenset((name1, name2))].play(sets1, sets2)
+
+    def save(self):
+        """Writes the ladder atomically (temporary file + os.replace)"""
+        data = {
+            'month': self.month,
+            'closed_months': self.closed_months,
+            'boxes': [
+                {
+                    'name': box.name,
+                    'players': [player.name for player in box.players],
+                    'results': [
+                        [match.player1.name, match.player2.name, *match.score]
+                        for match in box.matches if match.score is not None
+                    ],
+                }
+                for box in self.boxes
+            ],
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(fast_json.dumps(data))
+        os.replace(tmp_path, self.path)
+        self._file_stamp = self._stat()
+
+    def refresh_if_stale(self) -> bool:
+        """Reloads the ladder if another process changed the file"""
+        if self._stat() == self._file_stamp:
+            return False
+        self._load()
+        return True
+
+    # ===== Boxes =====
+
+    def _player(self, name: str) -> Player:
+        record = self.player_db.get_player(name) if self.player_db else None
+        return Player(name, level=record['level'] if record else None)
+
+    def _set_boxes(self, boxes: List[List[str]]):
+        """Creates the boxes (with fresh fixtures) from player names, strongest box first"""
+        self.boxes = []
+        self._fixtures = {}
+        for i, names in enumerate(boxes, 1):
+            box = Group(str(i), [self._player(name) for name in names])
+            self.boxes.append(box)
+            self._fixtures[box.name] = {
+                frozenset((match.player1.name, match.player2.name)): match for match in box.matches
+            }
+
+    def create(self, names: List[str], box_size: int = BOX_SIZE):
+        """Starts a ladder: players in ranking order, cut into boxes
+
+        Players that don't fill a whole box are spread one each over the last
+        boxes, so no box is smaller than box_size (unless there are fewer
+        players).
+
+        Raises:
+            ValueError: Duplicate names or fewer than 2 players
+        """
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate player names")
+        if len(names) < 2:
+            raise ValueError("A ladder needs at least 2 players")
+        count = max(1, len(names) // box_size)
+        size, extra = divmod(len(names), count)
+        boxes = []
+        start = 0
+        for i in range(count):
+            end = start + size + (1 if i >= count - extra else 0)
+            boxes.append(names[start:end])
+            start = end
+        self.month = current_month()
+        self.closed_months = []
+        self._set_boxes(boxes)
+
+    def get_box(self, name: str) -> Group:
+        """
+        Raises:
+            KeyError: Unknown box
+        """
+        for box in self.boxes:
+            if box.name == name:
+                return box
+        raise KeyError(name)
+
+    def record_result(self, box_name: str, player1: str, player2: str, sets1: int, sets2: int) -> Match:
+        """
+        Records (or corrects) a box match result
+
+        Raises:
+            KeyError: Unknown box or the players don't meet in the box
+            ValueError: Invalid score
+        """
+        if sorted((sets1, sets2)) not in ([0, 2], [1, 2]):
+            raise ValueError(f"Invalid score: {sets1}-{sets2}")
+        match = self._fixtures[box_name][frozenset((player1, player2))]
+        if match.player1.name != player1:
+            sets1, sets2 = sets2, sets1
+        match.play(sets1, sets2)
+        return match
+
+    # ===== Month end =====
+
+    def close_month(self, promoted: int = PROMOTED, relegated: int = RELEGATED,
+                    month: Optional[str] = None) -> Dict:
+        """
+        Month-end batch: career stats, promotion/relegation, new fixtures
+
+        Args:
+            month: Name of the new month (default: the current one)
+
+        Returns:
+            Summary with the recorded results and player movements
+
+        Raises:
+            ValueError: The new month is already running or was closed
+        """
+        month = month or current_month()
+        if month == self.month or month in self.closed_months:
+            raise ValueError(f"Month {month} is already running or was closed")
+
+        results = []
+        standings = []
+        for box in self.boxes:
+            for match in box.matches:
+                if match.winner is not None:
+                    loser = match.player2 if match.winner is match.player1 else match.player1
+                    results.append((match.winner.name, loser.name))
+            standings.append([player.name for player in box.get_standings()])
+
+        last = len(standings) - 1
+        new_boxes = []
+        movements = []
+        for i, names in enumerate(standings):
+            up = names[:promoted] if i > 0 else []
+            down = names[len(names) - relegated:] if i < last else []
+            stay = [name for name in names if name not in up and name not in down]
+            from_above = standings[i - 1][len(standings[i - 1]) - relegated:] if i > 0 else []
+            from_below = standings[i + 1][:promoted] if i < last else []
+            new_boxes.append(from_above + stay + from_below)
+            movements.extend({'player': name, 'from': i + 1, 'to': i} for name in up)
+            movements.extend({'player': name, 'from': i + 1, 'to': i + 2} for name in down)
+
+        recorded = self.player_db.record_match_results(results) if self.player_db else 0
+        closed = self.month
+        self.closed_months.append(closed)
+        self.month = month
+        self._set_boxes(new_boxes)
+        return {
+            'closed_month': closed,
+            'month': self.month,
+            'results': len(results),
+            'players_updated': recorded,
+            'movements': movements,
+        }
+
+    def to_dict(self) -> Dict:
+        """Boxes with standings and fixtures (for the API)"""
+        return {
+            'month': self.month,
+            'boxes': [
+                {
+                    'name': box.name,
+                    'standings': [
+                        {
+                            'name': player.name,
+                            'level': player.level,
+                            'wins': player.wins,
+                            'losses': player.losses,
+                            'games_won': player.games_won,
+                            'games_lost': player.games_lost,
+                        }
+                        for player in box.get_standings()
+                    ],
+                    'matches': [
+                        {
+                            'player1': match.player1.name,
+                            'player2': match.player2.name,
+                            'score': f"{match.score[0]}-{match.score[1]}" if match.score else None,
+                        }
+                        for match in box.matches
+                    ],
+                }
+                for box in self.boxes
+            ],
+        }
+
+
+def main(argv=None):
+    """Command line interface for the monthly batch (e.g. from cron)"""
+    from players_database import PlayerDatabase
+
+    parser = argparse.ArgumentParser(description="Box-league ladder")
+    parser.add_argument('--file', default=os.environ.get('LADDER_FILE', 'box_league.json'))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('show', help="Print boxes and standings")
+    close_parser = subparsers.add_parser('close-month', help="Run the month-end batch")
+    close_parser.add_argument('--month', help="Name of the new month (default: current)")
+    args = parser.parse_args(argv)
+
+    league = BoxLeague(args.file, PlayerDatabase())
+    if not league.boxes:
+        print(f"No ladder in {args.file}")
+        return 1
+
+    if args.command == 'close-month':
+        try:
+            summary = league.close_month(month=args.month)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        league.save()
+        print(f"Closed {summary['closed_month']}: {summary['results']} results, "
+              f"{len(summary['movements'])} moves")
+        for move in summary['movements']:
+            print(f"   {move['player']}: box {move['from']} -> {move['to']}")
+        return 0
+
+    print(f"Month {league.month}")
+    for box in league.boxes:
+        print(f"Box {box.name}: " + ", ".join(
+            f"{p.name} ({p.wins}-{p.losses})" for p in box.get_standings()
+        ))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
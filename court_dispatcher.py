@@ -0,0 +1,374 @@
+"""
+Live court dispatch: "next match on the first free court"
+
+Instead of fixed hourly slots, an admin marks a court as free and the
+dispatcher starts the best eligible pending match on it. Pending matches sit
+in a heap ordered by (round, rest, group fairness):
+
+    round     - earlier rounds first (playoffs after all group rounds)
+    rest      - the later of the two players' last finish times; rested players first
+    fairness  - matches already dispatched in the match's group; groups take turns
+
+Rest and fairness only ever grow, so keys are re-evaluated lazily: a popped
+entry whose key went stale is pushed back with its current key, and an entry
+whose player is still on court is parked until that player finishes. Each
+dispatch is therefore O(log n) amortized.
+
+Estimated start times come from simulating the queue in priority order on
+the courts (O(n log n) for n pending matches), which leaves a planned queue
+per court. A dispatch that follows the plan only shifts the queue of the
+court involved, O(n / courts): the match that started early or late moves
+everything behind it on that court by the same amount, and when another
+court freed first the two courts trade their remaining queues. The queue is
+simulated again only when the dispatch doesn't follow the plan (a parked
+match, a rebuilt match, new playoff matches) or the average match length
+drifted by ETA_TOLERANCE_MINUTES since the last simulation. The estimates
+are written to ScheduledMatch.time, so the regular schedule payloads stay
+accurate.
+"""
+import heapq
+import itertools
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from tennis_tournament import ScheduledMatch, Tournament, minutes_to_time, time_to_minutes
+from tournament_state import iter_matches
+
+# Match length assumed until real durations are known
+DEFAULT_MATCH_MINUTES = 60
+
+# Playoff rounds are ordered after every group round
+PLAYOFF_ROUND_BASE = 100
+
+# Change of the average match length that makes the estimates be simulated again
+ETA_TOLERANCE_MINUTES = 5
+
+
+class CourtDispatcher:
+    """Assigns pending matches of a tournament to courts as they become free
+
+    Args:
+        tournament: Tournament whose matches are dispatched
+        courts: Court numbers available
+        match_minutes: Expected match length before real durations are known
+    """
+
+    def __init__(self, tournament: Tournament, courts: List[int],
+                 match_minutes: int = DEFAULT_MATCH_MINUTES):
+        self.tournament = tournament
+        self.courts = sorted(courts)
+        self._default_minutes = match_minutes
+
+        # court -> (match id, match, start minute) of the match running on it.
+        # The match object is kept: the id may be rebuilt while it is played
+        self.running: Dict[int, Tuple[str, ScheduledMatch, int]] = {}
+        # Ids of the matches in self.running
+        self._running_ids = set()
+        # Matches that left the court (their result may not be entered yet)
+        self._finished = set()
+        # player name -> minute the player last finished a match
+        self._last_finish: Dict[str, int] = {}
+        # player names currently on court
+        self._busy = set()
+        # group name -> matches dispatched so far
+        self._group_dispatched: Dict[Optional[str], int] = {}
+
+        self._matches: Dict[str, ScheduledMatch] = {}
+        self._rounds: Dict[str, int] = {}
+        self._groups: Dict[str, Optional[str]] = {}
+        self._heap: List[Tuple[tuple, str]] = []
+        # player name -> match ids parked until the player leaves the court
+        self._parked: Dict[str, List[str]] = {}
+        self._queued = set()
+        self._seq = itertools.count()
+
+        self._durations_total = 0
+        self._durations_count = 0
+
+        # Incremented on every change
+        self.version = 0
+        # Estimated (start minute, court) per pending match, and the planned
+        # queue of each court in start order
+        self._eta: Dict[str, Tuple[int, int]] = {}
+        self._plan: Dict[int, Deque[str]] = {}
+        self._plan_valid = False
+        self._plan_minutes = float(match_minutes)
+        # Ids whose estimate changed since the last refresh_schedule
+        self._moved: Set[str] = set()
+
+        self.sync()
+
+    @property
+    def match_minutes(self) -> float:
+        """Average duration of finished dispatched matches (or the default)"""
+        if not self._durations_count:
+            return self._default_minutes
+        return self._durations_total / self._durations_count
+
+    def sync(self) -> List[str]:
+        """
+        Queues scheduled matches the dispatcher doesn't know yet (e.g. playoffs
+        created after the group stage)
+
+        Returns:
+            Ids of newly queued matches
+        """
+        added = []
+        for match_id, match, match_type, key in iter_matches(self.tournament):
+            if match_id in self._matches and self._matches[match_id] is match:
+                if match.score is not None and match_id in self._eta:
+                    # Result entered without a dispatch: drop it from the plan
+                    self._plan_valid = False
+                continue
+            # A rebuilt match (e.g. the final after a corrected semifinal) starts over
+            self._finished.discard(match_id)
+            self._matches[match_id] = match
+            self._groups[match_id] = key if match_type == 'group' else None
+            # Final and third place share a round, after the semifinals
+            if match_type == 'group':
+                self._rounds[match_id] = match.round_num
+            else:
+                self._rounds[match_id] = PLAYOFF_ROUND_BASE + (0 if key == 'semifinal' else 1)
+            if match.score is None and match_id not in self._finished:
+                self._push(match_id)
+                added.append(match_id)
+        if added:
+            self.version += 1
+            self._plan_valid = False
+        return added
+
+    def _key(self, match_id: str) -> tuple:
+        match = self._matches[match_id]
+        rest = max(self._last_finish.get(match.player1.name, -1),
+                   self._last_finish.get(match.player2.name, -1))
+        fairness = self._group_dispatched.get(self._groups[match_id], 0)
+        return (self._rounds[match_id], rest, fairness)
+
+    def _push(self, match_id: str):
+        self._queued.add(match_id)
+        heapq.heappush(self._heap, (self._key(match_id) + (next(self._seq),), match_id))
+
+    def _release(self, player_name: str):
+        """Re-queues matches that waited for a player to leave the court"""
+        self._busy.discard(player_name)
+        for match_id in self._parked.pop(player_name, ()):
+            if match_id not in self._queued and self._matches[match_id].score is None:
+                self._push(match_id)
+
+    def _pop_eligible(self) -> Optional[str]:
+        """Pops the best pending match whose players are both off court"""
+        while self._heap:
+            key, match_id = heapq.heappop(self._heap)
+            self._queued.discard(match_id)
+            match = self._matches.get(match_id)
+            if (match is None or match.score is not None or match_id in self._finished
+                    or match_id in self._running_ids):
+                continue
+
+            current = self._key(match_id)
+            if current != key[:-1]:
+                # Key went stale (a player finished, the group advanced): retry later
+                self._push(match_id)
+                continue
+
+            busy = [p.name for p in (match.player1, match.player2) if p.name in self._busy]
+            if busy:
+                self._parked.setdefault(busy[0], []).append(match_id)
+                continue
+            return match_id
+        return None
+
+    def court_free(self, court: int, now: int) -> Optional[str]:
+        """
+        Marks a court free and starts the next match on it
+
+        Args:
+            court: Court number
+            now: Current time in minutes since midnight
+
+        Returns:
+            Id of the dispatched match, or None if nothing can start now
+
+        Raises:
+            ValueError: Unknown court
+        """
+        if court not in self.courts:
+            raise ValueError(f"Unknown court: {court}")
+
+        finished = self.running.pop(court, None)
+        if finished is not None:
+            match_id, match, started = finished
+            self._running_ids.discard(match_id)
+            current = self._matches.get(match_id)
+            if current is match:
+                self._finished.add(match_id)
+            elif current is not None and current.score is None and match_id not in self._queued:
+                # Rebuilt while on court: the new match was skipped until now
+                self._push(match_id)
+            self._durations_total += max(0, now - started)
+            self._durations_count += 1
+            # The players who actually played leave the court
+            for player in (match.player1, match.player2):
+                self._last_finish[player.name] = now
+                self._release(player.name)
+
+        match_id = self._pop_eligible()
+        self.version += 1
+        if match_id is None:
+            if self._plan.get(court):
+                self._plan_valid = False
+            return None
+
+        match = self._matches[match_id]
+        match.court = court
+        match.time = minutes_to_time(now)
+        self._advance_plan(court, match_id, now)
+        self.running[court] = (match_id, match, now)
+        self._running_ids.add(match_id)
+        self._busy.update((match.player1.name, match.player2.name))
+        group = self._groups[match_id]
+        self._group_dispatched[group] = self._group_dispatched.get(group, 0) + 1
+        return match_id
+
+    def _shift(self, queue: Deque[str], court: int, delta: float, now: int):
+        """Moves the estimates of a planned court queue by delta minutes"""
+        for match_id in queue:
+            start, planned_court = self._eta[match_id]
+            moved = (max(now, int(start + delta)), court)
+            if moved != (start, planned_court):
+                self._eta[match_id] = moved
+                self._moved.add(match_id)
+
+    def _advance_plan(self, court: int, match_id: str, now: int):
+        """Updates the estimates after a dispatch, touching only the affected queues"""
+        if not self._plan_valid:
+            return
+        planned = self._eta.get(match_id)
+        if planned is None or self._plan[planned[1]][0] != match_id:
+            # The dispatch didn't follow the plan
+            self._plan_valid = False
+            return
+
+        start, planned_court = planned
+        queue = self._plan[planned_court]
+        queue.popleft()
+        del self._eta[match_id]
+        self._moved.discard(match_id)
+        if planned_court != court:
+            # This court freed before the planned one: the courts trade queues.
+            # The queue planned here now waits for the match still running
+            # there, which was expected to end when this match would start
+            other = self._plan[court]
+            if other:
+                self._shift(other, planned_court, start - self._eta[other[0]][0], now)
+            self._plan[court], self._plan[planned_court] = queue, other
+        self._shift(queue, court, now - start, now)
+
+    def _simulate(self, now: int):
+        """Plans the whole queue in priority order with the average match length"""
+        minutes = self.match_minutes
+        court_free = {court: now for court in self.courts}
+        player_free: Dict[str, float] = {}
+        for court, (_, match, started) in self.running.items():
+            court_free[court] = max(now, started + minutes)
+            for player in (match.player1, match.player2):
+                player_free[player.name] = court_free[court]
+
+        pending = sorted(
+            (self._key(match_id), match_id)
+            for match_id, match in self._matches.items()
+            if match.score is None and match_id not in self._finished
+            and match_id not in self._running_ids
+        )
+
+        courts = [(free, court) for court, free in court_free.items()]
+        heapq.heapify(courts)
+        eta = {}
+        plan = {court: deque() for court in self.courts}
+        for _, match_id in pending:
+            match = self._matches[match_id]
+            free, court = heapq.heappop(courts)
+            start = max(free, player_free.get(match.player1.name, now),
+                        player_free.get(match.player2.name, now))
+            end = start + minutes
+            player_free[match.player1.name] = player_free[match.player2.name] = end
+            heapq.heappush(courts, (end, court))
+            eta[match_id] = (int(start), court)
+            plan[court].append(match_id)
+
+        self._eta = eta
+        self._plan = plan
+        self._plan_valid = True
+        self._plan_minutes = minutes
+        self._moved = set(eta)
+
+    def estimates(self, now: int) -> Dict[str, Tuple[int, int]]:
+        """
+        Estimated (start minute, court) of every pending match
+
+        Simulated again only when the plan no longer matches the dispatches
+        or the average match length drifted; otherwise kept up to date by
+        court_free.
+        """
+        if (not self._plan_valid
+                or abs(self.match_minutes - self._plan_minutes) >= ETA_TOLERANCE_MINUTES):
+            self._simulate(now)
+        return self._eta
+
+    def refresh_schedule(self, now: int) -> List[str]:
+        """
+        Writes estimated start times into pending ScheduledMatch.time
+
+        Returns:
+            Ids of matches whose time changed
+        """
+        eta = self.estimates(now)
+        changed = []
+        for match_id in self._moved:
+            time = minutes_to_time(min(eta[match_id][0], 24 * 60 - 1))
+            match = self._matches[match_id]
+            if match.time != time:
+                match.time = time
+                changed.append(match_id)
+        self._moved = set()
+        return changed
+
+    def court_status(self) -> List[Dict]:
+        """Courts with their running matches"""
+        return [
+            {
+                'court': court,
+                'match_id': self.running[court][0] if court in self.running else None,
+                'started': minutes_to_time(self.running[court][2]) if court in self.running else None
+            }
+            for court in self.courts
+        ]
+
+    def status(self, now: int) -> Dict:
+        """Courts with their running matches and the estimated queue"""
+        eta = self.estimates(now)
+        return {
+            'courts': self.court_status(),
+            'match_minutes': round(self.match_minutes),
+            'queue': [
+                {'match_id': match_id, 'eta': minutes_to_time(min(start, 24 * 60 - 1)), 'court': court}
+                for match_id, (start, court) in sorted(eta.items(), key=lambda item: item[1])
+            ]
+        }
+
+
+def parse_time(value: Optional[str], default: int) -> int:
+    """Parses "HH:MM" into minutes (default if not given)
+
+    Raises:
+        ValueError: If the value is not a valid time
+    """
+    if not value:
+        return default
+    try:
+        minutes = time_to_minutes(value)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid time: {value}")
+    if not 0 <= minutes < 24 * 60:
+        raise ValueError(f"Invalid time: {value}")
+    return minutes
@@ -0,0 +1,32 @@
+"""
+Fast JSON encoding without web framework dependencies
+
+Uses orjson when it is installed and falls back to the stdlib encoder
+otherwise. Shared by the file stores (player registry, box league) and the
+Flask JSON provider in serialization.py.
+"""
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serializes to compact UTF-8 JSON
+
+    Args:
+        default: Converts objects the encoder doesn't know
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=default, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def loads(data) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,343 @@
+"""
+Tournament format simulation lab
+
+Compares candidate formats (group layout, playoff bracket, match scoring) by
+simulating many seeded tournaments with level-based win probabilities, built
+on the Player/Group/Match classes of tennis_tournament.py. For every format it
+reports total court hours, matches per player and how often the strongest
+player wins the title. Runs are split into chunks and spread over a process
+pool; results don't depend on the number of workers.
+
+Usage:
+    python format_lab.py --list
+    python format_lab.py --runs 100000 --workers 8 --seed 1
+    python format_lab.py --runs 20000 --format "2x5 semis nextgen" --format "4x4 quarters bo3"
+"""
+import argparse
+import math
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from tennis_tournament import Group, Match, Player
+from tournament_batch import LEVEL_STEEPNESS
+
+# Runs simulated per worker task
+DEFAULT_CHUNK_SIZE = 2000
+
+# Distribution of player levels in a simulated field
+FIELD_LEVEL_MEAN = 3.75
+FIELD_LEVEL_SPREAD = 0.4
+FIELD_LEVEL_RANGE = (2.5, 5.0)
+
+
+class Scoring:
+    """Match format: how sets are played, how long they take and how decisive they are
+
+    `strength` scales the level slope of a set: longer sets give the better
+    player more points to assert the difference.
+    """
+
+    def __init__(self, name: str, set_minutes: float, set_strength: float,
+                 decider_minutes: float, decider_strength: float):
+        self.name = name
+        self.set_minutes = set_minutes
+        self.set_strength = set_strength
+        self.decider_minutes = decider_minutes
+        self.decider_strength = decider_strength
+
+
+SCORINGS = {
+    # Current format: 2 sets to 4 games, match tiebreak to 10 at 1-1
+    'nextgen': Scoring('nextgen', set_minutes=25, set_strength=1.0,
+                       decider_minutes=10, decider_strength=0.7),
+    # Best of 3 sets to 6 games
+    'bo3': Scoring('bo3', set_minutes=45, set_strength=math.sqrt(6 / 4),
+                   decider_minutes=45, decider_strength=math.sqrt(6 / 4)),
+}
+
+# Playoff type -> size of the knockout bracket
+PLAYOFFS = {
+    'semis': 4,
+    'quarters': 8,
+}
+
+
+class TournamentFormat:
+    """A candidate format: groups x group size, playoff bracket and scoring"""
+
+    def __init__(self, groups: int, group_size: int, playoff: str = 'semis',
+                 scoring: str = 'nextgen', third_place: bool = True):
+        if playoff not in PLAYOFFS:
+            raise ValueError(f"Unknown playoff type: {playoff}")
+        if scoring not in SCORINGS:
+            raise ValueError(f"Unknown scoring: {scoring}")
+        bracket = PLAYOFFS[playoff]
+        if bracket % groups or bracket // groups > group_size:
+            raise ValueError(f"{playoff} needs {bracket} qualifiers, "
+                             f"which {groups} groups of {group_size} can't provide evenly")
+
+        self.groups = groups
+        self.group_size = group_size
+        self.playoff = playoff
+        self.scoring = scoring
+        self.third_place = third_place
+
+    @property
+    def name(self) -> str:
+        return f"{self.groups}x{self.group_size} {self.playoff} {self.scoring}"
+
+    @property
+    def players(self) -> int:
+        return self.groups * self.group_size
+
+    @property
+    def qualifiers_per_group(self) -> int:
+        return PLAYOFFS[self.playoff] // self.groups
+
+    @property
+    def match_count(self) -> int:
+        """Matches in a tournament: round-robins, knockout and the third-place match"""
+        bracket = PLAYOFFS[self.playoff]
+        group_matches = self.groups * self.group_size * (self.group_size - 1) // 2
+        return group_matches + bracket - 1 + (1 if self.third_place and bracket >= 4 else 0)
+
+    @classmethod
+    def parse(cls, text: str) -> 'TournamentFormat':
+        """Parses a name like "2x5 semis nextgen"
+
+        Raises:
+            ValueError: If the name is not a valid format
+        """
+        try:
+            layout, playoff, scoring = text.split()
+            groups, group_size = map(int, layout.lower().split('x'))
+        except ValueError:
+            raise ValueError(f"Invalid format '{text}', expected e.g. '2x5 semis nextgen'")
+        return cls(groups, group_size, playoff, scoring)
+
+
+def default_formats() -> List[TournamentFormat]:
+    """The standard sweep: 5 group layouts x 2 brackets x 2 scorings"""
+    return [
+        TournamentFormat(groups, size, playoff, scoring)
+        for groups, size in ((2, 5), (4, 4), (2, 6), (4, 3), (2, 4))
+        for playoff in PLAYOFFS
+        for scoring in SCORINGS
+    ]
+
+
+def bracket_order(size: int) -> List[int]:
+    """Seed positions of a knockout bracket where seeds 1 and 2 can only meet in the final"""
+    order = [1]
+    while len(order) < size:
+        n = len(order) * 2 + 1
+        order = [seed for s in order for seed in (s, n - s)]
+    return order
+
+
+def play_match(rng: random.Random, scoring: Scoring, player1: Player,
+               player2: Player) -> Tuple[int, int, float]:
+    """Simulates a match
+
+    Returns:
+        (sets of player 1, sets of player 2, duration in minutes)
+    """
+    slope = LEVEL_STEEPNESS * (player1.level - player2.level)
+    p_set = 1 / (1 + math.exp(-slope * scoring.set_strength))
+
+    p1_sets = p2_sets = 0
+    minutes = 0.0
+    while p1_sets < 2 and p2_sets < 2:
+        if p1_sets == p2_sets == 1:
+            p = 1 / (1 + math.exp(-slope * scoring.decider_strength))
+            minutes += scoring.decider_minutes
+        else:
+            p = p_set
+            minutes += scoring.set_minutes
+        if rng.random() < p:
+            p1_sets += 1
+        else:
+            p2_sets += 1
+    return p1_sets, p2_sets, minutes
+
+
+def simulate(fmt: TournamentFormat, rng: random.Random) -> Dict:
+    """Simulates one tournament in the given format with a random field
+
+    Returns:
+        Court minutes, matches played per player and whether the strongest player won
+    """
+    low, high = FIELD_LEVEL_RANGE
+    players = [
+        Player(f"P{i + 1}", seed=i + 1,
+               level=min(high, max(low, rng.gauss(FIELD_LEVEL_MEAN, FIELD_LEVEL_SPREAD))))
+        for i in range(fmt.players)
+    ]
+    strongest = max(players, key=lambda p: p.level)
+    scoring = SCORINGS[fmt.scoring]
+    matches_played = dict.fromkeys(players, 0)
+    court_minutes = 0.0
+
+    def play(match: Match, update_stats: bool):
+        nonlocal court_minutes
+        p1_sets, p2_sets, minutes = play_match(rng, scoring, match.player1, match.player2)
+        match.play(p1_sets, p2_sets, update_stats)
+        court_minutes += minutes
+        matches_played[match.player1] += 1
+        matches_played[match.player2] += 1
+
+    # Snake draw by level, as seeded groups would be
+    ranked = sorted(players, key=lambda p: p.level, reverse=True)
+    groups = [[] for _ in range(fmt.groups)]
+    for i, player in enumerate(ranked):
+        row, col = divmod(i, fmt.groups)
+        groups[col if row % 2 == 0 else fmt.groups - 1 - col].append(player)
+    groups = [Group(chr(ord('A') + i), members) for i, members in enumerate(groups)]
+
+    for group in groups:
+        for match in group.matches:
+            play(match, True)
+
+    # Seeds: all group winners first, then runners-up, ... (crossover pairing)
+    standings = [group.get_standings() for group in groups]
+    seeds = [table[place] for place in range(fmt.qualifiers_per_group) for table in standings]
+    bracket = [seeds[seed - 1] for seed in bracket_order(len(seeds))]
+
+    semifinal_losers: List[Player] = []
+    while len(bracket) > 1:
+        winners, losers = [], []
+        for player1, player2 in zip(bracket[::2], bracket[1::2]):
+            match = Match(player1, player2)
+            play(match, False)
+            winners.append(match.winner)
+            losers.append(player2 if match.winner is player1 else player1)
+        if len(bracket) == 4:
+            semifinal_losers = losers
+        bracket = winners
+
+    if fmt.third_place and len(semifinal_losers) == 2:
+        play(Match(semifinal_losers[0], semifinal_losers[1]), False)
+
+    played = sum(matches_played.values()) // 2
+    if played != fmt.match_count:
+        raise RuntimeError(f"{fmt.name}: simulated {played} matches, expected {fmt.match_count}")
+
+    return {
+        'court_minutes': court_minutes,
+        'matches': list(matches_played.values()),
+        'strongest_won': bracket[0] is strongest,
+    }
+
+
+def _simulate_chunk(fmt: TournamentFormat, start: int, count: int, seed) -> Dict:
+    """Simulates runs start..start+count of a format (worker entry point)"""
+    totals = {
+        'runs': 0, 'court_minutes': 0.0, 'player_matches': 0,
+        'min_matches': math.inf, 'max_matches': 0, 'strongest_titles': 0,
+    }
+    for i in range(start, start + count):
+        # Per-run seeds keep results independent of the chunking
+        rng = random.Random(None if seed is None else f"{seed}:{fmt.name}:{i}")
+        result = simulate(fmt, rng)
+        totals['runs'] += 1
+        totals['court_minutes'] += result['court_minutes']
+        totals['player_matches'] += sum(result['matches'])
+        totals['min_matches'] = min(totals['min_matches'], min(result['matches']))
+        totals['max_matches'] = max(totals['max_matches'], max(result['matches']))
+        totals['strongest_titles'] += result['strongest_won']
+    return totals
+
+
+def _merge(totals: Dict, chunk: Dict):
+    for key in ('runs', 'court_minutes', 'player_matches', 'strongest_titles'):
+        totals[key] += chunk[key]
+    totals['min_matches'] = min(totals['min_matches'], chunk['min_matches'])
+    totals['max_matches'] = max(totals['max_matches'], chunk['max_matches'])
+
+
+def run_lab(formats: List[TournamentFormat], runs: int, seed=None,
+            workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Dict]:
+    """
+    Simulates every format over `runs` tournaments across a process pool
+
+    Args:
+        formats: Formats to compare
+        runs: Tournaments simulated per format
+        seed: Base seed; the same seed gives the same report for any worker count
+        workers: Number of processes (CPU count by default; 1 runs in-process)
+        chunk_size: Runs per worker task
+
+    Returns:
+        One report row per format, in the given order
+    """
+    tasks = [(fmt, start, min(chunk_size, runs - start), seed)
+             for fmt in formats for start in range(0, runs, chunk_size)]
+    totals = {
+        fmt.name: {'runs': 0, 'court_minutes': 0.0, 'player_matches': 0,
+                   'min_matches': math.inf, 'max_matches': 0, 'strongest_titles': 0}
+        for fmt in formats
+    }
+
+    if workers == 1:
+        chunks = map(_simulate_chunk, *zip(*tasks))
+        for (fmt, _, _, _), chunk in zip(tasks, chunks):
+            _merge(totals[fmt.name], chunk)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = executor.map(_simulate_chunk, *zip(*tasks))
+            for (fmt, _, _, _), chunk in zip(tasks, chunks):
+                _merge(totals[fmt.name], chunk)
+
+    report = []
+    for fmt in formats:
+        t = totals[fmt.name]
+        report.append({
+            'format': fmt.name,
+            'players': fmt.players,
+            'runs': t['runs'],
+            'court_hours': t['court_minutes'] / 60 / t['runs'],
+            'matches_per_player': t['player_matches'] / fmt.players / t['runs'],
+            'min_matches': t['min_matches'],
+            'max_matches': t['max_matches'],
+            'strongest_win_rate': t['strongest_titles'] / t['runs'],
+        })
+    return report
+
+
+def main(argv=None):
+    """Command line interface of the format lab"""
+    parser = argparse.ArgumentParser(description="Compare tournament formats by simulation")
+    parser.add_argument('--runs', type=int, default=10000, help="Tournaments per format")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--format', action='append', dest='formats', metavar='FORMAT',
+                        help="Format to simulate, e.g. '2x5 semis nextgen' (repeatable; default: full sweep)")
+    parser.add_argument('--list', action='store_true', help="List the default formats and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for fmt in default_formats():
+            print(fmt.name)
+        return 0
+
+    try:
+        formats = [TournamentFormat.parse(text) for text in args.formats] if args.formats else default_formats()
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    report = run_lab(formats, args.runs, args.seed, args.workers, args.chunk_size)
+
+    print(f"{'Format':<22} {'Players':>7} {'Court h':>8} {'Matches/pl':>10} {'Range':>7} {'Top wins':>9}")
+    for row in report:
+        matches_range = f"{row['min_matches']}-{row['max_matches']}"
+        print(f"{row['format']:<22} {row['players']:>7} {row['court_hours']:>8.1f} "
+              f"{row['matches_per_player']:>10.2f} {matches_range:>7} {row['strongest_win_rate']:>9.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration
+
+The app is imported once in the master (preload_app), so players.json is
+parsed and the search/leaderboard indexes are built a single time; workers
+are forked with the registry already in memory and share it copy-on-write.
+Garbage collection is disabled while preloading and the heap is frozen
+before forking, so collections in the workers don't touch (and copy) the
+pages of the shared objects. Workers reload the registry only when another
+worker writes players.json (see PlayerDatabase.refresh_if_stale).
+"""
+import gc
+import os
+import sys
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# The tournament itself lives in process memory, so each worker has its own
+# tournament; keep one worker unless the tournament is not used
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+preload_app = True
+
+# No collections while the app is imported: avoids freed "holes" in pages
+# that are about to be shared with the workers
+gc.disable()
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far to the permanent generation
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+    # Background threads (static export, notifications) started in the
+    # master would not survive the fork, so every worker starts its own
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.start_background_workers()
@@ -0,0 +1,115 @@
+"""
+Pre-sorted leaderboard views over the player registry
+
+One sorted list per sort key is kept up to date as players are added,
+changed or removed (bisect insert/delete), so a page of the leaderboard is a
+slice of an already sorted list instead of a sort per request. Pages are
+addressed with opaque cursors (the position of the last returned entry), which
+stay valid while the registry changes.
+"""
+import base64
+import json
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+
+def win_rate(player: Dict) -> float:
+    total = player['total_wins'] + player['total_losses']
+    return player['total_wins'] / total * 100 if total > 0 else 0.0
+
+
+# Sort key name -> value extracted from a player record
+SORT_KEYS = {
+    'level': lambda p: p['level'],
+    'win_rate': win_rate,
+    'tournaments_played': lambda p: p['tournaments_played'],
+    'wins': lambda p: p['total_wins'],
+}
+
+
+class Leaderboard:
+    """Sorted views of players, one per sort key
+
+    Each view holds (-value, name) tuples in ascending order, i.e. players from
+    the highest value down, ties broken by name.
+    """
+
+    def __init__(self, players: Dict[str, Dict]):
+        self._views: Dict[str, List[Tuple[float, str]]] = {}
+        self._entries: Dict[str, Dict[str, Tuple[float, str]]] = {}
+
+        for key, value in SORT_KEYS.items():
+            entries = {name: (-value(p), name) for name, p in players.items()}
+            self._entries[key] = entries
+            self._views[key] = sorted(entries.values())
+
+    def update(self, player: Dict):
+        """Adds a player or re-positions it after its stats changed"""
+        name = player['name']
+        for key, value in SORT_KEYS.items():
+            entry = (-value(player), name)
+            old = self._entries[key].get(name)
+            if old == entry:
+                continue
+            view = self._views[key]
+            if old is not None:
+                del view[bisect_left(view, old)]
+            insort(view, entry)
+            self._entries[key][name] = entry
+
+    def remove(self, name: str):
+        """Removes a player from all views"""
+        for key in SORT_KEYS:
+            old = self._entries[key].pop(name, None)
+            if old is not None:
+                view = self._views[key]
+                del view[bisect_left(view, old)]
+
+    def page(self, sort: str = 'level', descending: bool = True, limit: int = 50,
+             cursor: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+        """
+        Returns one page of player names and the cursor of the next page
+
+        Raises:
+            ValueError: Unknown sort key or invalid cursor
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+
+        view = self._views[sort]
+        after = self._decode_cursor(cursor, sort, descending) if cursor else None
+
+        if descending:
+            start = bisect_right(view, after) if after else 0
+            entries = view[start:start + limit]
+            more = start + limit < len(view)
+        else:
+            end = bisect_left(view, after) if after else len(view)
+            entries = view[max(0, end - limit):end][::-1]
+            more = end - limit > 0
+
+        next_cursor = None
+        if more and entries:
+            next_cursor = self._encode_cursor(entries[-1], sort, descending)
+        return [name for _, name in entries], next_cursor
+
+    @staticmethod
+    def _encode_cursor(entry: Tuple[float, str], sort: str, descending: bool) -> str:
+        raw = json.dumps([sort, descending, entry[0], entry[1]], ensure_ascii=False)
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[float, str]:
+        try:
+            cursor_sort, cursor_descending, value, name = json.loads(
+                base64.urlsafe_b64decode(cursor.encode('ascii'))
+            )
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if cursor_sort != sort or cursor_descending != descending:
+            raise ValueError("Cursor belongs to a different sort order")
+        # Every sort key is numeric (bool is an int, but never a sort value)
+        if (not isinstance(value, (int, float)) or isinstance(value, bool)
+                or not isinstance(name, str)):
+            raise ValueError("Invalid cursor")
+        return (value, name)
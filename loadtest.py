@@ -0,0 +1,386 @@
+"""
+Finals-day load test
+
+Starts the app under gunicorn on localhost (or targets --url) and replays a
+finals-day traffic mix with a stdlib asyncio HTTP client:
+
+    spectators  poll /api/tournament/info and /api/tournament/schedule
+    admins      submit every group result, set up and play the playoffs
+    burst       many clients hit /api/results as soon as the final is in
+
+It reports p50/p95/p99 latency, error rate and throughput per route, then
+checks that the standings served by the app match the submitted results.
+Nothing outside localhost is involved. The spawned server works on a copy of
+players.json in a temporary directory.
+
+Usage:
+    python loadtest.py --spectators 1000 --workers 1
+    python loadtest.py --url http://127.0.0.1:5001 --spectators 200
+
+Many spectators need many sockets: raise the open files limit (ulimit -n)
+above the spectator count.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+VALID_SCORES = ['2-0', '2-1', '1-2', '0-2']
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class Stats:
+    """Latencies and errors per route"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+
+    def record(self, route: str, seconds: float, ok: bool):
+        self.latencies[route].append(seconds)
+        if not ok:
+            self.errors[route] += 1
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        lines = [f"{'Route':<34} {'Requests':>8} {'Err %':>6} {'Req/s':>8} "
+                 f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+        for route in sorted(self.latencies):
+            samples = sorted(self.latencies[route])
+            count = len(samples)
+            lines.append(
+                f"{route:<34} {count:>8} {self.errors[route] / count:>6.1%} {count / elapsed:>8.1f} "
+                f"{percentile(samples, 50):>8.1f} {percentile(samples, 95):>8.1f} "
+                f"{percentile(samples, 99):>8.1f}"
+            )
+        return '\n'.join(lines)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted samples, in milliseconds"""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[rank] * 1000
+
+
+class HttpClient:
+    """Minimal HTTP/1.1 client over one (reopened as needed) connection"""
+
+    def __init__(self, host: str, port: int, stats: Stats):
+        self.host = host
+        self.port = port
+        self.stats = stats
+        self.cookie: Optional[str] = None
+        self._reader = None
+        self._writer = None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+            self._reader = self._writer = None
+
+    async def request(self, method: str, path: str, body=None,
+                      route: Optional[str] = None) -> Tuple[int, Optional[dict]]:
+        """Sends a request; returns (status, parsed JSON body or None)
+
+        Status 0 means a connection error.
+        """
+        route = route or f"{method} {path.split('?')[0]}"
+        payload = json.dumps(body).encode() if body is not None else b''
+        headers = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Accept: application/json",
+            f"Content-Length: {len(payload)}",
+        ]
+        if body is not None:
+            headers.append("Content-Type: application/json")
+        if self.cookie:
+            headers.append(f"Cookie: {self.cookie}")
+        raw = ('\r\n'.join(headers) + '\r\n\r\n').encode() + payload
+
+        started = time.perf_counter()
+        try:
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            self._writer.write(raw)
+            await self._writer.drain()
+            status, response_headers, data = await self._read_response()
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            await self.close()
+            self.stats.record(route, time.perf_counter() - started, False)
+            return 0, None
+        self.stats.record(route, time.perf_counter() - started, status < 500)
+
+        if 'set-cookie' in response_headers:
+            self.cookie = response_headers['set-cookie'].split(';', 1)[0]
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+
+        try:
+            return status, json.loads(data) if data else None
+        except ValueError:
+            return status, None
+
+    async def _read_response(self):
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b'', None)
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            data = await self._reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            data = b''
+            while True:
+                size = int((await self._reader.readline()).strip(), 16)
+                chunk = await self._reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                data += chunk[:-2]
+        else:
+            data = await self._reader.read()
+            headers['connection'] = 'close'
+        return status, headers, data
+
+
+class Expected:
+    """Standings expected from the results the admins submitted"""
+
+    def __init__(self):
+        self.players: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0, 0])
+        self.final_winner: Optional[str] = None
+
+    def add_group_result(self, player1: str, player2: str, score: str):
+        sets1, sets2 = map(int, score.split('-'))
+        winner, loser = (player1, player2) if sets1 > sets2 else (player2, player1)
+        self.players[winner][0] += 1
+        self.players[loser][1] += 1
+        for name, won, lost in ((player1, sets1, sets2), (player2, sets2, sets1)):
+            self.players[name][2] += won
+            self.players[name][3] += lost
+
+    def check(self, info: dict, results: Optional[dict]) -> List[str]:
+        """Returns the differences between the served and the expected state"""
+        if not info or 'groups' not in info:
+            return ["Tournament info is not available"]
+        problems = []
+        for group in info['groups']:
+            keys = []
+            for player in group['players']:
+                served = [player['wins'], player['losses'], player['games_won'], player['games_lost']]
+                expected = self.players.get(player['name'], [0, 0, 0, 0])
+                if served != expected:
+                    problems.append(f"{player['name']}: served W/L/sets {served}, expected {expected}")
+                keys.append((player['wins'], player['game_difference'], player['games_won']))
+            if keys != sorted(keys, reverse=True):
+                problems.append(f"Group {group['name']} standings are not sorted")
+
+        if self.final_winner is not None:
+            champion = results.get('champion') if results else None
+            if champion != self.final_winner:
+                problems.append(f"Champion is {champion}, expected {self.final_winner}")
+        return problems
+
+
+async def spectator(client: HttpClient, rng: random.Random, interval: float, stop: asyncio.Event):
+    """Polls the public tournament views until stopped"""
+    paths = ['/api/tournament/info', '/api/tournament/schedule']
+    await asyncio.sleep(rng.random() * interval)
+    while not stop.is_set():
+        await client.request('GET', rng.choice(paths))
+        try:
+            await asyncio.wait_for(stop.wait(), rng.uniform(0.5, 1.5) * interval)
+        except asyncio.TimeoutError:
+            pass
+    await client.close()
+
+
+async def submit_group_results(client: HttpClient, matches: List[dict], expected: Expected,
+                               rng: random.Random, interval: float):
+    for match in matches:
+        score = rng.choice(VALID_SCORES)
+        status, _ = await client.request('POST', '/api/match/submit', {
+            'player1': match['player1'], 'player2': match['player2'], 'score': score, 'type': 'group'
+        })
+        if status == 200:
+            expected.add_group_result(match['player1'], match['player2'], score)
+        await asyncio.sleep(interval)
+
+
+async def submit_playoff(client: HttpClient, playoff_type: str, rng: random.Random) -> Optional[str]:
+    """Plays every playoff match of a type; returns the winner of the last one"""
+    _, data = await client.request('GET', '/api/tournament/schedule')
+    winner = None
+    for match in (data or {}).get('schedule', []):
+        if match.get('playoff_type') != playoff_type:
+            continue
+        score = rng.choice(VALID_SCORES)
+        await client.request('POST', '/api/playoffs/match', {
+            'player1': match['player1'], 'player2': match['player2'],
+            'score': score, 'playoff_type': playoff_type
+        })
+        sets1, sets2 = map(int, score.split('-'))
+        winner = match['player1'] if sets1 > sets2 else match['player2']
+    return winner
+
+
+async def results_burst(host: str, port: int, stats: Stats, count: int):
+    """Many fresh clients asking for the results at once"""
+    clients = [HttpClient(host, port, stats) for _ in range(count)]
+    await asyncio.gather(*(client.request('GET', '/api/results') for client in clients))
+    await asyncio.gather(*(client.close() for client in clients))
+
+
+async def run(host: str, port: int, args) -> int:
+    stats = Stats()
+    rng = random.Random(args.seed)
+    expected = Expected()
+
+    admins = [HttpClient(host, port, stats) for _ in range(args.admins)]
+    for admin in admins:
+        status, _ = await admin.request('POST', '/api/auth/login', {'password': args.password})
+        if status != 200:
+            print("Admin login failed", file=sys.stderr)
+            return 1
+    await admins[0].request('POST', '/api/tournament/new')
+    _, info = await admins[0].request('GET', '/api/tournament/info')
+    if not info or 'group_matches' not in info:
+        # The tournament lives in the memory of the worker that created it
+        print("The new tournament is not visible to the next request "
+              "(more than one worker?)", file=sys.stderr)
+        return 1
+
+    stop = asyncio.Event()
+    spectators = [
+        asyncio.create_task(spectator(HttpClient(host, port, stats), random.Random(rng.random()),
+                                      args.poll_interval, stop))
+        for _ in range(args.spectators)
+    ]
+
+    # Admins share the group matches and submit concurrently
+    matches = info['group_matches']
+    await asyncio.gather(*(
+        submit_group_results(admin, matches[i::len(admins)], expected,
+                             random.Random(rng.random()), args.submit_interval)
+        for i, admin in enumerate(admins)
+    ))
+
+    admin = admins[0]
+    await admin.request('POST', '/api/playoffs/setup')
+    await submit_playoff(admin, 'semifinal', rng)
+    await submit_playoff(admin, 'third_place', rng)
+    expected.final_winner = await submit_playoff(admin, 'final', rng)
+    await results_burst(host, port, stats, args.burst)
+
+    await asyncio.sleep(args.tail)
+    stop.set()
+    await asyncio.gather(*spectators)
+
+    _, info = await admin.request('GET', '/api/tournament/info')
+    _, results = await admin.request('GET', '/api/results')
+    for client in admins:
+        await client.close()
+
+    print(stats.report())
+    problems = expected.check(info, results)
+    if problems:
+        print("\nState check FAILED:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print("\nState check passed: standings and champion match the submitted results")
+    return 0
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+def spawn_server(workers: int, workdir: str) -> Tuple[subprocess.Popen, int]:
+    """Starts gunicorn with the project config on a free localhost port"""
+    port = free_port()
+    players_file = os.path.join(ROOT, 'players.json')
+    if os.path.exists(players_file):
+        shutil.copy(players_file, workdir)
+    command = [
+        sys.executable, '-m', 'gunicorn', 'app:app',
+        '--config', os.path.join(ROOT, 'gunicorn.conf.py'),
+        '--chdir', workdir, '--pythonpath', ROOT,
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+        '--log-level', 'warning',
+    ]
+    # Every simulated client comes from localhost: no per-client rate limits
+    process = subprocess.Popen(command, env={**os.environ, 'RATE_LIMITS': 'off'})
+    wait_for_port(port)
+    return process, port
+
+
+def main(argv=None):
+    """Command line interface of the load test"""
+    parser = argparse.ArgumentParser(description="Finals-day load test against a local server")
+    parser.add_argument('--url', help="Target an already running server instead of spawning gunicorn")
+    parser.add_argument('--workers', type=int, default=1, help="Gunicorn workers of the spawned server")
+    parser.add_argument('--spectators', type=int, default=500)
+    parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds between spectator polls")
+    parser.add_argument('--admins', type=int, default=2)
+    parser.add_argument('--submit-interval', type=float, default=0.2, help="Seconds between admin submissions")
+    parser.add_argument('--burst', type=int, default=500, help="Clients requesting /api/results after the final")
+    parser.add_argument('--tail', type=float, default=2.0, help="Seconds of polling after the burst")
+    parser.add_argument('--password', default=os.environ.get('ADMIN_PASSWORD', 'tennis2024'))
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.url:
+        parts = urlsplit(args.url)
+        return asyncio.run(run(parts.hostname, parts.port or 80, args))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        process, port = spawn_server(args.workers, workdir)
+        try:
+            return asyncio.run(run('127.0.0.1', port, args))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,400 @@
+"""
+Columnar archive of completed tournaments and club analytics over it
+
+Played matches are appended to one binary file per column (integer player
+ids, levels at the time of the match, set scores, stage, court, start
+minute), read back as NumPy memory maps. Analytics are vectorized
+aggregations over whole columns, so a season of a million matches is queried
+in milliseconds without building a single Match object.
+
+Directory layout:
+    players.json      player names, id = index
+    tournaments.json  one entry per archived tournament (rows [first_row, first_row + matches))
+    <column>.bin      raw little-endian column data
+
+tournaments.json is written last and bounds the readable rows, so a crash in
+the middle of an append leaves the archive consistent. Each entry keeps a
+digest of the tournament's matches, and appending a tournament whose digest
+is already there does nothing: archiving is idempotent across restarts and
+worker processes (appends are serialized with a lock file where fcntl is
+available).
+
+Usage:
+    python match_archive.py stats [--dir archive]
+    python match_archive.py simulate -n 40000 [--dir archive] [--seed 1]
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from match_table import NO_SCORE, STAGE_FINAL, STAGE_GROUP, STAGE_SEMIFINAL, STAGE_THIRD_PLACE, MatchTable
+
+COLUMNS = {
+    'tournament': np.uint32,
+    'player1': np.uint32,
+    'player2': np.uint32,
+    'level1': np.float32,
+    'level2': np.float32,
+    'score1': np.int8,
+    'score2': np.int8,
+    'stage': np.uint8,
+    'court': np.uint8,
+    'minutes': np.uint16,
+}
+
+STAGE_NAMES = {
+    STAGE_GROUP: 'group',
+    STAGE_SEMIFINAL: 'semifinal',
+    STAGE_THIRD_PLACE: 'third_place',
+    STAGE_FINAL: 'final',
+}
+
+# Level gap buckets for upset rates
+LEVEL_GAP_BINS = [0.0, 0.25, 0.5, 1.0, 1.5, 2.0, np.inf]
+
+# Length of a match slot, used for court utilization
+MATCH_MINUTES = 60
+
+
+class MatchArchive:
+    """Append-only columnar match archive in a directory"""
+
+    def __init__(self, path: str = 'archive'):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+        self._load()
+
+    def _load(self):
+        """(Re)reads the player and tournament lists (another process may have appended)"""
+        self.players: List[str] = self._read_json('players.json', [])
+        self._player_ids: Dict[str, int] = {name: i for i, name in enumerate(self.players)}
+        self.tournaments: List[Dict] = self._read_json('tournaments.json', [])
+        self._digests = {t['digest'] for t in self.tournaments if 'digest' in t}
+        self._columns = None
+
+    @contextlib.contextmanager
+    def _append_lock(self):
+        """Exclusive lock on the archive for the duration of an append"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.path, '.lock'), 'w') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_json(self, filename: str, default):
+        try:
+            with open(os.path.join(self.path, filename), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+
+    def _write_json(self, filename: str, data):
+        path = os.path.join(self.path, filename)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        if not self.tournaments:
+            return 0
+        last = self.tournaments[-1]
+        return last['first_row'] + last['matches']
+
+    def _player_id(self, name: str) -> int:
+        player_id = self._player_ids.get(name)
+        if player_id is None:
+            player_id = len(self.players)
+            self.players.append(name)
+            self._player_ids[name] = player_id
+        return player_id
+
+    @staticmethod
+    def digest(table: MatchTable) -> str:
+        """Identifies a tournament by its played matches (players, levels, scores, slots)"""
+        played = np.frombuffer(table.score1, dtype=np.int8) != NO_SCORE
+        h = hashlib.blake2b(digest_size=16)
+        h.update(json.dumps(table.player_names, ensure_ascii=False).encode('utf-8'))
+        h.update(bytes(table.player_levels))
+        for column in (table.player1, table.player2):
+            h.update(np.frombuffer(column, dtype=np.uint32)[played].tobytes())
+        for column, dtype in ((table.score1, np.int8), (table.score2, np.int8),
+                              (table.stage, np.uint8), (table.court, np.uint8),
+                              (table.minutes, np.uint16)):
+            h.update(np.frombuffer(column, dtype=dtype)[played].tobytes())
+        return h.hexdigest()
+
+    def append(self, table: MatchTable, archived_at: Optional[str] = None) -> Optional[int]:
+        """
+        Archives the played matches of a tournament
+
+        Returns:
+            Number of archived matches, or None if the tournament is already archived
+        """
+        digest = self.digest(table)
+        with self._append_lock():
+            self._load()
+            if digest in self._digests:
+                return None
+            return self._append(table, digest, archived_at)
+
+    def _append(self, table: MatchTable, digest: str, archived_at: Optional[str]) -> int:
+        score1 = np.frombuffer(table.score1, dtype=np.int8)
+        played = score1 != NO_SCORE
+        count = int(played.sum())
+        if not count:
+            return 0
+
+        local_ids = np.array([self._player_id(name) for name in table.player_names], dtype=np.uint32)
+        levels = np.frombuffer(table.player_levels, dtype=np.float32)
+        player1 = np.frombuffer(table.player1, dtype=np.uint32)[played]
+        player2 = np.frombuffer(table.player2, dtype=np.uint32)[played]
+        tournament_id = len(self.tournaments)
+
+        values = {
+            'tournament': np.full(count, tournament_id),
+            'player1': local_ids[player1],
+            'player2': local_ids[player2],
+            'level1': levels[player1],
+            'level2': levels[player2],
+            'score1': score1[played],
+            'score2': np.frombuffer(table.score2, dtype=np.int8)[played],
+            'stage': np.frombuffer(table.stage, dtype=np.uint8)[played],
+            'court': np.frombuffer(table.court, dtype=np.uint8)[played],
+            'minutes': np.frombuffer(table.minutes, dtype=np.uint16)[played],
+        }
+
+        first_row = len(self)
+        item_bytes = {name: np.dtype(dtype).itemsize for name, dtype in COLUMNS.items()}
+        for name, dtype in COLUMNS.items():
+            path = os.path.join(self.path, f"{name}.bin")
+            with open(path, 'ab') as f:
+                # Drop the tail of an interrupted append before writing
+                f.truncate(first_row * item_bytes[name])
+                f.write(np.ascontiguousarray(values[name], dtype=dtype).tobytes())
+
+        self._write_json('players.json', self.players)
+        self.tournaments.append({
+            'id': tournament_id,
+            'archived_at': archived_at or datetime.now().isoformat(),
+            'first_row': first_row,
+            'matches': count,
+            'digest': digest,
+        })
+        self._write_json('tournaments.json', self.tournaments)
+        self._digests.add(digest)
+        self._columns = None
+        return count
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Memory-mapped columns (read-only), cached until the next append"""
+        if self._columns is None:
+            rows = len(self)
+            self._columns = {}
+            for name, dtype in COLUMNS.items():
+                if rows:
+                    self._columns[name] = np.memmap(os.path.join(self.path, f"{name}.bin"),
+                                                    dtype=dtype, mode='r', shape=(rows,))
+                else:
+                    self._columns[name] = np.empty(0, dtype=dtype)
+        return self._columns
+
+    # ===== Analytics =====
+
+    def summary(self) -> Dict:
+        return {
+            'tournaments': len(self.tournaments),
+            'matches': len(self),
+            'players': len(self.players),
+        }
+
+    def _level_gap(self):
+        """Level gap (player1 - player2) and the mask of matches where both levels are known"""
+        c = self.columns()
+        gap = c['level1'].astype(np.float64) - c['level2']
+        known = (c['level1'] > 0) & (c['level2'] > 0)
+        return gap, known
+
+    def upset_rates(self) -> Dict:
+        """How often the lower-level player wins, by level gap"""
+        c = self.columns()
+        gap, known = self._level_gap()
+        p1_won = c['score1'] > c['score2']
+        rated = known & (gap != 0)
+        upset = np.where(gap > 0, ~p1_won, p1_won) & rated
+
+        bucket = np.digitize(np.abs(gap), LEVEL_GAP_BINS[1:-1], right=True)
+        matches = np.bincount(bucket[rated], minlength=len(LEVEL_GAP_BINS) - 1)
+        upsets = np.bincount(bucket[upset], minlength=len(LEVEL_GAP_BINS) - 1)
+
+        buckets = []
+        for i in range(len(LEVEL_GAP_BINS) - 1):
+            low, high = LEVEL_GAP_BINS[i], LEVEL_GAP_BINS[i + 1]
+            buckets.append({
+                'gap_from': low,
+                'gap_to': None if np.isinf(high) else high,
+                'matches': int(matches[i]),
+                'upsets': int(upsets[i]),
+                'upset_rate': float(upsets[i] / matches[i]) if matches[i] else None,
+            })
+        return {
+            'rated_matches': int(rated.sum()),
+            'equal_level_matches': int((known & (gap == 0)).sum()),
+            'upset_rate': float(upset.sum() / rated.sum()) if rated.any() else None,
+            'buckets': buckets,
+        }
+
+    def level_prediction(self) -> Dict:
+        """How well the level gap predicts the winner
+
+        The model probability is the match win probability from the logistic
+        per-set model used by the simulators (best of three sets).
+        """
+        from tournament_batch import LEVEL_STEEPNESS
+
+        c = self.columns()
+        gap, known = self._level_gap()
+        gap = gap[known]
+        p1_won = (c['score1'] > c['score2'])[known].astype(np.float64)
+        p_set = 1 / (1 + np.exp(-LEVEL_STEEPNESS * gap))
+        p_match = p_set ** 2 * (3 - 2 * p_set)
+
+        rated = gap != 0
+        accuracy = float(((gap > 0) == (p1_won == 1))[rated].mean()) if rated.any() else None
+        brier = float(np.mean((p_match - p1_won) ** 2)) if len(gap) else None
+
+        # Calibration: predicted vs observed win rate per 10% probability bucket
+        favourite_p = np.maximum(p_match, 1 - p_match)
+        favourite_won = np.where(p_match >= 0.5, p1_won, 1 - p1_won)
+        bucket = np.minimum((favourite_p * 10).astype(np.int64), 9)
+        counts = np.bincount(bucket, minlength=10)
+        predicted = np.bincount(bucket, weights=favourite_p, minlength=10)
+        observed = np.bincount(bucket, weights=favourite_won, minlength=10)
+        calibration = [
+            {
+                'probability_from': i / 10,
+                'matches': int(counts[i]),
+                'predicted': float(predicted[i] / counts[i]),
+                'observed': float(observed[i] / counts[i]),
+            }
+            for i in range(5, 10) if counts[i]
+        ]
+        return {'matches': len(gap), 'accuracy': accuracy, 'brier_score': brier,
+                'calibration': calibration}
+
+    def tiebreaks(self) -> Dict:
+        """How often matches go to the deciding match tiebreak (1-1 in sets), per stage"""
+        c = self.columns()
+        decided = (c['score1'].astype(np.int16) + c['score2']) == 3
+        matches = np.bincount(c['stage'], minlength=len(STAGE_NAMES))
+        tiebreaks = np.bincount(c['stage'][decided], minlength=len(STAGE_NAMES))
+        return {
+            'matches': len(decided),
+            'tiebreaks': int(decided.sum()),
+            'tiebreak_rate': float(decided.mean()) if len(decided) else None,
+            'by_stage': {
+                name: {
+                    'matches': int(matches[code]),
+                    'tiebreaks': int(tiebreaks[code]),
+                    'tiebreak_rate': float(tiebreaks[code] / matches[code]) if matches[code] else None,
+                }
+                for code, name in STAGE_NAMES.items()
+            },
+        }
+
+    def court_utilization(self) -> Dict:
+        """Booked court time versus the length of each tournament day, per court"""
+        c = self.columns()
+        if not len(self):
+            return {'courts': []}
+
+        # Rows of a tournament are contiguous, so per-tournament spans are reduceat slices
+        starts = np.array([t['first_row'] for t in self.tournaments if t['matches']])
+        minutes = c['minutes'].astype(np.int64)
+        day_minutes = (np.maximum.reduceat(minutes, starts) + MATCH_MINUTES
+                       - np.minimum.reduceat(minutes, starts)).sum()
+
+        matches = np.bincount(c['court'])
+        courts = []
+        for court in np.nonzero(matches)[0]:
+            booked = int(matches[court]) * MATCH_MINUTES
+            courts.append({
+                'court': int(court),
+                'matches': int(matches[court]),
+                'booked_hours': booked / 60,
+                'utilization': float(booked / day_minutes),
+            })
+        return {'day_hours': float(day_minutes / 60), 'courts': courts}
+
+
+# Name -> query, as exposed by the admin analytics endpoint
+QUERIES = {
+    'summary': MatchArchive.summary,
+    'upsets': MatchArchive.upset_rates,
+    'level-prediction': MatchArchive.level_prediction,
+    'tiebreaks': MatchArchive.tiebreaks,
+    'courts': MatchArchive.court_utilization,
+}
+
+
+def simulate_into(archive: MatchArchive, count: int, seed=None) -> int:
+    """Fills the archive with simulated tournaments (for trying out the analytics)"""
+    from tennis_tournament import Tournament
+    from tournament_batch import LevelSimulator, _NullWriter
+
+    archived = 0
+    for i in range(count):
+        tournament = Tournament(LevelSimulator(None if seed is None else f"{seed}:{i}"))
+        with contextlib.redirect_stdout(_NullWriter()):
+            tournament.run()
+        archived += archive.append(MatchTable.from_tournament(tournament)) or 0
+    return archived
+
+
+def main(argv=None):
+    """Command line interface of the archive"""
+    parser = argparse.ArgumentParser(description="Columnar match archive and analytics")
+    parser.add_argument('--dir', default=os.environ.get('ARCHIVE_DIR', 'archive'))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help="Run every analytics query")
+    simulate_parser = subparsers.add_parser('simulate', help="Archive simulated tournaments")
+    simulate_parser.add_argument('-n', '--count', type=int, default=1000)
+    simulate_parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    archive = MatchArchive(args.dir)
+
+    if args.command == 'simulate':
+        archived = simulate_into(archive, args.count, args.seed)
+        print(f"Archived {archived} matches ({len(archive)} in total)")
+        return 0
+
+    for name, query in QUERIES.items():
+        started = time.perf_counter()
+        result = query(archive)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"== {name} ({elapsed:.1f} ms)")
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
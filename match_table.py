@@ -0,0 +1,232 @@
+"""
+Compact columnar representation of tournament matches
+
+Every match is one row spread over typed arrays (integer player ids, set
+scores, stage codes, court, round and slot time in minutes), so a match costs
+a few bytes instead of a full ScheduledMatch object. A table can be built from
+a live Tournament, queried directly, or materialized back into one.
+"""
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from tennis_tournament import (
+    Group, Player, ScheduledMatch, Tournament, minutes_to_time, time_to_minutes
+)
+
+# Stage codes
+STAGE_GROUP = 0
+STAGE_SEMIFINAL = 1
+STAGE_THIRD_PLACE = 2
+STAGE_FINAL = 3
+
+NO_SCORE = -1
+NO_GROUP = 255
+
+
+class MatchTable:
+    """Struct-of-arrays storage for players and scheduled matches"""
+
+    __slots__ = (
+        'player_names', 'player_seeds', 'player_levels', 'group_names', 'group_players',
+        'stage_labels', '_stage_label_ids', 'player1', 'player2', 'score1', 'score2',
+        'stage', 'stage_label', 'group', 'court', 'round_num', 'minutes'
+    )
+
+    def __init__(self):
+        # Players (id = index)
+        self.player_names: List[str] = []
+        self.player_seeds = array('H')
+        self.player_levels = array('f')
+
+        # Groups (id = index), members stored as player ids in draw order
+        self.group_names: List[str] = []
+        self.group_players: List[array] = []
+
+        # Interned stage labels ("Група A", "Півфінал 1", ...)
+        self.stage_labels: List[str] = []
+        self._stage_label_ids: Dict[str, int] = {}
+
+        # Matches (one row per match)
+        self.player1 = array('I')
+        self.player2 = array('I')
+        self.score1 = array('b')
+        self.score2 = array('b')
+        self.stage = array('B')
+        self.stage_label = array('H')
+        self.group = array('B')
+        self.court = array('B')
+        self.round_num = array('B')
+        self.minutes = array('H')
+
+    def __len__(self) -> int:
+        return len(self.player1)
+
+    def add_player(self, name: str, seed: int = 0, level: Optional[float] = None) -> int:
+        """Adds a player and returns its integer id"""
+        self.player_names.append(name)
+        self.player_seeds.append(seed)
+        self.player_levels.append(level if level is not None else 0.0)
+        return len(self.player_names) - 1
+
+    def add_group(self, name: str, player_ids: List[int]) -> int:
+        """Adds a group with its members and returns its integer id"""
+        self.group_names.append(name)
+        self.group_players.append(array('I', player_ids))
+        return len(self.group_names) - 1
+
+    def add_match(self, player1: int, player2: int, stage: int, stage_label: str,
+                  time: str, court: int, round_num: int = 0, group: int = NO_GROUP,
+                  score: Optional[Tuple[int, int]] = None) -> int:
+        """Adds a match row and returns its index"""
+        label_id = self._stage_label_ids.get(stage_label)
+        if label_id is None:
+            label_id = len(self.stage_labels)
+            self.stage_labels.append(stage_label)
+            self._stage_label_ids[stage_label] = label_id
+
+        self.player1.append(player1)
+        self.player2.append(player2)
+        self.score1.append(score[0] if score else NO_SCORE)
+        self.score2.append(score[1] if score else NO_SCORE)
+        self.stage.append(stage)
+        self.stage_label.append(label_id)
+        self.group.append(group)
+        self.court.append(court)
+        self.round_num.append(round_num)
+        self.minutes.append(time_to_minutes(time))
+        return len(self.player1) - 1
+
+    def set_score(self, row: int, p1_sets: int, p2_sets: int):
+        """Records a result for a match row"""
+        self.score1[row] = p1_sets
+        self.score2[row] = p2_sets
+
+    def is_played(self, row: int) -> bool:
+        return self.score1[row] != NO_SCORE
+
+    def winner(self, row: int) -> Optional[int]:
+        """Returns the winner's player id, or None if not played"""
+        if self.score1[row] == NO_SCORE:
+            return None
+        return self.player1[row] if self.score1[row] > self.score2[row] else self.player2[row]
+
+    def rows(self) -> Iterator[Tuple]:
+        """Iterates over matches as (player1, player2, score1, score2, stage, label, group, court, round, minutes)"""
+        return zip(self.player1, self.player2, self.score1, self.score2, self.stage,
+                   self.stage_label, self.group, self.court, self.round_num, self.minutes)
+
+    def match_dict(self, row: int) -> Dict:
+        """Returns a single match in the same shape as the API payloads"""
+        score = None
+        if self.score1[row] != NO_SCORE:
+            score = [self.score1[row], self.score2[row]]
+        return {
+            'time': minutes_to_time(self.minutes[row]),
+            'court': self.court[row],
+            'stage': self.stage_labels[self.stage_label[row]],
+            'player1': self.player_names[self.player1[row]],
+            'player2': self.player_names[self.player2[row]],
+            'score': score,
+            'played': score is not None
+        }
+
+    def group_standings(self, group: int) -> List[Tuple[int, int, int, int, int]]:
+        """Computes group standings straight from the columns
+
+        Returns:
+            List of (player_id, wins, losses, games_won, games_lost), sorted like Group.get_standings
+        """
+        stats = {pid: [0, 0, 0, 0] for pid in self.group_players[group]}
+        for p1, p2, s1, s2, stage, _, g, _, _, _ in self.rows():
+            if g != group or stage != STAGE_GROUP or s1 == NO_SCORE:
+                continue
+            stats[p1][2] += s1
+            stats[p1][3] += s2
+            stats[p2][2] += s2
+            stats[p2][3] += s1
+            if s1 > s2:
+                stats[p1][0] += 1
+                stats[p2][1] += 1
+            else:
+                stats[p2][0] += 1
+                stats[p1][1] += 1
+
+        # Same order as Group.get_standings: wins, game difference, games won (stable)
+        standings = sorted(
+            stats.items(),
+            key=lambda item: (item[1][0], item[1][2] - item[1][3], item[1][2]),
+            reverse=True
+        )
+        return [(pid, w, l, gw, gl) for pid, (w, l, gw, gl) in standings]
+
+    def memory_size(self) -> int:
+        """Approximate number of bytes held by the match columns"""
+        columns = (self.player1, self.player2, self.score1, self.score2, self.stage,
+                   self.stage_label, self.group, self.court, self.round_num, self.minutes)
+        return sum(col.itemsize * len(col) for col in columns)
+
+    @classmethod
+    def from_tournament(cls, tournament: Tournament) -> 'MatchTable':
+        """Builds a table from a live tournament"""
+        table = cls()
+        player_ids: Dict[int, int] = {}
+
+        for player in tournament.players:
+            player_ids[id(player)] = table.add_player(player.name, player.seed, player.level)
+
+        def pid(player: Player) -> int:
+            if id(player) not in player_ids:
+                player_ids[id(player)] = table.add_player(player.name, player.seed, player.level)
+            return player_ids[id(player)]
+
+        def add(match: ScheduledMatch, stage: int, group: int = NO_GROUP):
+            table.add_match(pid(match.player1), pid(match.player2), stage, match.stage,
+                            match.time, match.court, match.round_num, group, match.score)
+
+        for group_id, group in enumerate(tournament.groups):
+            table.add_group(group.name, [pid(p) for p in group.players])
+            for match in group.scheduled_matches:
+                add(match, STAGE_GROUP, group_id)
+
+        for match in tournament.scheduled_semifinals:
+            add(match, STAGE_SEMIFINAL)
+        if tournament.scheduled_third_place:
+            add(tournament.scheduled_third_place, STAGE_THIRD_PLACE)
+        if tournament.scheduled_final:
+            add(tournament.scheduled_final, STAGE_FINAL)
+
+        return table
+
+    def materialize(self) -> Tournament:
+        """Rebuilds a live Tournament (players, groups, schedule, playoffs) from the table"""
+        tournament = Tournament()
+        tournament.players = [
+            Player(name, seed=self.player_seeds[i], level=self.player_levels[i] or None)
+            for i, name in enumerate(self.player_names)
+        ]
+        players = tournament.players
+
+        tournament.groups = [
+            Group(name, [players[pid] for pid in self.group_players[i]])
+            for i, name in enumerate(self.group_names)
+        ]
+
+        for p1, p2, s1, s2, stage, label, group, court, round_num, minutes in self.rows():
+            match = ScheduledMatch(players[p1], players[p2], minutes_to_time(minutes),
+                                   court, round_num, self.stage_labels[label])
+            if s1 != NO_SCORE:
+                match.play(s1, s2)
+
+            if stage == STAGE_GROUP:
+                tournament.groups[group].scheduled_matches.append(match)
+            elif stage == STAGE_SEMIFINAL:
+                tournament.scheduled_semifinals.append(match)
+            elif stage == STAGE_THIRD_PLACE:
+                tournament.scheduled_third_place = match
+                tournament.third_place_match = match
+            elif stage == STAGE_FINAL:
+                tournament.scheduled_final = match
+                tournament.final = match
+
+        tournament.semifinals = list(tournament.scheduled_semifinals)
+        return tournament
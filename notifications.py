@@ -0,0 +1,292 @@
+"""
+Player notifications: "you're up on court N" and "result posted"
+
+Tournament change listeners only drop the new revision into an in-memory
+queue, so request threads (submit_match and friends) never do notification
+work. A background worker wakes on those revisions and on a periodic tick
+(for the clock: a match becomes "up next" without any change), takes a cheap
+snapshot of the matches under the tournament lock, and turns it into
+messages in a durable SQLite queue. The same worker drains the queue in
+batches through pluggable transports, retrying failed batches with
+exponential backoff.
+
+Every message has a deduplication key (event, match, player and what the
+message says), so repeated scans, restarts and retries never send the same
+notification twice, while a moved match or a corrected score is announced
+again.
+
+Enabled by setting NOTIFY_TRANSPORTS, e.g. "log:notifications.log".
+"""
+import abc
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from tennis_tournament import time_to_minutes
+from tournament_state import iter_matches
+
+logger = logging.getLogger(__name__)
+
+# "Up next" is sent this many minutes before the scheduled start
+LEAD_MINUTES = 15
+
+# Length of a match slot; a match is no longer "up next" after it
+MATCH_MINUTES = 60
+
+# Seconds between clock checks when nothing changes
+TICK_SECONDS = 30
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 5
+
+
+class Transport(abc.ABC):
+    """Delivers a batch of notifications; raises on failure (the batch is retried)"""
+
+    @abc.abstractmethod
+    def send(self, notifications: List[Dict]):
+        ...
+
+
+class LogTransport(Transport):
+    """Appends notifications as JSON lines to a file (stand-in for SMS/push)"""
+
+    def __init__(self, path: str = 'notifications.log'):
+        self.path = path
+
+    def send(self, notifications: List[Dict]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for notification in notifications:
+                f.write(json.dumps(notification, ensure_ascii=False) + '\n')
+
+
+# Transport name -> factory taking the option after ":" (if any)
+TRANSPORTS: Dict[str, Callable[..., Transport]] = {
+    'log': LogTransport,
+}
+
+
+def parse_transports(spec: str) -> List[Transport]:
+    """Builds transports from "name[:option],..." (e.g. "log:notifications.log")
+
+    Raises:
+        ValueError: Unknown transport
+    """
+    transports = []
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, option = item.partition(':')
+        if name not in TRANSPORTS:
+            raise ValueError(f"Unknown notification transport: {name}")
+        transports.append(TRANSPORTS[name](option) if option else TRANSPORTS[name]())
+    return transports
+
+
+class NotificationQueue:
+    """Durable queue of notifications in a SQLite file
+
+    Only used from the worker thread (SQLite connections are per thread).
+    """
+
+    def __init__(self, path: str = 'notifications.sqlite3'):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS notifications (
+                id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE NOT NULL,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'pending'
+            )
+        """)
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS notifications_pending ON notifications (status, next_attempt)"
+        )
+        self.db.commit()
+
+    def enqueue(self, notifications: Iterable[Dict]) -> int:
+        """Adds notifications, skipping keys already queued or sent
+
+        Returns:
+            Number of new notifications
+        """
+        with self.db:
+            cursor = self.db.executemany(
+                "INSERT OR IGNORE INTO notifications (key, payload) VALUES (?, ?)",
+                ((n['key'], json.dumps(n, ensure_ascii=False)) for n in notifications)
+            )
+        return cursor.rowcount
+
+    def claim(self, limit: int = BATCH_SIZE, now: Optional[float] = None) -> List[tuple]:
+        """Returns up to `limit` (id, notification) due for delivery, oldest first"""
+        rows = self.db.execute(
+            "SELECT id, payload FROM notifications WHERE status = 'pending' AND next_attempt <= ? "
+            "ORDER BY id LIMIT ?",
+            (time.time() if now is None else now, limit)
+        ).fetchall()
+        return [(row_id, json.loads(payload)) for row_id, payload in rows]
+
+    def mark_sent(self, ids: List[int]):
+        with self.db:
+            self.db.executemany("UPDATE notifications SET status = 'sent' WHERE id = ?",
+                                ((i,) for i in ids))
+
+    def mark_failed(self, ids: List[int], now: Optional[float] = None):
+        """Schedules a retry with exponential backoff; gives up after MAX_ATTEMPTS"""
+        now = time.time() if now is None else now
+        with self.db:
+            self.db.executemany(
+                "UPDATE notifications SET attempts = attempts + 1, "
+                "next_attempt = ? + ? * (1 << attempts), "
+                "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+                "WHERE id = ?",
+                ((now, RETRY_BASE_SECONDS, MAX_ATTEMPTS, i) for i in ids)
+            )
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM notifications GROUP BY status"))
+
+
+def snapshot(tournament) -> List[tuple]:
+    """(match id, player names, score, time, court, stage) of every match"""
+    return [
+        (match_id, (match.player1.name, match.player2.name), match.score,
+         match.time, match.court, match.stage)
+        for match_id, match, _, _ in iter_matches(tournament)
+    ]
+
+
+def build_notifications(matches: List[tuple], now: int, epoch: int,
+                        lead: int = LEAD_MINUTES) -> List[Dict]:
+    """
+    Turns a match snapshot into notifications
+
+    Args:
+        matches: Output of snapshot()
+        now: Current time in minutes since midnight
+        epoch: Identifies the tournament (match ids repeat across tournaments)
+        lead: Minutes before the start when "up next" is sent
+    """
+    notifications = []
+    for match_id, players, score, match_time, court, stage in matches:
+        if score is None:
+            start = time_to_minutes(match_time)
+            if not start - lead <= now < start + MATCH_MINUTES:
+                continue
+            event, detail = 'up_next', f"{match_time}@{court}"
+        else:
+            event, detail = 'result', f"{score[0]}-{score[1]}"
+
+        for player, opponent in (players, players[::-1]):
+            if event == 'up_next':
+                text = f"You're up on court {court} at {match_time} vs {opponent}"
+            else:
+                text = f"Result posted: {players[0]} {detail} {players[1]} ({stage})"
+            notifications.append({
+                'key': f"{epoch}:{event}:{match_id}:{player}:{detail}",
+                'event': event,
+                'player': player,
+                'match_id': match_id,
+                'court': court,
+                'time': match_time,
+                'text': text,
+            })
+    return notifications
+
+
+def current_minutes() -> int:
+    now = time.localtime()
+    return now.tm_hour * 60 + now.tm_min
+
+
+class NotificationWorker(threading.Thread):
+    """Background thread watching the tournament and delivering notifications
+
+    Args:
+        source: The app module (tournament, lock, revision, change listeners)
+        transports: Where notifications are delivered
+        queue_path: SQLite file of the durable queue
+        clock: Returns the current time in minutes since midnight
+    """
+
+    def __init__(self, source, transports: List[Transport], queue_path: str = 'notifications.sqlite3',
+                 clock: Callable[[], int] = current_minutes, tick: float = TICK_SECONDS):
+        super().__init__(name='notifications', daemon=True)
+        self.source = source
+        self.transports = transports
+        self.queue_path = queue_path
+        self.clock = clock
+        self.tick = tick
+        self._revisions = queue.SimpleQueue()
+        self._tournament = None
+        self._epoch = None
+
+    def notify(self, revision: int):
+        """Change listener: O(1), runs on the request thread"""
+        self._revisions.put(revision)
+
+    def _wait(self):
+        """Blocks until a change or the next tick; coalesces queued changes"""
+        try:
+            self._revisions.get(timeout=self.tick)
+        except queue.Empty:
+            return
+        while True:
+            try:
+                self._revisions.get_nowait()
+            except queue.Empty:
+                return
+
+    def scan(self, store: NotificationQueue) -> int:
+        """Queues notifications for the current state of the tournament"""
+        with self.source.tournament_lock:
+            tournament = self.source.get_tournament()
+            if tournament is None:
+                return 0
+            if tournament is not self._tournament:
+                self._tournament = tournament
+                self._epoch = self.source.tournament_revision
+            matches = snapshot(tournament)
+        return store.enqueue(build_notifications(matches, self.clock(), self._epoch))
+
+    def deliver(self, store: NotificationQueue) -> int:
+        """Sends due notifications in batches; returns the number sent"""
+        sent = 0
+        while True:
+            batch = store.claim()
+            if not batch:
+                return sent
+            ids = [row_id for row_id, _ in batch]
+            try:
+                for transport in self.transports:
+                    transport.send([notification for _, notification in batch])
+            except Exception:
+                logger.exception("Delivery of %d notifications failed", len(ids))
+                store.mark_failed(ids)
+                return sent
+            store.mark_sent(ids)
+            sent += len(ids)
+
+    def run(self):
+        store = NotificationQueue(self.queue_path)
+        while True:
+            try:
+                self.scan(store)
+                self.deliver(store)
+            except Exception:
+                logger.exception("Notification scan failed")
+            self._wait()
+
+
+def start(source, transports: List[Transport], queue_path: str = 'notifications.sqlite3') -> NotificationWorker:
+    """Starts watching the tournament and delivering notifications in a background thread"""
+    worker = NotificationWorker(source, transports, queue_path)
+    source.add_change_listener(worker.notify)
+    worker.start()
+    return worker
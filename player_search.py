@@ -0,0 +1,178 @@
+"""
+In-memory player name search index
+
+Names are normalized case- and diacritic-insensitively, and Cyrillic is
+transliterated to Latin, so "Олег", "OLEG" and "Olég" all match each other.
+Prefix matches come from a sorted token list (bisect); typo-tolerant matches
+come from a trigram inverted index ranked by similarity. Both structures are
+updated incrementally as players are added or removed.
+"""
+import math
+import unicodedata
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Dict, Iterable, List, Set
+
+# Cyrillic (Ukrainian/Russian) to Latin, applied after diacritics are stripped
+TRANSLITERATION = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'ґ': 'g', 'д': 'd', 'е': 'e', 'є': 'ye',
+    'ж': 'zh', 'з': 'z', 'и': 'y', 'і': 'i', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n',
+    'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'kh',
+    'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'shch', 'ь': '', 'ъ': '', 'ы': 'y', 'э': 'e',
+    'ю': 'yu', 'я': 'ya', "'": '', '’': '', '-': ' ',
+})
+
+# Minimum Dice similarity (over trigrams) for a typo-tolerant match
+MIN_SIMILARITY = 0.4
+
+# Upper bound on names verified for one typo-tolerant query
+MAX_CANDIDATES = 100
+
+
+def normalize(text: str) -> str:
+    """Case-folds, strips diacritics and transliterates Cyrillic to Latin"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.translate(TRANSLITERATION).split())
+
+
+def trigrams(word: str) -> Set[str]:
+    """Returns the trigrams of a single normalized word (padded at the edges)"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def key_trigrams(key: str) -> Set[str]:
+    """Returns the trigrams of every word of a normalized key"""
+    grams = set()
+    for word in key.split():
+        grams |= trigrams(word)
+    return grams
+
+
+def similarity(query_grams: Set[str], words: List[str]) -> float:
+    """Dice coefficient between query trigrams and the trigrams of the given words
+
+    Membership is tested by substring search in the padded words, which avoids
+    building trigram sets for every candidate.
+    """
+    padded = ''.join(f"  {word} " for word in words)
+    shared = len([gram for gram in query_grams if gram in padded])
+    word_grams = sum(len(word) + 1 for word in words)
+    return 2 * shared / (len(query_grams) + word_grams)
+
+
+class PlayerSearchIndex:
+    """Prefix + trigram index over player names"""
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._keys: Dict[str, str] = {}
+        # Sorted (token, name) pairs; the full key counts as a token too
+        self._prefixes: List[tuple] = []
+        self._trigrams: Dict[str, Set[str]] = {}
+
+        # Bulk load: collect everything, then sort once
+        for name in names:
+            if name in self._keys:
+                continue
+            key = normalize(name)
+            self._keys[name] = key
+            self._prefixes.extend((token, name) for token in self._tokens(key))
+            for gram in key_trigrams(key):
+                self._trigrams.setdefault(gram, set()).add(name)
+        self._prefixes.sort()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def _tokens(key: str) -> Set[str]:
+        tokens = set(key.split())
+        tokens.add(key)
+        return tokens
+
+    def add(self, name: str):
+        """Indexes a player name"""
+        if name in self._keys:
+            return
+
+        key = normalize(name)
+        self._keys[name] = key
+
+        for token in self._tokens(key):
+            insort(self._prefixes, (token, name))
+        for gram in key_trigrams(key):
+            self._trigrams.setdefault(gram, set()).add(name)
+
+    def remove(self, name: str):
+        """Removes a player name from the index"""
+        key = self._keys.pop(name, None)
+        if key is None:
+            return
+
+        for token in self._tokens(key):
+            i = bisect_left(self._prefixes, (token, name))
+            if i < len(self._prefixes) and self._prefixes[i] == (token, name):
+                del self._prefixes[i]
+        for gram in key_trigrams(key):
+            names = self._trigrams.get(gram)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._trigrams[gram]
+
+    def search(self, query: str, limit: int = 10) -> List[str]:
+        """Returns up to `limit` player names best matching the query"""
+        q = normalize(query)
+        if not q:
+            return []
+
+        scores: Dict[str, float] = {}
+
+        # Prefix matches: whole name first, then any word of the name
+        i = bisect_left(self._prefixes, (q,))
+        while i < len(self._prefixes) and len(scores) < limit * 4:
+            token, name = self._prefixes[i]
+            if not token.startswith(q):
+                break
+            score = 2.0 if self._keys[name].startswith(q) else 1.5
+            if score > scores.get(name, 0):
+                scores[name] = score
+            i += 1
+
+        if len(scores) < limit:
+            self._fuzzy_matches(q, scores)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], len(item[0]), item[0]))
+        return [name for name, _ in ranked[:limit]]
+
+    def _fuzzy_matches(self, q: str, scores: Dict[str, float]):
+        """Adds typo-tolerant matches by trigram Dice similarity"""
+        query_grams = key_trigrams(q)
+        single_word = ' ' not in q
+
+        # A match must share at least `needed` trigrams with the query, so it
+        # has to appear in one of the (len - needed + 1) rarest postings
+        needed = max(1, math.ceil(MIN_SIMILARITY * len(query_grams) / 2))
+        postings = sorted(
+            (self._trigrams[g] for g in query_grams if g in self._trigrams),
+            key=len
+        )
+        candidates = set()
+        for names in postings[:max(0, len(postings) - needed + 1)]:
+            room = MAX_CANDIDATES - len(candidates)
+            if room <= 0:
+                break
+            # Very common trigrams only contribute a sample
+            candidates.update(names if len(names) <= room else islice(names, room))
+
+        for name in candidates:
+            if name in scores:
+                continue
+            words = self._keys[name].split()
+            if single_word:
+                score = max(similarity(query_grams, [word]) for word in words)
+            else:
+                score = similarity(query_grams, words)
+            if score >= MIN_SIMILARITY:
+                scores[name] = score
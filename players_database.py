@@ -1,32 +1,70 @@
 """
 Система зберігання та управління гравцями з рейтингом
 """
-import json
 import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Tuple
+
+import fast_json
+from leaderboard import Leaderboard
+from player_search import PlayerSearchIndex
 
 class PlayerDatabase:
     """Клас для управління базою даних гравців"""
 
     def __init__(self, db_file='players.json'):
         self.db_file = db_file
+        # Відбиток файлу (mtime, розмір, inode), з якого завантажено реєстр
+        self._file_stamp = None
+        self._load()
+
+    def _load(self):
+        """Завантажує реєстр і будує індекси пошуку та рейтингу"""
         self.players = self._load_players()
+        self.search_index = PlayerSearchIndex(self.players.keys())
+        self.leaderboard = Leaderboard(self.players)
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.db_file)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
 
     def _load_players(self) -> Dict:
         """Завантажує гравців з файлу"""
-        if os.path.exists(self.db_file):
+        self._file_stamp = self._stat()
+        if self._file_stamp is not None:
             try:
-                with open(self.db_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.db_file, 'rb') as f:
+                    return fast_json.loads(f.read())
             except:
                 return {}
         return {}
 
     def _save_players(self):
-        """Зберігає гравців у файл"""
-        with open(self.db_file, 'w', encoding='utf-8') as f:
-            json.dump(self.players, f, ensure_ascii=False, indent=2)
+        """Зберігає гравців у файл
+
+        Запис атомарний (тимчасовий файл + os.replace), тож інші процеси
+        ніколи не прочитають наполовину записаний реєстр.
+        """
+        tmp_file = f"{self.db_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(fast_json.dumps(self.players))
+        os.replace(tmp_file, self.db_file)
+        self._file_stamp = self._stat()
+
+    def refresh_if_stale(self) -> bool:
+        """
+        Перезавантажує реєстр, якщо файл змінив інший процес (воркер)
+
+        Returns:
+            True, якщо реєстр було перезавантажено
+        """
+        if self._stat() == self._file_stamp:
+            return False
+        self._load()
+        return True
 
     def register_player(self, name: str, level: float = 1.0) -> Dict:
         """
@@ -52,9 +90,56 @@ class PlayerDatabase:
         }
 
         self.players[name] = player_data
+        self.search_index.add(name)
+        self.leaderboard.update(player_data)
         self._save_players()
         return player_data
 
+    def save(self):
+        """Записує реєстр у файл (після bulk_upsert з save=False)"""
+        self._save_players()
+
+    def bulk_upsert(self, records: List[Dict], save: bool = True) -> Tuple[int, int]:
+        """
+        Додає або оновлює багато гравців з одним записом у файл
+
+        Args:
+            records: Перевірені записи гравців; у нових гравців відсутні поля
+                отримують значення за замовчуванням (див. players_io.validate_row)
+            save: Записати реєстр у файл одразу; False, якщо викликач зробить
+                один запис наприкінці (див. players_io.import_rows)
+
+        Returns:
+            (кількість нових гравців, кількість оновлених гравців)
+        """
+        created = updated = 0
+        for record in records:
+            name = record['name']
+            player = self.players.get(name)
+            if player is None:
+                player = {
+                    'name': name,
+                    'level': 1.0,
+                    'tournaments_played': 0,
+                    'total_wins': 0,
+                    'total_losses': 0,
+                    'registered_date': datetime.now().isoformat()
+                }
+                player.update(record)
+                self.players[name] = player
+                self.search_index.add(name)
+                created += 1
+            else:
+                for field, value in record.items():
+                    if field != 'registered_date':
+                        player[field] = value
+                updated += 1
+            self.leaderboard.update(player)
+
+        if records and save:
+            self._save_players()
+        return created, updated
+
     def get_player(self, name: str) -> Optional[Dict]:
         """Отримує дані гравця"""
         return self.players.get(name)
@@ -70,8 +155,34 @@ class PlayerDatabase:
         for name in player_names:
             if name in self.players:
                 self.players[name]['tournaments_played'] += 1
+                self.leaderboard.update(self.players[name])
         self._save_players()
 
+    def record_match_results(self, results: Iterable[Tuple[str, str]]) -> int:
+        """
+        Додає до кар'єрної статистики результати багатьох матчів з одним записом у файл
+
+        Args:
+            results: Пари (переможець, переможений); незареєстровані гравці пропускаються
+
+        Returns:
+            Кількість гравців, чию статистику оновлено
+        """
+        changed = {}
+        for winner, loser in results:
+            if winner in self.players:
+                self.players[winner]['total_wins'] += 1
+                changed[winner] = self.players[winner]
+            if loser in self.players:
+                self.players[loser]['total_losses'] += 1
+                changed[loser] = self.players[loser]
+
+        for player in changed.values():
+            self.leaderboard.update(player)
+        if changed:
+            self._save_players()
+        return len(changed)
+
     def get_top_players(self, count: int = 8) -> List[str]:
         """
         Отримує топ-N гравців за рейтингом
@@ -82,8 +193,38 @@ class PlayerDatabase:
         Returns:
             Список імен гравців
         """
-        all_players = self.get_all_players()
-        return [p['name'] for p in all_players[:count]]
+        names, _ = self.leaderboard.page('level', limit=count)
+        return names
+
+    def search_players(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Шукає гравців за ім'ям (без урахування регістру, діакритики та алфавіту)
+
+        Args:
+            query: Початок імені або ім'я з помилками
+            limit: Максимальна кількість результатів
+
+        Returns:
+            Дані гравців, від найкращого збігу
+        """
+        return [self.players[name] for name in self.search_index.search(query, limit)]
+
+    def get_leaderboard_page(self, sort: str = 'level', descending: bool = True,
+                             limit: int = 50, cursor: Optional[str] = None):
+        """
+        Отримує сторінку відсортованого списку гравців
+
+        Args:
+            sort: Ключ сортування (level, win_rate, tournaments_played, wins)
+            descending: Від найбільшого значення до найменшого
+            limit: Кількість гравців на сторінці
+            cursor: Курсор наступної сторінки з попередньої відповіді
+
+        Returns:
+            (список даних гравців, курсор наступної сторінки або None)
+        """
+        names, next_cursor = self.leaderboard.page(sort, descending, limit, cursor)
+        return [self.players[name] for name in names], next_cursor
 
     def player_exists(self, name: str) -> bool:
         """Перевіряє чи існує гравець"""
@@ -93,6 +234,8 @@ class PlayerDatabase:
         """Видаляє гравця"""
         if name in self.players:
             del self.players[name]
+            self.search_index.remove(name)
+            self.leaderboard.remove(name)
             self._save_players()
 
     def update_player(self, name: str, level: Optional[float] = None):
@@ -112,6 +255,7 @@ class PlayerDatabase:
             if level < 1.0 or level > 10.0:
                 raise ValueError("Level must be between 1.0 and 10.0")
             player['level'] = level
+            self.leaderboard.update(player)
 
         self._save_players()
 
@@ -0,0 +1,290 @@
+"""
+Streaming bulk import and export of players and their results (NDJSON / CSV)
+
+Rows are parsed lazily, validated one by one and applied to the database in
+chunks. The registry file is written once, at the end of the import, so an
+import of N players costs one O(N) write rather than one per chunk. Invalid
+rows are reported with their line number instead of aborting the import.
+Export yields the registry row by row, so its memory use does not depend on
+the payload size.
+
+Usage:
+    python players_io.py import members.csv [--upsert] [--chunk-size 1000]
+    python players_io.py export --format ndjson --output players.ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+FORMATS = ('ndjson', 'csv')
+
+# Columns of an exported row, in order
+FIELDS = ['name', 'level', 'tournaments_played', 'total_wins', 'total_losses', 'registered_date']
+
+STAT_FIELDS = ('tournaments_played', 'total_wins', 'total_losses')
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def detect_format(filename: Optional[str] = None, content_type: Optional[str] = None) -> str:
+    """Guesses the format from a file name or content type (NDJSON by default)"""
+    if filename and filename.lower().endswith('.csv'):
+        return 'csv'
+    if content_type and 'csv' in content_type:
+        return 'csv'
+    return 'ndjson'
+
+
+def read_lines(stream: Union[TextIO, BinaryIO]) -> Iterator[Tuple[int, Optional[str], Optional[str]]]:
+    """Numbers the lines of a stream, decoding them one by one if it is binary (UTF-8)
+
+    Yields:
+        (line number, line or None, decoding error or None)
+    """
+    for line_no, line in enumerate(stream, 1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode('utf-8')
+            except UnicodeDecodeError as e:
+                yield line_no, None, f"Invalid UTF-8: {e}"
+                continue
+        yield line_no, line, None
+
+
+def read_rows(stream: Union[TextIO, BinaryIO], fmt: str) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """Parses rows lazily
+
+    Lines that don't decode and malformed CSV records are reported like
+    invalid JSON, so one bad line doesn't abort the import.
+
+    Yields:
+        (line number, row or None, parse error or None)
+    """
+    lines = read_lines(stream)
+
+    if fmt == 'csv':
+        # The csv reader pulls lines through this generator; lines that don't
+        # decode are set aside and reported in order by the loop below
+        skipped: List[Tuple[int, str]] = []
+        position = [0]
+
+        def decoded():
+            for line_no, line, error in lines:
+                position[0] = line_no
+                if error is None:
+                    yield line
+                else:
+                    skipped.append((line_no, error))
+
+        reader = csv.DictReader(decoded())
+        while True:
+            try:
+                row, error = next(reader), None
+            except StopIteration:
+                break
+            except csv.Error as e:
+                row, error = None, f"Invalid CSV: {e}"
+            for line_no, skipped_error in skipped:
+                yield line_no, None, skipped_error
+            skipped.clear()
+            yield position[0], row, error
+        for line_no, skipped_error in skipped:
+            yield line_no, None, skipped_error
+        return
+
+    for line_no, line, error in lines:
+        if error is not None:
+            yield line_no, None, error
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Row must be a JSON object"
+            continue
+        yield line_no, row, None
+
+
+def validate_row(row: Dict) -> Dict:
+    """
+    Turns a raw row into a (partial) player record
+
+    Only the fields present in the row are returned, so an upsert doesn't reset
+    the rest; PlayerDatabase.bulk_upsert fills defaults for new players.
+
+    Raises:
+        ValueError: If the row is invalid
+    """
+    name = row.get('name')
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("Player name is required")
+    name = name.strip()
+
+    record = {'name': name}
+
+    level = row.get('level')
+    if level not in (None, ''):
+        try:
+            level = float(level)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid level: {level}")
+        if not (1.0 <= level <= 10.0):
+            raise ValueError("Level must be between 1.0 and 10.0")
+        record['level'] = int(level) if level.is_integer() else level
+
+    for field in STAT_FIELDS:
+        value = row.get(field)
+        if value in (None, ''):
+            continue
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {field}: {value}")
+        if value < 0:
+            raise ValueError(f"{field} must not be negative")
+        record[field] = value
+
+    if row.get('registered_date'):
+        record['registered_date'] = row['registered_date']
+    return record
+
+
+def import_rows(player_db, rows: Iterable[Tuple[int, Optional[Dict], Optional[str]]],
+                upsert: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict:
+    """
+    Validates rows and applies them to the database in chunks
+
+    Args:
+        player_db: PlayerDatabase to import into
+        rows: Output of read_rows
+        upsert: Update existing players instead of reporting them as errors
+        chunk_size: Number of records applied to the database at a time
+
+    Returns:
+        Summary with counts of created/updated players and line-level errors
+    """
+    summary = {'created': 0, 'updated': 0, 'errors': []}
+    chunk: List[Dict] = []
+    chunk_names = set()
+
+    def flush():
+        created, updated = player_db.bulk_upsert(chunk, save=False)
+        summary['created'] += created
+        summary['updated'] += updated
+        chunk.clear()
+        chunk_names.clear()
+
+    # Chunks are applied in memory only; the registry is written once at the
+    # end, also when reading the rows fails half way, so memory and file agree
+    try:
+        for line_no, row, error in rows:
+            if error is None:
+                try:
+                    record = validate_row(row)
+                    if record['name'] in chunk_names:
+                        raise ValueError(f"Duplicate player {record['name']} in import")
+                    if not upsert and player_db.player_exists(record['name']):
+                        raise ValueError(f"Player {record['name']} already registered")
+                except ValueError as e:
+                    error = str(e)
+
+            if error is not None:
+                summary['errors'].append({'line': line_no, 'error': error})
+                continue
+
+            chunk.append(record)
+            chunk_names.add(record['name'])
+            if len(chunk) >= chunk_size:
+                flush()
+
+        if chunk:
+            flush()
+    finally:
+        if summary['created'] or summary['updated']:
+            player_db.save()
+
+    return summary
+
+
+def export_rows(player_db, fmt: str) -> Iterator[str]:
+    """Yields the registry serialized row by row"""
+    # Snapshot of names only, so concurrent registrations don't break iteration
+    names = tuple(player_db.players)
+
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for name in names:
+            player = player_db.get_player(name)
+            if player is None:
+                continue
+            writer.writerow(player)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+        return
+
+    for name in names:
+        player = player_db.get_player(name)
+        if player is None:
+            continue
+        yield json.dumps({field: player.get(field) for field in FIELDS}, ensure_ascii=False) + '\n'
+
+
+def main(argv=None):
+    """Command line interface for bulk import/export"""
+    parser = argparse.ArgumentParser(description="Bulk import/export of players (NDJSON or CSV)")
+    parser.add_argument('--db', default='players.json', help="Players database file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="Import players from a file ('-' for stdin)")
+    import_parser.add_argument('file')
+    import_parser.add_argument('--format', choices=FORMATS)
+    import_parser.add_argument('--upsert', action='store_true', help="Update existing players")
+    import_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    export_parser = subparsers.add_parser('export', help="Export all players")
+    export_parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    export_parser.add_argument('--output', help="Output file (stdout by default)")
+
+    args = parser.parse_args(argv)
+
+    from players_database import PlayerDatabase
+    player_db = PlayerDatabase(args.db)
+
+    if args.command == 'import':
+        fmt = args.format or detect_format(args.file)
+        if args.file == '-':
+            summary = import_rows(player_db, read_rows(sys.stdin.buffer, fmt), args.upsert, args.chunk_size)
+        else:
+            with open(args.file, 'rb') as f:
+                summary = import_rows(player_db, read_rows(f, fmt), args.upsert, args.chunk_size)
+
+        print(f"Created: {summary['created']}, updated: {summary['updated']}, "
+              f"errors: {len(summary['errors'])}")
+        for error in summary['errors']:
+            print(f"  line {error['line']}: {error['error']}", file=sys.stderr)
+        return 1 if summary['errors'] else 0
+
+    output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        for chunk in export_rows(player_db, args.format):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
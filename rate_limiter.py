@@ -0,0 +1,164 @@
+"""
+Per-client rate limiting and load shedding for the public API
+
+Every client (IP address) has a token bucket per route: a request takes a
+token, and tokens come back at the route's rate up to its burst. All
+anonymous clients together also share one bucket per route, so a crowd of
+kiosks can't overload a worker any more than a single one can.
+
+When a bucket is empty, requests are shed by priority:
+
+    admin requests      never limited (result entry must always get through)
+    anonymous reads     the response cached for the current revision if
+                        there is one, otherwise 429
+    anonymous writes    429 (they would be rejected with 403 anyway)
+
+The buckets live in a fixed-size table in an anonymous shared memory map,
+created with its locks when the app is imported. Under gunicorn --preload
+that happens in the master, so every forked worker sees the same buckets.
+A bucket is found by hashing the client and route to two candidate slots
+guarded by one lock stripe: a decision is a hash, a lock and two struct
+reads, whatever the number of clients. When neither slot belongs to the
+client, the least recently used of the two is taken over (its previous
+owner starts again with a full bucket).
+
+Configured with RATE_LIMITS, e.g. "tournament_info=2/20,default=10/50"
+(tokens per second / burst per client, "global" for all anonymous clients
+together), or "off".
+"""
+import hashlib
+import math
+import mmap
+import multiprocessing
+import struct
+import time
+from typing import Dict, Optional, Tuple
+
+# (tokens per second, burst) of one client, by Flask endpoint. Generous:
+# spectators on the venue wifi may all share one address
+DEFAULT_BUDGETS: Dict[str, Tuple[float, float]] = {
+    'tournament_info': (2, 20),
+    'tournament_schedule': (2, 20),
+    'tournament_changes': (5, 30),
+    'final_results': (2, 20),
+    'default': (10, 50),
+    # All anonymous clients together, per route
+    'global': (500, 1000),
+}
+
+# Buckets in the shared table (two candidate slots per client and route)
+SLOTS = 16384
+LOCK_STRIPES = 16
+
+# Slot: key hash (0 = free), tokens, time of the last refill
+_SLOT = struct.Struct('<Qdd')
+
+GLOBAL_CLIENT = '*'
+
+
+def parse_budgets(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Builds budgets from "endpoint=rate/burst,..." on top of the defaults
+
+    Raises:
+        ValueError: Malformed budget
+    """
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        endpoint, _, budget = item.partition('=')
+        rate, _, burst = budget.partition('/')
+        try:
+            budgets[endpoint.strip()] = (float(rate), float(burst or rate))
+        except ValueError:
+            raise ValueError(f"Invalid rate limit: {item}") from None
+    return budgets
+
+
+def _key_hash(client: str, endpoint: str) -> int:
+    # Not hash(): string hashes are randomized per process
+    digest = hashlib.blake2b(f"{client}\0{endpoint}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+class RateLimiter:
+    """Token buckets shared by all processes forked after its creation
+
+    Args:
+        budgets: (tokens per second, burst) by endpoint, with 'default' and 'global'
+        slots: Size of the bucket table
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, Tuple[float, float]]] = None, slots: int = SLOTS):
+        self.budgets = dict(budgets or DEFAULT_BUDGETS)
+        self._stripe_slots = max(2, slots // LOCK_STRIPES)
+        self._table = mmap.mmap(-1, self._stripe_slots * LOCK_STRIPES * _SLOT.size)
+        self._locks = [multiprocessing.Lock() for _ in range(LOCK_STRIPES)]
+
+    def _take(self, client: str, endpoint: str, rate: float, burst: float, now: float) -> float:
+        """Takes a token from a bucket; returns 0 if there was one, else seconds until there is"""
+        key = _key_hash(client, endpoint)
+        stripe = key % LOCK_STRIPES
+        base = stripe * self._stripe_slots
+        first = base + (key >> 8) % self._stripe_slots
+        second = base + (key >> 32) % self._stripe_slots
+        table = self._table
+
+        with self._locks[stripe]:
+            slot_key, tokens, stamp = _SLOT.unpack_from(table, first * _SLOT.size)
+            slot = first
+            if slot_key != key:
+                other_key, other_tokens, other_stamp = _SLOT.unpack_from(table, second * _SLOT.size)
+                if other_key == key or other_stamp < stamp:
+                    slot, slot_key, tokens, stamp = second, other_key, other_tokens, other_stamp
+            if slot_key != key:
+                tokens, stamp = burst, now
+
+            tokens = min(burst, tokens + (now - stamp) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate if rate > 0 else math.inf
+            _SLOT.pack_into(table, slot * _SLOT.size, key, tokens, now)
+        return wait
+
+    def check(self, client: str, endpoint: Optional[str]) -> float:
+        """
+        Takes a token for a request of a client
+
+        Returns:
+            0 if the request is within budget, else seconds until it would be
+        """
+        endpoint = endpoint or 'default'
+        now = time.monotonic()
+        rate, burst = self.budgets.get(endpoint, self.budgets['default'])
+        wait = self._take(client, endpoint, rate, burst, now)
+        if wait:
+            return wait
+        rate, burst = self.budgets['global']
+        return self._take(GLOBAL_CLIENT, endpoint, rate, burst, now)
+
+
+class RevisionCache:
+    """Response bodies of the current revision, for shed requests
+
+    Args:
+        size: Maximum number of bodies (one per path and query)
+    """
+
+    def __init__(self, size: int = 256):
+        self.size = size
+        self._revision = None
+        self._bodies: Dict[str, Tuple[bytes, str]] = {}
+
+    def get(self, key: str, revision: int) -> Optional[Tuple[bytes, str]]:
+        """(body, mimetype) cached for the key at this revision"""
+        if revision != self._revision:
+            return None
+        return self._bodies.get(key)
+
+    def put(self, key: str, revision: int, body: bytes, mimetype: str):
+        if revision != self._revision:
+            self._revision = revision
+            self._bodies = {}
+        if key in self._bodies or len(self._bodies) < self.size:
+            self._bodies[key] = (body, mimetype)
@@ -0,0 +1,171 @@
+"""
+Result propagation through the tournament dependency graph
+
+    group matches -> group standings -> semifinal seeding -> final / 3rd place
+
+Recording or correcting a result marks the match's dependents dirty and
+re-evaluates them in topological order. A node only passes the change on if
+its own outcome changed: a corrected group score that leaves the top two of
+the group as they were stops at the standings, a corrected semifinal score
+with the same winner leaves the final alone.
+
+A playoff match whose players change is rebuilt (a new ScheduledMatch in the
+same slot, so schedule caches see a new match). A final removed because a
+semifinal was re-seeded comes back in the slot it had. If it already had a result,
+that result is dropped and flagged as stale (with the correction that
+invalidated it) until the match is played again.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from tennis_tournament import ScheduledMatch, Tournament
+from tournament_state import iter_matches
+
+# Semifinal seeding: (group index, place) of player 1 and player 2
+SEMIFINAL_SEEDING = (
+    ((0, 0), (1, 1)),  # SF1: winner of group A vs runner-up of group B
+    ((1, 0), (0, 1)),  # SF2: winner of group B vs runner-up of group A
+)
+
+# Default slot (time, court, stage) of playoff matches created from the semifinals
+FINAL_SLOT = ("20:00", 1, "Final")
+THIRD_PLACE_SLOT = ("19:00", 1, "3rd Place Match")
+
+
+def _loser(match: ScheduledMatch):
+    return match.player2 if match.winner is match.player1 else match.player1
+
+
+def _names(match: Optional[ScheduledMatch]) -> Optional[Tuple[str, str]]:
+    return (match.player1.name, match.player2.name) if match is not None else None
+
+
+class ResultGraph:
+    """Dependency graph of a tournament's results
+
+    Args:
+        tournament: Tournament with two groups (the only format with playoffs)
+    """
+
+    def __init__(self, tournament: Tournament):
+        self.tournament = tournament
+        # match id -> stale result flag
+        self.stale: Dict[str, Dict] = {}
+        # match id -> (time, court, stage) of a removed playoff match, reused when it is rebuilt
+        self._slots: Dict[str, Tuple[str, int, str]] = {
+            'F': FINAL_SLOT,
+            '3P': THIRD_PLACE_SLOT,
+        }
+
+        self._dependents: Dict[str, List[str]] = {}
+        order = []
+        for match_id, _, match_type, key in iter_matches(tournament):
+            if match_type == 'group':
+                self._dependents[match_id] = [f"standings:{key}"]
+                order.append(match_id)
+        for group in tournament.groups:
+            order.append(f"standings:{group.name}")
+            self._dependents[f"standings:{group.name}"] = []
+        for i, seeding in enumerate(SEMIFINAL_SEEDING, 1):
+            for group_index, _ in seeding:
+                group = tournament.groups[group_index].name
+                self._dependents[f"standings:{group}"].append(f"SF{i}")
+            self._dependents[f"SF{i}"] = ['F', '3P']
+            order.append(f"SF{i}")
+        order += ['F', '3P']
+        self._order = {node: i for i, node in enumerate(order)}
+
+    def _matches(self) -> Dict[str, ScheduledMatch]:
+        return {match_id: match for match_id, match, _, _ in iter_matches(self.tournament)}
+
+    def record(self, match_id: str, p1_sets: int, p2_sets: int) -> Tuple[List[str], List[Dict]]:
+        """
+        Records (or corrects) a result and propagates it downstream
+
+        Returns:
+            (ids of changed matches, stale flags raised by this change)
+
+        Raises:
+            KeyError: Unknown match id
+        """
+        match = self._matches()[match_id]
+        match.play(p1_sets, p2_sets)
+        self.stale.pop(match_id, None)
+        return self.propagate(match_id)
+
+    def propagate(self, source: str) -> Tuple[List[str], List[Dict]]:
+        """Re-evaluates the dependents of a changed node in topological order"""
+        changed = [source]
+        invalidated = []
+        dirty = set(self._dependents.get(source, ()))
+        while dirty:
+            node = min(dirty, key=self._order.__getitem__)
+            dirty.remove(node)
+            if self._evaluate(node, source, changed, invalidated):
+                dirty.update(self._dependents.get(node, ()))
+        return changed, invalidated
+
+    def _evaluate(self, node: str, source: str, changed: List[str], invalidated: List[Dict]) -> bool:
+        """Brings a node up to date; returns True if its outcome changed"""
+        tournament = self.tournament
+        if node.startswith('standings:'):
+            # Standings are derived from player stats on demand; the
+            # semifinals decide whether the seeding actually changed
+            return True
+
+        if node.startswith('SF'):
+            if not tournament.scheduled_semifinals:
+                return False
+            index = int(node[2:]) - 1
+            standings = [group.get_standings() for group in tournament.groups]
+            (g1, place1), (g2, place2) = SEMIFINAL_SEEDING[index]
+            players = (standings[g1][place1], standings[g2][place2])
+            current = tournament.scheduled_semifinals[index]
+            if _names(current) == (players[0].name, players[1].name):
+                return False
+            self._invalidate(node, current, source, invalidated)
+            rebuilt = ScheduledMatch(players[0], players[1], current.time, current.court,
+                                     current.round_num, current.stage)
+            tournament.scheduled_semifinals[index] = rebuilt
+            tournament.semifinals = list(tournament.scheduled_semifinals)
+            changed.append(node)
+            return True
+
+        # Final and third place: decided once both semifinals are played
+        semifinals = tournament.scheduled_semifinals
+        players = None
+        if semifinals and all(m.winner is not None for m in semifinals):
+            pick = (lambda m: m.winner) if node == 'F' else _loser
+            players = (pick(semifinals[0]), pick(semifinals[1]))
+
+        current = tournament.scheduled_final if node == 'F' else tournament.scheduled_third_place
+        if _names(current) == (players and (players[0].name, players[1].name)):
+            return False
+        self._invalidate(node, current, source, invalidated)
+        if current is not None:
+            # Keep the slot (possibly moved by the schedule editor or the dispatcher)
+            self._slots[node] = (current.time, current.court, current.stage)
+        rebuilt = None
+        if players is not None:
+            time, court, stage = self._slots[node]
+            rebuilt = ScheduledMatch(players[0], players[1], time, court, 0, stage)
+        if node == 'F':
+            tournament.scheduled_final = tournament.final = rebuilt
+        else:
+            tournament.scheduled_third_place = tournament.third_place_match = rebuilt
+        changed.append(node)
+        return True
+
+    def _invalidate(self, match_id: str, match: Optional[ScheduledMatch], source: str,
+                    invalidated: List[Dict]):
+        """Flags the result of a match that no longer stands"""
+        if match is None or match.score is None:
+            return
+        flag = {
+            'match_id': match_id,
+            'player1': match.player1.name,
+            'player2': match.player2.name,
+            'score': f"{match.score[0]}-{match.score[1]}",
+            'invalidated_by': source,
+        }
+        self.stale[match_id] = flag
+        invalidated.append(flag)
@@ -0,0 +1,216 @@
+"""
+Schedule editing with conflict detection
+
+Every scheduled match occupies [start, start + match length) on its court and
+for both of its players. Intervals are kept per court and per player in sorted
+lists, so checking an edit is a bisect plus a look at the two neighbours,
+O(log n) per index. A batch of moves (a move, a swap) is validated and applied
+atomically: the moved matches are taken out of the indexes, the new intervals
+are inserted one by one, and on the first conflict everything is rolled back.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from court_dispatcher import parse_time
+from tennis_tournament import ScheduledMatch, Tournament, minutes_to_time, time_to_minutes
+from tournament_state import iter_matches
+
+# Length of a match slot (the Next Gen format is scheduled in 1-hour slots)
+MATCH_MINUTES = 60
+
+# Minimum rest between two matches of a player: one free slot. Only moved
+# matches are checked, so the generated day (where a semifinal loser plays for
+# 3rd place right after) stays valid as it is; pass min_rest=0 to allow
+# back-to-back matches.
+MIN_REST_MINUTES = MATCH_MINUTES
+
+
+class ScheduleConflict(ValueError):
+    """An edit would double-book a court or a player, or break the rest rule"""
+
+    def __init__(self, message: str, match_id: str, conflicting_id: str):
+        super().__init__(message)
+        self.match_id = match_id
+        self.conflicting_id = conflicting_id
+
+
+class IntervalIndex:
+    """Sorted (start, end, match id) intervals per key (a court or a player)"""
+
+    def __init__(self):
+        self._intervals: Dict[object, List[Tuple[int, int, str]]] = {}
+
+    def add(self, key, interval: Tuple[int, int, str]):
+        insort(self._intervals.setdefault(key, []), interval)
+
+    def remove(self, key, interval: Tuple[int, int, str]):
+        intervals = self._intervals[key]
+        del intervals[bisect_left(intervals, interval)]
+
+    def conflict(self, key, start: int, end: int, gap: int = 0) -> Optional[str]:
+        """Returns the id of a match within `gap` minutes of [start, end), if any
+
+        Intervals have equal lengths, so ordered by start they are ordered by
+        end too and only the two neighbours of the new interval can conflict.
+        """
+        intervals = self._intervals.get(key)
+        if not intervals:
+            return None
+        i = bisect_left(intervals, (start,))
+        if i > 0 and intervals[i - 1][1] + gap > start:
+            return intervals[i - 1][2]
+        if i < len(intervals) and intervals[i][0] < end + gap:
+            return intervals[i][2]
+        return None
+
+
+class ScheduleEditor:
+    """Validated rescheduling of a tournament's matches
+
+    Args:
+        tournament: Tournament whose schedule is edited
+        match_minutes: Length of a match slot
+        min_rest: Minimum minutes between two matches of the same player
+            (0 allows back-to-back matches)
+    """
+
+    def __init__(self, tournament: Tournament, match_minutes: int = MATCH_MINUTES,
+                 min_rest: int = MIN_REST_MINUTES):
+        self.tournament = tournament
+        self.match_minutes = match_minutes
+        self.min_rest = min_rest
+        self.courts = IntervalIndex()
+        self.players = IntervalIndex()
+        self._matches: Dict[str, ScheduledMatch] = {}
+        # match id -> (start, court) as currently indexed
+        self._placed: Dict[str, Tuple[int, int]] = {}
+        # match id -> (time, court) as last seen on the match, for cheap syncs
+        self._seen: Dict[str, Tuple[str, int]] = {}
+        self.sync()
+
+    def sync(self):
+        """Re-indexes matches that were created or moved outside the editor
+        (playoffs set up, the court dispatcher updating start times)"""
+        seen = set()
+        for match_id, match, _, _ in iter_matches(self.tournament):
+            seen.add(match_id)
+            slot = (match.time, match.court)
+            if self._matches.get(match_id) is match and self._seen.get(match_id) == slot:
+                continue
+            if match_id in self._placed:
+                self._unindex(match_id)
+            self._matches[match_id] = match
+            self._index(match_id, time_to_minutes(match.time), match.court)
+
+        for match_id in list(self._placed):
+            if match_id not in seen:
+                self._unindex(match_id)
+                del self._matches[match_id]
+
+    def _index(self, match_id: str, start: int, court: int):
+        interval = (start, start + self.match_minutes, match_id)
+        match = self._matches[match_id]
+        self.courts.add(court, interval)
+        self.players.add(match.player1.name, interval)
+        self.players.add(match.player2.name, interval)
+        self._placed[match_id] = (start, court)
+        self._seen[match_id] = (minutes_to_time(start), court)
+
+    def _unindex(self, match_id: str):
+        start, court = self._placed.pop(match_id)
+        self._seen.pop(match_id, None)
+        interval = (start, start + self.match_minutes, match_id)
+        match = self._matches[match_id]
+        self.courts.remove(court, interval)
+        self.players.remove(match.player1.name, interval)
+        self.players.remove(match.player2.name, interval)
+
+    def get_match(self, match_id: str) -> ScheduledMatch:
+        """
+        Raises:
+            KeyError: Unknown match id
+        """
+        return self._matches[match_id]
+
+    def _check(self, match_id: str, start: int, court: int):
+        """Raises ScheduleConflict if the match can't take the slot"""
+        end = start + self.match_minutes
+        match = self._matches[match_id]
+
+        other = self.courts.conflict(court, start, end)
+        if other is not None:
+            raise ScheduleConflict(
+                f"Court {court} is already booked at {minutes_to_time(start)} (match {other})",
+                match_id, other
+            )
+        for player in (match.player1, match.player2):
+            other = self.players.conflict(player.name, start, end, self.min_rest)
+            if other is not None:
+                raise ScheduleConflict(
+                    f"{player.name} already plays match {other} around {minutes_to_time(start)}",
+                    match_id, other
+                )
+
+    def apply(self, moves: Iterable[Tuple[str, int, int]]) -> List[str]:
+        """
+        Validates and applies moves atomically
+
+        Args:
+            moves: (match id, new start in minutes, new court) for each moved match
+
+        Returns:
+            Ids of the moved matches
+
+        Raises:
+            KeyError: Unknown match id
+            ValueError: Invalid move (played match, bad time or court)
+            ScheduleConflict: The moves would create a conflict; nothing is changed
+        """
+        moves = list(moves)
+        for match_id, start, court in moves:
+            match = self._matches[match_id]
+            if match.score is not None:
+                raise ValueError(f"Match {match_id} is already played")
+            if not 0 <= start <= 24 * 60 - self.match_minutes:
+                raise ValueError(f"Invalid time: {minutes_to_time(start)}")
+            if court < 1:
+                raise ValueError(f"Invalid court: {court}")
+        if len({match_id for match_id, _, _ in moves}) != len(moves):
+            raise ValueError("A match can only be moved once per edit")
+
+        old = {match_id: self._placed[match_id] for match_id, _, _ in moves}
+        for match_id in old:
+            self._unindex(match_id)
+
+        placed = []
+        try:
+            for match_id, start, court in moves:
+                self._check(match_id, start, court)
+                self._index(match_id, start, court)
+                placed.append(match_id)
+        except ScheduleConflict:
+            for match_id in placed:
+                self._unindex(match_id)
+            for match_id, (start, court) in old.items():
+                self._index(match_id, start, court)
+            raise
+
+        for match_id, start, court in moves:
+            match = self._matches[match_id]
+            match.time = minutes_to_time(start)
+            match.court = court
+        return [match_id for match_id, _, _ in moves]
+
+    def move(self, match_id: str, time: Optional[str] = None, court: Optional[int] = None) -> List[str]:
+        """Moves a match to another time and/or court (see apply)"""
+        start, current_court = self._placed[match_id]
+        start = parse_time(time, start)
+        return self.apply([(match_id, start, current_court if court is None else court)])
+
+    def swap(self, first_id: str, second_id: str) -> List[str]:
+        """Swaps the slots (time and court) of two matches (see apply)"""
+        if first_id == second_id:
+            raise ValueError("Can't swap a match with itself")
+        first = self._placed[first_id]
+        second = self._placed[second_id]
+        return self.apply([(first_id, *second), (second_id, *first)])
@@ -0,0 +1,151 @@
+"""
+Flask JSON provider and response compression
+
+JSON goes through the fast encoder of fast_json.py. Responses above a size
+threshold are compressed with brotli (if installed) or gzip. Compressed
+bodies are cached under a key given by the app, e.g. (endpoint, query,
+revision): a payload that doesn't change between revisions is compressed
+once, not once per spectator, and a cache hit costs a dict lookup. Bodies
+without a key are compressed without caching.
+"""
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+import fast_json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_THRESHOLD = 1024
+
+# Content types worth compressing
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/javascript', 'text/html', 'text/css', 'text/plain'
+}
+
+# Number of compressed bodies kept in memory
+COMPRESSION_CACHE_SIZE = 256
+
+
+def dumps(obj: Any) -> bytes:
+    """Serializes to compact UTF-8 JSON (dates, UUIDs... as Flask does)"""
+    return fast_json.dumps(obj, default=DefaultJSONProvider.default)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using the fastest available encoder"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Explicit options (indent, sort_keys...) are only honoured by the stdlib
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return fast_json.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Picks the best supported content coding from an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+    offered = {
+        part.split(';')[0].strip().lower()
+        for part in accept_encoding.split(',')
+        if not part.strip().endswith(';q=0')
+    }
+    if brotli is not None and 'br' in offered:
+        return 'br'
+    if 'gzip' in offered:
+        return 'gzip'
+    return None
+
+
+class CompressionCache:
+    """LRU cache of compressed bodies keyed by (encoding, caller's key)"""
+
+    def __init__(self, size: int = COMPRESSION_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compress(self, body: bytes, encoding: str, key: Optional[Hashable] = None) -> bytes:
+        """Compresses a body; with a key, the result is cached under it
+
+        The key must identify the content (e.g. endpoint, query and revision).
+        """
+        if key is None:
+            return self._compress(body, encoding)
+
+        key = (encoding, key)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                return compressed
+
+        compressed = self._compress(body, encoding)
+        with self._lock:
+            self._entries[key] = compressed
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return compressed
+
+    @staticmethod
+    def _compress(body: bytes, encoding: str) -> bytes:
+        if encoding == 'br':
+            return brotli.compress(body, quality=5)
+        return gzip.compress(body, compresslevel=6)
+
+
+compression_cache = CompressionCache()
+
+
+def compress_response(response):
+    """after_request hook compressing large textual responses"""
+    response.vary.add('Accept-Encoding')
+
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < COMPRESSION_THRESHOLD:
+        return response
+
+    cache_key = current_app.extensions.get('compression_cache_key')
+    key = cache_key() if cache_key is not None else None
+    response.set_data(compression_cache.compress(body, encoding, key))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app, cache_key: Optional[Callable[[], Optional[Hashable]]] = None):
+    """Installs the fast JSON provider and response compression on a Flask app
+
+    Args:
+        cache_key: Called in a request, returns a key identifying the response
+            content for the compression cache, or None to compress uncached
+    """
+    app.extensions['compression_cache_key'] = cache_key
+    app.json = FastJSONProvider(app)
+    app.after_request(compress_response)
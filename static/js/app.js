@@ -1,6 +1,8 @@
 // Global state
 let currentMatch = null;
 let isAdmin = false;
+let currentRevision = null;
+let localState = null;  // Deduplicated tournament state kept in sync with the server
 
 // DOM Elements
 const newTournamentBtn = document.getElementById('newTournamentBtn');
@@ -19,10 +21,204 @@ const adminPassword = document.getElementById('adminPassword');
 // Initialize app
 document.addEventListener('DOMContentLoaded', () => {
     setupEventListeners();
-    checkAdminStatus();
+    if (!bootstrapFromEmbeddedState()) {
+        checkAdminStatus();
+    }
     initMobileFixes();
+    subscribeLiveUpdates();
+    registerServiceWorker();
+
+    // Catch up with missed changes after reconnecting or returning to the app
+    window.addEventListener('online', syncChanges);
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'visible') syncChanges();
+    });
 });
 
+// Service worker: offline support and instant paint from last-known data
+function registerServiceWorker() {
+    if (!('serviceWorker' in navigator)) return;
+
+    navigator.serviceWorker.register('/sw.js').catch(error => {
+        console.error('Service worker registration failed:', error);
+    });
+
+    // Cached data was shown first; re-render once the background refresh brings newer data
+    navigator.serviceWorker.addEventListener('message', (e) => {
+        if (!e.data || e.data.type !== 'api-updated') return;
+
+        const activeTab = document.querySelector('.tab-btn.active');
+        if (!activeTab) return;
+
+        const tabName = activeTab.dataset.tab;
+        if (e.data.path === '/api/tournament/info' && tabName === 'groups') {
+            loadTournamentInfo();
+        } else if (e.data.path === '/api/tournament/schedule' &&
+                   (tabName === 'schedule' || tabName === 'playoffs')) {
+            loadTabData(tabName);
+        }
+    });
+}
+
+// Fetch options bypassing the service worker's stale data (used right after updates)
+function fetchOptions(fresh) {
+    return fresh ? { cache: 'no-cache' } : {};
+}
+
+// Live updates (asyncio serving mode only; the Flask server answers 204 and the stream closes)
+function subscribeLiveUpdates() {
+    if (!window.EventSource) return;
+
+    const source = new EventSource('/api/live');
+
+    source.addEventListener('revision', (e) => {
+        const { revision } = JSON.parse(e.data);
+        if (currentRevision !== null && revision !== currentRevision) {
+            syncChanges();
+        }
+    });
+}
+
+// Paint from the state embedded into the page by the server (no API calls on load)
+function bootstrapFromEmbeddedState() {
+    const element = document.getElementById('initial-state');
+    if (!element) return false;
+
+    let state;
+    try {
+        state = JSON.parse(element.textContent);
+    } catch (error) {
+        console.error('Error reading embedded state:', error);
+        return false;
+    }
+
+    isAdmin = state.is_admin;
+    currentRevision = state.revision;
+    localState = state.tournament;
+    updateAdminUI();
+    renderLocalState(state.results);
+
+    return true;
+}
+
+// Render every tab from the local state
+function renderLocalState(results) {
+    if (localState) {
+        const data = expandTournamentState(localState);
+        scheduleRender('info', () => renderTournamentInfo(data));
+        scheduleRender('schedule', () => renderSchedule(data.schedule));
+        scheduleRender('playoffs', () => renderPlayoffs(data.schedule));
+    }
+
+    if (results) {
+        scheduleRender('results', () => renderResults(results));
+    }
+}
+
+// Fetch only what changed since the local revision and apply it
+async function syncChanges() {
+    if (currentRevision === null) {
+        // No local state to patch; reload the visible tab
+        const activeTab = document.querySelector('.tab-btn.active');
+        if (activeTab) loadTabData(activeTab.dataset.tab, true);
+        return;
+    }
+
+    try {
+        const response = await fetch(`/api/tournament/changes?since=${currentRevision}`, { cache: 'no-store' });
+
+        if (!response.ok) {
+            return;
+        }
+
+        applyChanges(await response.json());
+
+    } catch (error) {
+        console.error('Error syncing changes:', error);
+    }
+}
+
+// Apply a delta (or full snapshot) from /api/tournament/changes to the local state
+function applyChanges(delta) {
+    if (delta.full) {
+        localState = delta.state;
+    } else if (localState) {
+        if (delta.removed && delta.removed.length > 0) {
+            const removed = new Set(delta.removed);
+            localState.matches = localState.matches.filter(m => !removed.has(m.id));
+        }
+
+        const matchIndex = new Map(localState.matches.map((m, i) => [m.id, i]));
+        delta.matches.forEach(match => {
+            if (matchIndex.has(match.id)) {
+                localState.matches[matchIndex.get(match.id)] = match;
+            } else {
+                localState.matches.push(match);
+            }
+        });
+
+        delta.groups.forEach(group => {
+            const i = localState.groups.findIndex(g => g.name === group.name);
+            if (i >= 0) {
+                localState.groups[i] = group;
+            } else {
+                localState.groups.push(group);
+            }
+        });
+    } else {
+        return;
+    }
+
+    currentRevision = delta.revision;
+    renderLocalState(delta.results);
+}
+
+// Expand the deduplicated state (players referenced by id) into the API payload shapes
+function expandTournamentState(state) {
+    const players = new Map(state.players.map(p => [p.id, p]));
+
+    const schedule = state.matches.map(m => {
+        const match = {
+            id: m.id,
+            time: m.time,
+            court: m.court,
+            stage: m.stage,
+            player1: players.get(m.p1).name,
+            player2: players.get(m.p2).name,
+            score: m.score,
+            played: m.score !== null,
+            type: m.type
+        };
+        if (m.type === 'playoff') {
+            match.playoff_type = m.playoff_type;
+        }
+        return match;
+    });
+
+    const groups = state.groups.map(group => ({
+        name: group.name,
+        players: group.standings.map(row => {
+            const player = players.get(row.id);
+            return {
+                name: player.name,
+                seed: player.seed,
+                level: player.level,
+                wins: row.wins,
+                losses: row.losses,
+                games_won: row.games_won,
+                games_lost: row.games_lost,
+                game_difference: row.games_won - row.games_lost
+            };
+        })
+    }));
+
+    return {
+        groups,
+        group_matches: schedule.filter(m => m.type === 'group'),
+        schedule
+    };
+}
+
 // Mobile fixes for iOS Safari
 function initMobileFixes() {
     // Fix viewport height for iOS Safari
@@ -99,6 +295,9 @@ function setupEventListeners() {
     // Submit score
     addClickHandler(submitScoreBtn, submitScore);
 
+    // Re-window long standings tables while scrolling
+    window.addEventListener('scroll', () => scheduleRender('group-rows', renderVirtualRows), { passive: true });
+
     // Modal background click to close
     adminModal.addEventListener('click', (e) => {
         if (e.target === adminModal) adminModal.style.display = 'none';
@@ -217,13 +416,17 @@ function switchTab(tabName) {
     });
     document.getElementById(`${tabName}-tab`).classList.add('active');
 
-    // Reload data for specific tabs
+    loadTabData(tabName);
+}
+
+// Reload data for specific tabs
+function loadTabData(tabName, fresh = false) {
     if (tabName === 'groups') {
-        loadTournamentInfo();
+        loadTournamentInfo(fresh);
     } else if (tabName === 'schedule') {
-        loadSchedule();
+        loadSchedule(fresh);
     } else if (tabName === 'playoffs') {
-        loadPlayoffs();
+        loadPlayoffs(fresh);
     } else if (tabName === 'results') {
         loadResults();
     }
@@ -240,9 +443,7 @@ async function createNewTournament() {
 
         if (data.success) {
             showNotification('Tournament created successfully!', 'success');
-            loadTournamentInfo();
-            loadSchedule();
-            loadPlayoffs();
+            syncChanges();
             loadResults();
         }
     } catch (error) {
@@ -252,152 +453,427 @@ async function createNewTournament() {
 }
 
 // Load tournament info (groups and matches)
-async function loadTournamentInfo() {
+async function loadTournamentInfo(fresh = false) {
     try {
-        const response = await fetch('/api/tournament/info');
+        const response = await fetch('/api/tournament/info', fetchOptions(fresh));
 
         if (!response.ok) {
             return;
         }
 
         const data = await response.json();
+        scheduleRender('info', () => renderTournamentInfo(data));
 
-        // Render groups
-        renderGroups(data.groups);
+    } catch (error) {
+        console.error('Error loading tournament info:', error);
+    }
+}
 
-        // Render group matches
-        renderGroupMatches(data.group_matches);
+// ===== Rendering =====
+//
+// Updates are incremental: elements are keyed (match id, player name) and
+// only those whose data changed are touched. Long lists are virtualized and
+// all rendering is batched into one animation frame.
+
+// Standings tables with more rows than this render only the rows on screen
+const VIRTUAL_ROWS_THRESHOLD = 100;
+const ROW_OVERSCAN = 20;
+const ESTIMATED_ROW_HEIGHT = 44;
+
+// Schedule blocks within this distance of the viewport are kept rendered
+const VIRTUAL_MARGIN_PX = 800;
+const ESTIMATED_CARD_HEIGHT = 160;
+
+const pendingRenders = new Map();
+let renderFrame = null;
+
+// Queue a render for the next animation frame (later calls with the same key replace earlier ones)
+function scheduleRender(key, render) {
+    pendingRenders.set(key, render);
+    if (renderFrame === null) {
+        renderFrame = requestAnimationFrame(flushRenders);
+    }
+}
 
-        // Check if all group matches are played
-        const allPlayed = data.group_matches.every(match => match.played);
-        setupPlayoffsBtn.disabled = !allPlayed;
+function flushRenders() {
+    renderFrame = null;
+    const renders = [...pendingRenders.values()];
+    pendingRenders.clear();
+    renders.forEach(render => render());
+}
 
-    } catch (error) {
-        console.error('Error loading tournament info:', error);
+// Keyed reconciliation of a container's children: elements are reused by key,
+// updated only when their data signature changed, and moved only when out of order
+function reconcileChildren(container, items, options, start = container.firstElementChild) {
+    const existing = new Map();
+    for (let child = start; child; child = child.nextElementSibling) {
+        if (child.dataset.key !== undefined) existing.set(child.dataset.key, child);
+    }
+
+    let cursor = start;
+    items.forEach(item => {
+        const key = String(options.key(item));
+        const signature = options.signature(item);
+        let element = existing.get(key);
+
+        if (element) {
+            existing.delete(key);
+            if (element._signature !== signature) options.update(element, item);
+        } else {
+            element = options.create(item);
+            element.dataset.key = key;
+        }
+        element._signature = signature;
+
+        if (element === cursor) {
+            cursor = cursor.nextElementSibling;
+        } else {
+            container.insertBefore(element, cursor);
+        }
+    });
+
+    existing.forEach(element => {
+        if (options.remove) options.remove(element);
+        element.remove();
+    });
+}
+
+// Virtualized list of variable-height blocks. Blocks far from the viewport are
+// emptied and keep their last measured height, so a long schedule only costs
+// layout and memory for what is on screen.
+class VirtualBlocks {
+    constructor(container) {
+        this.container = container;
+        this.observer = 'IntersectionObserver' in window
+            ? new IntersectionObserver(entries => this.onIntersect(entries),
+                                       { rootMargin: `${VIRTUAL_MARGIN_PX}px 0px` })
+            : null;
+    }
+
+    // blocks: [{ key, signature, estimatedHeight, render(element) }]
+    update(blocks) {
+        reconcileChildren(this.container, blocks, {
+            key: block => block.key,
+            signature: block => block.signature,
+            create: block => {
+                const element = document.createElement('div');
+                element.className = 'virtual-block';
+                element._block = block;
+                element._rendered = null;
+                element.style.minHeight = `${block.estimatedHeight}px`;
+                if (this.observer) {
+                    this.observer.observe(element);
+                } else {
+                    element._visible = true;
+                    this.fill(element);
+                }
+                return element;
+            },
+            update: (element, block) => {
+                element._block = block;
+                if (element._visible) this.fill(element);
+            },
+            remove: element => {
+                if (this.observer) this.observer.unobserve(element);
+            }
+        });
+    }
+
+    fill(element) {
+        const block = element._block;
+        if (element._rendered === block.signature) return;
+        block.render(element);
+        element._rendered = block.signature;
+        element.style.minHeight = '';
+    }
+
+    onIntersect(entries) {
+        entries.forEach(entry => {
+            const element = entry.target;
+            element._visible = entry.isIntersecting;
+
+            if (entry.isIntersecting) {
+                this.fill(element);
+            } else if (element._rendered !== null && entry.boundingClientRect.height > 0) {
+                // Zero height means the tab is hidden: keep the content until it's measurable
+                element.style.minHeight = `${entry.boundingClientRect.height}px`;
+                element.replaceChildren();
+                element._rendered = null;
+            }
+        });
+    }
+}
+
+const virtualLists = new Map();
+
+function getVirtualList(containerId) {
+    if (!virtualLists.has(containerId)) {
+        const container = document.getElementById(containerId);
+        container.innerHTML = '';
+        virtualLists.set(containerId, new VirtualBlocks(container));
     }
+    return virtualLists.get(containerId);
+}
+
+// Key and change signature of a match card
+function matchKey(match) {
+    return match.id || `${match.stage}|${match.player1}|${match.player2}`;
+}
+
+function matchSignature(match) {
+    return `${match.time}|${match.court}|${match.stage}|${match.player1}|${match.player2}|${match.score}|${isAdmin}`;
+}
+
+// reconcileChildren options for match cards (type: 'group', 'playoff' or null for match.type)
+function matchCardOptions(type) {
+    const update = (card, match) => updateMatchCard(card, match, type || match.type);
+    return {
+        key: matchKey,
+        signature: matchSignature,
+        create: match => {
+            const card = document.createElement('div');
+            update(card, match);
+            return card;
+        },
+        update
+    };
+}
+
+const playoffCardOptions = {
+    key: item => item.title ? `title-${item.title}` : matchKey(item),
+    signature: item => item.title || matchSignature(item),
+    create: item => {
+        if (item.title) {
+            const title = document.createElement('h3');
+            title.className = 'section-title';
+            title.textContent = item.title;
+            return title;
+        }
+        const card = document.createElement('div');
+        updatePlayoffMatchCard(card, item);
+        return card;
+    },
+    update: (element, item) => {
+        if (!item.title) updatePlayoffMatchCard(element, item);
+    }
+};
+
+// Render groups and group matches
+function renderTournamentInfo(data) {
+    // Render groups
+    renderGroups(data.groups);
+
+    // Render group matches
+    renderGroupMatches(data.group_matches);
+
+    // Check if all group matches are played
+    const allPlayed = data.group_matches.every(match => match.played);
+    setupPlayoffsBtn.disabled = !allPlayed;
 }
 
 // Render groups tables
 function renderGroups(groups) {
-    groups.forEach((group, index) => {
+    groups.forEach(group => {
         const tbody = document.getElementById(`group-${group.name.toLowerCase()}-body`);
-        tbody.innerHTML = '';
-
-        group.players.forEach(player => {
-            const row = document.createElement('tr');
-            const matchesPlayed = player.wins + player.losses;
-            const points = player.wins; // 1 point per win (Next Gen ATP Finals rules)
-
-            row.innerHTML = `
-                <td>${player.name}</td>
-                <td>${player.level}</td>
-                <td>${matchesPlayed}</td>
-                <td>${player.wins}</td>
-                <td>${player.losses}</td>
-                <td>${player.games_won}-${player.games_lost}</td>
-                <td>${points}</td>
-            `;
-
-            tbody.appendChild(row);
-        });
+        if (!tbody) return;
+        tbody._players = group.players;
+        renderGroupRows(tbody);
     });
 }
 
-// Render group matches
-function renderGroupMatches(matches) {
-    const container = document.getElementById('group-matches');
-    container.innerHTML = '';
-
-    // Define rounds with time slots (5 rounds, 1 hour each)
-    const rounds = [
-        {
-            number: 1,
-            groups: [
-                { name: 'A', time: '08:00', stage: 'Група A' },
-                { name: 'B', time: '09:00', stage: 'Група B' }
-            ]
-        },
-        {
-            number: 2,
-            groups: [
-                { name: 'A', time: '10:00', stage: 'Група A' },
-                { name: 'B', time: '11:00', stage: 'Група B' }
-            ]
-        },
-        {
-            number: 3,
-            groups: [
-                { name: 'A', time: '12:00', stage: 'Група A' },
-                { name: 'B', time: '13:00', stage: 'Група B' }
-            ]
-        },
-        {
-            number: 4,
-            groups: [
-                { name: 'A', time: '14:00', stage: 'Група A' },
-                { name: 'B', time: '15:00', stage: 'Група B' }
-            ]
-        },
-        {
-            number: 5,
-            groups: [
-                { name: 'A', time: '16:00', stage: 'Група A' },
-                { name: 'B', time: '17:00', stage: 'Група B' }
-            ]
+const standingsRowOptions = {
+    key: player => player.name,
+    signature: player => `${player.level}|${player.wins}|${player.losses}|${player.games_won}|${player.games_lost}`,
+    create: player => {
+        const row = document.createElement('tr');
+        for (let i = 0; i < 7; i++) {
+            row.appendChild(document.createElement('td'));
         }
+        updateStandingsRow(row, player);
+        return row;
+    },
+    update: updateStandingsRow
+};
+
+function updateStandingsRow(row, player) {
+    const matchesPlayed = player.wins + player.losses;
+    const points = player.wins; // 1 point per win (Next Gen ATP Finals rules)
+    const values = [
+        player.name, player.level, matchesPlayed, player.wins, player.losses,
+        `${player.games_won}-${player.games_lost}`, points
     ];
+    values.forEach((value, i) => {
+        row.cells[i].textContent = value;
+    });
+}
+
+function createSpacerRow() {
+    const row = document.createElement('tr');
+    row.className = 'virtual-spacer';
+    row.setAttribute('aria-hidden', 'true');
+    const cell = document.createElement('td');
+    cell.colSpan = 7;
+    row.appendChild(cell);
+    return row;
+}
+
+function setSpacerHeight(row, height) {
+    row.style.display = height > 0 ? '' : 'none';
+    row.firstChild.style.height = `${height}px`;
+}
+
+// Render the standings rows of a table (only those on screen for long tables)
+function renderGroupRows(tbody) {
+    const players = tbody._players;
+    if (!tbody._topSpacer) {
+        tbody._topSpacer = createSpacerRow();
+        tbody._bottomSpacer = createSpacerRow();
+        tbody.replaceChildren(tbody._topSpacer, tbody._bottomSpacer);
+    }
+
+    let start = 0;
+    let end = players.length;
+    const rowHeight = tbody._rowHeight || ESTIMATED_ROW_HEIGHT;
+    if (players.length > VIRTUAL_ROWS_THRESHOLD) {
+        const offset = -tbody.getBoundingClientRect().top;
+        start = Math.min(players.length, Math.max(0, Math.floor(offset / rowHeight) - ROW_OVERSCAN));
+        end = Math.min(players.length, start + Math.ceil(window.innerHeight / rowHeight) + 2 * ROW_OVERSCAN);
+    }
+
+    setSpacerHeight(tbody._topSpacer, start * rowHeight);
+    setSpacerHeight(tbody._bottomSpacer, (players.length - end) * rowHeight);
+    reconcileChildren(tbody, players.slice(start, end), standingsRowOptions,
+                      tbody._topSpacer.nextElementSibling);
+
+    if (!tbody._rowHeight && end > start) {
+        tbody._rowHeight = tbody._topSpacer.nextElementSibling.offsetHeight || 0;
+    }
+}
+
+// Re-window long standings tables after scrolling
+function renderVirtualRows() {
+    document.querySelectorAll('.standings-table tbody').forEach(tbody => {
+        if (tbody._players && tbody._players.length > VIRTUAL_ROWS_THRESHOLD) {
+            renderGroupRows(tbody);
+        }
+    });
+}
+
+// Group name from a group stage label ("Група A" -> "A")
+function groupLabel(stage) {
+    return stage.split(' ').pop();
+}
+
+// Group stage matches as rounds: a group's n-th time slot belongs to round n
+function groupStageRounds(matches) {
+    const slots = new Map();
+    matches.forEach(match => {
+        const key = `${match.stage}|${match.time}`;
+        if (!slots.has(key)) {
+            slots.set(key, { key, stage: match.stage, time: match.time, group: groupLabel(match.stage), matches: [] });
+        }
+        slots.get(key).matches.push(match);
+    });
+
+    const slotsByStage = new Map();
+    slots.forEach(slot => {
+        if (!slotsByStage.has(slot.stage)) slotsByStage.set(slot.stage, []);
+        slotsByStage.get(slot.stage).push(slot);
+    });
+
+    const rounds = [];
+    slotsByStage.forEach(stageSlots => {
+        stageSlots.sort((a, b) => a.time.localeCompare(b.time));
+        stageSlots.forEach((slot, i) => {
+            if (!rounds[i]) rounds[i] = { number: i + 1, slots: [] };
+            rounds[i].slots.push(slot);
+        });
+    });
 
-    // Render each round
     rounds.forEach(round => {
-        // Create round header
-        const roundHeader = document.createElement('div');
-        roundHeader.className = 'round-header';
-        roundHeader.innerHTML = `<h3>Round ${round.number}</h3>`;
-        container.appendChild(roundHeader);
-
-        // Render each group in the round
-        round.groups.forEach(groupInfo => {
-            // Filter matches for this time slot and group
-            const groupMatches = matches.filter(match =>
-                match.time === groupInfo.time &&
-                match.stage === groupInfo.stage
-            );
-
-            if (groupMatches.length > 0) {
-                // Group subheader
-                const groupSubheader = document.createElement('div');
-                groupSubheader.className = 'group-subheader';
-                groupSubheader.innerHTML = `
-                    <span class="group-label">Group ${groupInfo.name}</span>
-                    <span class="time-label">⏰ ${groupInfo.time}</span>
-                `;
-                container.appendChild(groupSubheader);
-
-                // Matches grid for this group
-                const matchesGrid = document.createElement('div');
-                matchesGrid.className = 'matches-grid';
-
-                // Sort by court and render
-                groupMatches.sort((a, b) => a.court - b.court).forEach(match => {
-                    const card = createMatchCard(match, 'group');
-                    matchesGrid.appendChild(card);
-                });
-
-                container.appendChild(matchesGrid);
+        round.slots.sort((a, b) => a.time.localeCompare(b.time) || a.group.localeCompare(b.group));
+        round.slots.forEach(slot => slot.matches.sort((a, b) => a.court - b.court));
+    });
+    return rounds;
+}
+
+// Time slots of matches, in time order, matches by court
+function timeSlots(matches) {
+    const slots = new Map();
+    matches.forEach(match => {
+        if (!slots.has(match.time)) slots.set(match.time, []);
+        slots.get(match.time).push(match);
+    });
+    return [...slots.keys()].sort().map(time => ({
+        time,
+        matches: slots.get(time).sort((a, b) => a.court - b.court)
+    }));
+}
+
+function slotSignature(matches) {
+    return matches.map(matchSignature).join(';');
+}
+
+function estimatedHeight(matchCount) {
+    return 80 + matchCount * ESTIMATED_CARD_HEIGHT;
+}
+
+// Child element of a block created on first render (selector -> HTML of the element)
+function ensureChild(parent, selector, html) {
+    let element = parent.querySelector(`:scope > ${selector}`);
+    if (!element) {
+        parent.insertAdjacentHTML('beforeend', html);
+        element = parent.lastElementChild;
+    }
+    return element;
+}
+
+// Render group matches
+function renderGroupMatches(matches) {
+    const blocks = groupStageRounds(matches).map(round => {
+        const count = round.slots.reduce((sum, slot) => sum + slot.matches.length, 0);
+        return {
+            key: `round-${round.number}`,
+            signature: round.slots.map(slot => slotSignature(slot.matches)).join('/'),
+            estimatedHeight: estimatedHeight(count),
+            render: element => {
+                const header = ensureChild(element, '.round-header', '<div class="round-header"><h3></h3></div>');
+                header.firstChild.textContent = `Round ${round.number}`;
+
+                reconcileChildren(element, round.slots, {
+                    key: slot => slot.key,
+                    signature: slot => slotSignature(slot.matches),
+                    create: slot => {
+                        const slotDiv = document.createElement('div');
+                        slotDiv.innerHTML = `
+                            <div class="group-subheader">
+                                <span class="group-label">Group ${slot.group}</span>
+                                <span class="time-label">⏰ ${slot.time}</span>
+                            </div>
+                            <div class="matches-grid"></div>
+                        `;
+                        reconcileChildren(slotDiv.lastElementChild, slot.matches, matchCardOptions('group'));
+                        return slotDiv;
+                    },
+                    update: (slotDiv, slot) => {
+                        reconcileChildren(slotDiv.lastElementChild, slot.matches, matchCardOptions('group'));
+                    }
+                }, header.nextElementSibling);
             }
-        });
+        };
     });
+
+    getVirtualList('group-matches').update(blocks);
 }
 
-// Create match card
-function createMatchCard(match, type) {
-    const card = document.createElement('div');
+// Create or update a match card
+function updateMatchCard(card, match, type) {
     card.className = `match-card ${match.played ? 'played' : ''} ${isAdmin ? 'admin-mode' : ''}`;
+    card._match = match;
+    card._type = type;
 
     // Allow admins to edit only
-    if (isAdmin) {
-        addClickHandler(card, () => openMatchModal(match, type));
-    }
+    if (isAdmin) bindMatchCard(card);
 
     const statusBadge = match.played
         ? `<span class="match-status completed">✓ Played${isAdmin ? ' (click to edit)' : ''}</span>`
@@ -416,21 +892,34 @@ function createMatchCard(match, type) {
         ${scoreDisplay}
         ${statusBadge}
     `;
+}
+
+// Open the result modal from a card (handlers read the card's current match)
+function bindMatchCard(card) {
+    if (card._bound) return;
+    card._bound = true;
 
-    return card;
+    addClickHandler(card, () => {
+        if (!isAdmin) return;
+        if (card._playoffCard) {
+            openPlayoffMatchModal(card._match);
+        } else {
+            openMatchModal(card._match, card._type);
+        }
+    });
 }
 
 // Load schedule
-async function loadSchedule() {
+async function loadSchedule(fresh = false) {
     try {
-        const response = await fetch('/api/tournament/schedule');
+        const response = await fetch('/api/tournament/schedule', fetchOptions(fresh));
 
         if (!response.ok) {
             return;
         }
 
         const data = await response.json();
-        renderSchedule(data.schedule);
+        scheduleRender('schedule', () => renderSchedule(data.schedule));
 
     } catch (error) {
         console.error('Error loading schedule:', error);
@@ -439,213 +928,137 @@ async function loadSchedule() {
 
 // Render schedule
 function renderSchedule(schedule) {
-    const container = document.getElementById('full-schedule');
-    container.innerHTML = '';
-
     // Separate group stage and playoff matches
     const groupMatches = schedule.filter(m => m.type === 'group');
     const playoffMatches = schedule.filter(m => m.type === 'playoff');
+    const blocks = [];
+
+    const stageHeader = (key, title) => ({
+        key,
+        signature: title,
+        estimatedHeight: 80,
+        render: element => {
+            element.innerHTML = `<div class="stage-header"><h2>${title}</h2></div>`;
+        }
+    });
+
+    const slotBlock = (element, slot, title) => {
+        const slotDiv = ensureChild(element, '.schedule-time-slot', `
+            <div class="schedule-time-slot">
+                <div class="time-slot-header"></div>
+                <div class="schedule-matches"></div>
+            </div>
+        `);
+        slotDiv.firstElementChild.textContent = title;
+        reconcileChildren(slotDiv.lastElementChild, slot.matches, matchCardOptions(null));
+    };
 
-    // Render Group Stage
+    // Group stage, by rounds
     if (groupMatches.length > 0) {
-        const groupStageHeader = document.createElement('div');
-        groupStageHeader.className = 'stage-header';
-        groupStageHeader.innerHTML = '<h2>🎾 GROUP STAGE</h2>';
-        container.appendChild(groupStageHeader);
-
-        // Define rounds (5 rounds, 1 hour each)
-        const rounds = [
-            {
-                number: 1,
-                groups: [
-                    { name: 'A', time: '08:00', stage: 'Група A' },
-                    { name: 'B', time: '09:00', stage: 'Група B' }
-                ]
-            },
-            {
-                number: 2,
-                groups: [
-                    { name: 'A', time: '10:00', stage: 'Група A' },
-                    { name: 'B', time: '11:00', stage: 'Група B' }
-                ]
-            },
-            {
-                number: 3,
-                groups: [
-                    { name: 'A', time: '12:00', stage: 'Група A' },
-                    { name: 'B', time: '13:00', stage: 'Група B' }
-                ]
-            },
-            {
-                number: 4,
-                groups: [
-                    { name: 'A', time: '14:00', stage: 'Група A' },
-                    { name: 'B', time: '15:00', stage: 'Група B' }
-                ]
-            },
-            {
-                number: 5,
-                groups: [
-                    { name: 'A', time: '16:00', stage: 'Група A' },
-                    { name: 'B', time: '17:00', stage: 'Група B' }
-                ]
-            }
-        ];
-
-        // Render each round
-        rounds.forEach(round => {
-            const roundDiv = document.createElement('div');
-            roundDiv.className = 'schedule-round';
-
-            const roundHeader = document.createElement('div');
-            roundHeader.className = 'round-header-schedule';
-            roundHeader.innerHTML = `<h3>Round ${round.number}</h3>`;
-            roundDiv.appendChild(roundHeader);
-
-            // Render each group in the round
-            round.groups.forEach(groupInfo => {
-                const filteredMatches = schedule.filter(match =>
-                    match.time === groupInfo.time &&
-                    match.stage === groupInfo.stage
-                );
-
-                if (filteredMatches.length > 0) {
-                    const timeSlotDiv = document.createElement('div');
-                    timeSlotDiv.className = 'schedule-time-slot';
-
-                    const header = document.createElement('div');
-                    header.className = 'time-slot-header';
-                    header.innerHTML = `⏰ ${groupInfo.time} - Group ${groupInfo.name}`;
-                    timeSlotDiv.appendChild(header);
-
-                    const matchesDiv = document.createElement('div');
-                    matchesDiv.className = 'schedule-matches';
-
-                    filteredMatches.sort((a, b) => a.court - b.court).forEach(match => {
-                        const matchCard = createMatchCard(match, match.type);
-                        matchesDiv.appendChild(matchCard);
-                    });
-
-                    timeSlotDiv.appendChild(matchesDiv);
-                    roundDiv.appendChild(timeSlotDiv);
+        blocks.push(stageHeader('group-stage', '🎾 GROUP STAGE'));
+
+        groupStageRounds(groupMatches).forEach(round => {
+            const count = round.slots.reduce((sum, slot) => sum + slot.matches.length, 0);
+            blocks.push({
+                key: `round-${round.number}`,
+                signature: round.slots.map(slot => slotSignature(slot.matches)).join('/'),
+                estimatedHeight: estimatedHeight(count),
+                render: element => {
+                    const roundDiv = ensureChild(element, '.schedule-round', `
+                        <div class="schedule-round">
+                            <div class="round-header-schedule"><h3></h3></div>
+                        </div>
+                    `);
+                    const header = roundDiv.firstElementChild;
+                    header.firstChild.textContent = `Round ${round.number}`;
+
+                    reconcileChildren(roundDiv, round.slots, {
+                        key: slot => slot.key,
+                        signature: slot => slotSignature(slot.matches),
+                        create: slot => {
+                            const wrapper = document.createElement('div');
+                            slotBlock(wrapper, slot, `⏰ ${slot.time} - Group ${slot.group}`);
+                            return wrapper;
+                        },
+                        update: (wrapper, slot) => slotBlock(wrapper, slot, `⏰ ${slot.time} - Group ${slot.group}`)
+                    }, header.nextElementSibling);
                 }
             });
-
-            container.appendChild(roundDiv);
         });
     }
 
-    // Render Playoffs
+    // Playoffs, by time slots
     if (playoffMatches.length > 0) {
-        const playoffHeader = document.createElement('div');
-        playoffHeader.className = 'stage-header';
-        playoffHeader.innerHTML = '<h2>🏆 PLAYOFFS</h2>';
-        container.appendChild(playoffHeader);
-
-        // Group playoff matches by time
-        const playoffTimes = {
-            '18:00': [],
-            '19:00': [],
-            '20:00': []
-        };
-
-        playoffMatches.forEach(match => {
-            if (playoffTimes[match.time]) {
-                playoffTimes[match.time].push(match);
-            }
-        });
-
-        Object.keys(playoffTimes).forEach(time => {
-            if (playoffTimes[time].length > 0) {
-                const slotDiv = document.createElement('div');
-                slotDiv.className = 'schedule-time-slot';
-
-                const header = document.createElement('div');
-                header.className = 'time-slot-header';
-                header.innerHTML = `⏰ ${time}`;
-                slotDiv.appendChild(header);
-
-                const matchesDiv = document.createElement('div');
-                matchesDiv.className = 'schedule-matches';
-
-                playoffTimes[time].sort((a, b) => a.court - b.court).forEach(match => {
-                    const matchCard = createMatchCard(match, match.type);
-                    matchesDiv.appendChild(matchCard);
-                });
-
-                slotDiv.appendChild(matchesDiv);
-                container.appendChild(slotDiv);
-            }
+        blocks.push(stageHeader('playoffs', '🏆 PLAYOFFS'));
+
+        timeSlots(playoffMatches).forEach(slot => {
+            blocks.push({
+                key: `playoff-${slot.time}`,
+                signature: slotSignature(slot.matches),
+                estimatedHeight: estimatedHeight(slot.matches.length),
+                render: element => slotBlock(element, slot, `⏰ ${slot.time}`)
+            });
         });
     }
+
+    getVirtualList('full-schedule').update(blocks);
 }
 
 // Load playoffs
-async function loadPlayoffs() {
+async function loadPlayoffs(fresh = false) {
     try {
-        const response = await fetch('/api/tournament/schedule');
+        const response = await fetch('/api/tournament/schedule', fetchOptions(fresh));
 
         if (!response.ok) {
             return;
         }
 
         const data = await response.json();
-        const playoffMatches = data.schedule.filter(m => m.type === 'playoff');
-
-        if (playoffMatches.length > 0) {
-            renderPlayoffMatches(playoffMatches);
-            document.querySelector('.playoffs-info').style.display = 'none';
-        }
+        scheduleRender('playoffs', () => renderPlayoffs(data.schedule));
 
     } catch (error) {
         console.error('Error loading playoffs:', error);
     }
 }
 
+// Render playoffs from the schedule
+function renderPlayoffs(schedule) {
+    const playoffMatches = schedule.filter(m => m.type === 'playoff');
+
+    if (playoffMatches.length > 0) {
+        renderPlayoffMatches(playoffMatches);
+        document.querySelector('.playoffs-info').style.display = 'none';
+    }
+}
+
 // Render playoff matches
 function renderPlayoffMatches(matches) {
     const container = document.getElementById('playoffs-matches');
-    container.innerHTML = '';
 
     // Group by type
     const semifinals = matches.filter(m => m.playoff_type === 'semifinal');
     const finals = matches.filter(m => m.playoff_type === 'final');
     const thirdPlace = matches.filter(m => m.playoff_type === 'third_place');
 
+    const items = [];
     if (semifinals.length > 0) {
-        const title = document.createElement('h3');
-        title.className = 'section-title';
-        title.textContent = '🎾 Semifinals';
-        container.appendChild(title);
-
-        semifinals.forEach(match => {
-            const card = createPlayoffMatchCard(match);
-            container.appendChild(card);
-        });
+        items.push({ title: '🎾 Semifinals' }, ...semifinals);
     }
-
     if (finals.length > 0 || thirdPlace.length > 0) {
-        const title = document.createElement('h3');
-        title.className = 'section-title';
-        title.textContent = '🏆 Final Matches';
-        container.appendChild(title);
-
-        [...thirdPlace, ...finals].forEach(match => {
-            const card = createPlayoffMatchCard(match);
-            container.appendChild(card);
-        });
+        items.push({ title: '🏆 Final Matches' }, ...thirdPlace, ...finals);
     }
+
+    reconcileChildren(container, items, playoffCardOptions);
 }
 
-// Create playoff match card
-function createPlayoffMatchCard(match) {
-    const card = document.createElement('div');
+// Create or update a playoff match card
+function updatePlayoffMatchCard(card, match) {
     card.className = `match-card ${match.played ? 'played' : ''} ${isAdmin ? 'admin-mode' : ''}`;
+    card._match = match;
+    card._playoffCard = true;
 
     // Allow admins to edit only
-    if (isAdmin) {
-        addClickHandler(card, () => openPlayoffMatchModal(match));
-    }
+    if (isAdmin) bindMatchCard(card);
 
     const statusBadge = match.played
         ? `<span class="match-status completed">✓ Played${isAdmin ? ' (click to edit)' : ''}</span>`
@@ -667,8 +1080,6 @@ function createPlayoffMatchCard(match) {
         ${scoreDisplay}
         ${statusBadge}
     `;
-
-    return card;
 }
 
 // Setup playoffs
@@ -682,6 +1093,7 @@ async function setupPlayoffs() {
 
         if (data.success) {
             showNotification('Playoffs set up!', 'success');
+            await syncChanges();
             switchTab('playoffs');
         } else {
             showNotification(data.error || 'Error', 'error');
@@ -813,12 +1225,8 @@ async function submitScore() {
             showNotification(data.message, 'success');
             matchModal.style.display = 'none';
 
-            // Reload current tab
-            if (currentMatch.type === 'playoff') {
-                loadPlayoffs();
-            } else {
-                loadTournamentInfo();
-            }
+            // Pull the changes into the local state
+            syncChanges();
         } else {
             showNotification(data.error || 'Error', 'error');
         }
@@ -838,16 +1246,21 @@ async function loadResults() {
         }
 
         const data = await response.json();
-        renderResults(data);
+        scheduleRender('results', () => renderResults(data));
 
     } catch (error) {
         console.error('Error loading results:', error);
     }
 }
 
-// Render results
+// Render results (skipped when they didn't change)
+let renderedResults = null;
+
 function renderResults(results) {
     const container = document.getElementById('final-results');
+    const signature = JSON.stringify(results);
+    if (signature === renderedResults) return;
+    renderedResults = signature;
 
     container.innerHTML = `
         <div class="podium-place first">
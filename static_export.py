@@ -0,0 +1,234 @@
+"""
+Static site export of the public tournament view
+
+Renders groups, schedule, playoffs and results into plain HTML and JSON files
+that any static file server or CDN can serve, so read traffic doesn't reach
+the Python process. After each mutation only the affected pages are rendered
+again (found through the ChangeLog): a group result rewrites that group's page
+and the schedule, a playoff result the playoffs and overview pages. There is
+no full snapshot of the tournament, which would have to be rewritten on every
+change; the per-section files together cover it. Files are written atomically
+(temporary file + os.replace).
+
+Enabled by setting STATIC_EXPORT_DIR; the export then runs in a background
+thread of the serving process, woken by tournament change listeners.
+
+Layout of the output directory:
+    index.html, schedule.html, playoffs.html, groups/<name>.html
+    data/revision.json, data/info.json, data/schedule.json,
+    data/playoffs.json, data/groups/<name>.json
+    static/css/style.css
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from tournament_state import iter_matches
+
+logger = logging.getLogger(__name__)
+
+
+def write_atomic(path: str, data: bytes):
+    """Writes a file so readers only ever see the old or the new content"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def to_json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class StaticExporter:
+    """Renders the tournament into an output directory, incrementally
+
+    Args:
+        output_dir: Directory served by the static file server
+        source: The app module (tournament, revision, change log, payload builders)
+    """
+
+    def __init__(self, output_dir: str, source):
+        self.output_dir = output_dir
+        self.source = source
+        self.jinja_env = source.app.jinja_env
+        # Revision the files on disk correspond to (None: nothing exported yet)
+        self.revision: Optional[int] = None
+        self._group_files = set()
+
+    def render(self) -> Optional[Dict[str, bytes]]:
+        """
+        Renders the pages changed since the last export
+
+        Must be called under the tournament lock.
+
+        Returns:
+            Relative path -> content (None: file to delete), or None if nothing changed
+        """
+        source = self.source
+        revision = source.tournament_revision
+        if revision == self.revision:
+            return None
+
+        changes = None
+        if self.revision is not None:
+            changes = source.change_log.changes_since(self.revision)
+
+        tournament = source.get_tournament()
+        pages: Dict[str, bytes] = OrderedDict()
+        pages['data/revision.json'] = to_json({'revision': revision})
+
+        if tournament is None:
+            pages['index.html'] = self._render('export/index.html', root='', revision=revision,
+                                               group_names=[], results=None)
+            self.revision = revision
+            return pages
+
+        group_names = [group.name for group in tournament.groups]
+
+        if changes is None:
+            changed_groups = set(group_names)
+            schedule_changed = playoffs_changed = True
+        else:
+            changed_matches, changed_groups = changes
+            changed_groups = set(changed_groups)
+            schedule_changed = bool(changed_matches)
+            playoffs_changed = False
+            for match_id, _, match_type, key in iter_matches(tournament):
+                if match_id not in changed_matches:
+                    continue
+                if match_type == 'group':
+                    changed_groups.add(key)
+                else:
+                    playoffs_changed = True
+
+        schedule = source.build_schedule(tournament)['schedule']
+        results = source.build_results(tournament)
+        context = {'revision': revision, 'group_names': group_names, 'results': results}
+
+        if changed_groups:
+            info = source.build_tournament_info(tournament)
+            pages['data/info.json'] = to_json(info)
+            standings = {group['name']: group for group in info['groups']}
+
+            # build_schedule lists matches in iter_matches order
+            group_matches = {name: [] for name in group_names}
+            for (_, _, match_type, key), match in zip(iter_matches(tournament), schedule):
+                if match_type == 'group':
+                    group_matches[key].append(match)
+
+            for name in sorted(changed_groups):
+                group = {'name': name, 'players': standings[name]['players']}
+                matches = group_matches[name]
+                pages[f'data/groups/{name}.json'] = to_json({**group, 'matches': matches})
+                pages[f'groups/{name}.html'] = self._render(
+                    'export/group.html', root='../', group=group, matches=matches, **context
+                )
+
+        if schedule_changed:
+            slots = OrderedDict()
+            for match in sorted(schedule, key=lambda m: (m['time'], m['court'])):
+                slots.setdefault(match['time'], []).append(match)
+            pages['data/schedule.json'] = to_json({'schedule': schedule})
+            pages['schedule.html'] = self._render(
+                'export/schedule.html', root='', slots=list(slots.items()), **context
+            )
+
+        if playoffs_changed:
+            playoffs = [m for m in schedule if m['type'] == 'playoff']
+            pages['data/playoffs.json'] = to_json({'matches': playoffs, 'results': results})
+            pages['playoffs.html'] = self._render(
+                'export/playoffs.html', root='', matches=playoffs, **context
+            )
+            pages['index.html'] = self._render('export/index.html', root='', **context)
+
+        if changes is None:
+            # A new tournament may have different groups: drop pages of old ones
+            group_files = {path for path in pages if path.startswith(('groups/', 'data/groups/'))}
+            for path in self._group_files - group_files:
+                pages[path] = None
+            self._group_files = group_files
+            # Left behind by exports that still wrote a full snapshot
+            pages['data/state.json'] = None
+
+        self.revision = revision
+        return pages
+
+    def _render(self, template: str, **context) -> bytes:
+        return self.jinja_env.get_template(template).render(**context).encode('utf-8')
+
+    def write(self, pages: Dict[str, bytes]):
+        """Writes rendered pages (outside the tournament lock)"""
+        for path, data in pages.items():
+            full_path = os.path.join(self.output_dir, path)
+            if data is not None:
+                write_atomic(full_path, data)
+                continue
+            try:
+                os.remove(full_path)
+            except OSError:
+                pass
+
+    def copy_assets(self):
+        """Copies the stylesheet used by the exported pages"""
+        static_folder = self.source.app.static_folder
+        target = os.path.join(self.output_dir, 'static', 'css')
+        os.makedirs(target, exist_ok=True)
+        shutil.copyfile(os.path.join(static_folder, 'css', 'style.css'),
+                        os.path.join(target, 'style.css'))
+
+    def export(self) -> bool:
+        """
+        Renders and writes everything that changed since the last export
+
+        Returns:
+            True if any files were written
+        """
+        with self.source.tournament_lock:
+            pages = self.render()
+        if pages is None:
+            return False
+        self.write(pages)
+        return True
+
+
+class ExportWorker(threading.Thread):
+    """Background thread re-exporting after each tournament change
+
+    Changes arriving while an export runs are coalesced into the next one.
+    """
+
+    def __init__(self, exporter: StaticExporter):
+        super().__init__(name='static-export', daemon=True)
+        self.exporter = exporter
+        self._wakeup = threading.Event()
+
+    def notify(self, revision: int):
+        """Change listener: schedules an export"""
+        self._wakeup.set()
+
+    def run(self):
+        try:
+            self.exporter.copy_assets()
+        except Exception:
+            logger.exception("Copying static assets to %s failed", self.exporter.output_dir)
+        while True:
+            try:
+                self.exporter.export()
+            except Exception:
+                logger.exception("Static export to %s failed", self.exporter.output_dir)
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+
+def start(source, output_dir: str) -> ExportWorker:
+    """Starts exporting the tournament to output_dir in a background thread"""
+    worker = ExportWorker(StaticExporter(output_dir, source))
+    source.add_change_listener(worker.notify)
+    worker.start()
+    return worker
@@ -0,0 +1,334 @@
+"""
+Swiss-system pairing for large open events
+
+Instead of a round-robin (n * (n - 1) / 2 matches), every round pairs players
+with equal or similar points, so a 300-player day needs only about
+log2(300) ~ 9 rounds of 150 matches.
+
+Pairing is a weighted matching over a cost per candidate pair:
+
+    points gap   - squared, so the score groups stay together
+    rematch      - prohibitive, only accepted if nothing else is possible
+    sides        - both players due the same side (player 1 / player 2)
+
+Players are ordered by standings and matched greedily against a window of the
+next unpaired players (falling back to the whole field when every candidate
+in the window is a rematch), then 2-opt swaps between nearby pairs lower the
+total cost until no swap helps. That is O(n * window) per round, well under
+a second for 500 players, where an exact blossom matching in pure Python
+would be cubic.
+
+With an odd number of players the lowest-ranked player without a bye sits
+out and scores a point. Buchholz (sum of the opponents' points) and
+Sonneborn-Berger (sum of the points of beaten opponents) are kept up to date
+incrementally: a result only touches the two players' opponents.
+
+Usage:
+    python swiss.py --players 300 --seed 1
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from tennis_tournament import Player, ScheduledMatch, minutes_to_time, time_to_minutes
+
+# Candidates considered for each player by the greedy pass
+PAIRING_WINDOW = 16
+
+# 2-opt looks at pairs this far apart in the pairing order
+SWAP_DISTANCE = 4
+
+# Cost weights
+POINTS_WEIGHT = 100
+REMATCH_COST = 1_000_000
+SIDE_WEIGHT = 1
+
+MATCH_MINUTES = 60
+
+
+def recommended_rounds(player_count: int) -> int:
+    """Rounds needed to separate a single unbeaten winner"""
+    return max(1, math.ceil(math.log2(max(player_count, 2))))
+
+
+class SwissTournament:
+    """Swiss-system event: pairings, court slots, results and tiebreaks
+
+    Args:
+        players: Entrants (ordered by seed for the first round)
+        courts: Courts available; a round is played in waves of this many matches
+        start: Start time of the first round ("HH:MM")
+        match_minutes: Length of a match slot
+    """
+
+    def __init__(self, players: List[Player], courts: int = 4, start: str = "09:00",
+                 match_minutes: int = MATCH_MINUTES):
+        if len(players) < 2:
+            raise ValueError("A Swiss event needs at least 2 players")
+        self.players = list(players)
+        self.courts = courts
+        self.match_minutes = match_minutes
+        self._next_start = time_to_minutes(start)
+
+        self.rounds: List[List[ScheduledMatch]] = []
+        self.byes: List[Optional[Player]] = []
+        self._order = {player.name: i for i, player in enumerate(self.players)}
+
+        self.points: Dict[str, int] = {p.name: 0 for p in self.players}
+        self.buchholz: Dict[str, int] = {p.name: 0 for p in self.players}
+        self.sonneborn_berger: Dict[str, int] = {p.name: 0 for p in self.players}
+        self.opponents: Dict[str, List[str]] = {p.name: [] for p in self.players}
+        # player -> opponents the player lost to
+        self._lost_to: Dict[str, List[str]] = {p.name: [] for p in self.players}
+        # (times as player 1) - (times as player 2)
+        self.sides: Dict[str, int] = {p.name: 0 for p in self.players}
+        self._had_bye: Set[str] = set()
+
+    # ===== Pairing =====
+
+    def standings(self) -> List[Player]:
+        """Players by points, Buchholz, Sonneborn-Berger, set difference, seed order"""
+        return sorted(
+            self.players,
+            key=lambda p: (-self.points[p.name], -self.buchholz[p.name],
+                           -self.sonneborn_berger[p.name], -p.game_difference(),
+                           self._order[p.name])
+        )
+
+    def _cost(self, a: str, b: str) -> int:
+        cost = POINTS_WEIGHT * (self.points[a] - self.points[b]) ** 2
+        if b in self.opponents[a]:
+            cost += REMATCH_COST
+        side_a, side_b = self.sides[a], self.sides[b]
+        # Both due the same side: one of them gets it again
+        if side_a > 0 and side_b > 0:
+            cost += SIDE_WEIGHT * min(side_a, side_b)
+        elif side_a < 0 and side_b < 0:
+            cost += SIDE_WEIGHT * min(-side_a, -side_b)
+        return cost
+
+    def _greedy(self, names: List[str]) -> List[Tuple[str, str]]:
+        """Pairs each player with the cheapest of the next unpaired players"""
+        n = len(names)
+        # Unpaired positions as a doubly linked list: taking a partner out of
+        # the middle is O(1), where list.pop would shift the rest of the field
+        following = list(range(1, n + 1))
+        preceding = list(range(-1, n - 1))
+
+        def take(i: int):
+            if preceding[i] >= 0:
+                following[preceding[i]] = following[i]
+            if following[i] < n:
+                preceding[following[i]] = preceding[i]
+
+        pairs = []
+        head = 0
+        while head < n:
+            a = names[head]
+            take(head)
+            best_j, best_cost = None, None
+            j, seen = following[head], 0
+            while j < n and seen < PAIRING_WINDOW:
+                cost = self._cost(a, names[j])
+                if best_cost is None or cost < best_cost:
+                    best_j, best_cost = j, cost
+                j, seen = following[j], seen + 1
+            if best_cost is not None and best_cost >= REMATCH_COST:
+                # Everything in the window is a rematch: look further down
+                while j < n:
+                    cost = self._cost(a, names[j])
+                    if cost < best_cost:
+                        best_j, best_cost = j, cost
+                        if cost < REMATCH_COST:
+                            break
+                    j = following[j]
+            take(best_j)
+            pairs.append((a, names[best_j]))
+            head = following[head]
+            if head == best_j:
+                head = following[best_j]
+        return pairs
+
+    def _improve(self, pairs: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """2-opt: re-pairs two nearby pairs whenever that lowers the total cost"""
+        costs = [self._cost(a, b) for a, b in pairs]
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(pairs)):
+                for j in range(i + 1, min(i + 1 + SWAP_DISTANCE, len(pairs))):
+                    (a, b), (c, d) = pairs[i], pairs[j]
+                    current = costs[i] + costs[j]
+                    for first, second in (((a, c), (b, d)), ((a, d), (b, c))):
+                        first_cost = self._cost(*first)
+                        second_cost = self._cost(*second)
+                        if first_cost + second_cost < current:
+                            pairs[i], pairs[j] = first, second
+                            costs[i], costs[j] = first_cost, second_cost
+                            improved = True
+                            break
+        return pairs
+
+    def _assign_sides(self, a: str, b: str) -> Tuple[str, str]:
+        """(player 1, player 2): the player who was player 1 less often goes first"""
+        if self.sides[a] != self.sides[b]:
+            return (a, b) if self.sides[a] < self.sides[b] else (b, a)
+        return (a, b) if self._order[a] <= self._order[b] else (b, a)
+
+    def pair_round(self) -> List[ScheduledMatch]:
+        """
+        Pairs the next round and schedules it on the courts
+
+        Returns:
+            Scheduled matches of the round
+
+        Raises:
+            ValueError: The previous round has unplayed matches or the round
+                doesn't fit into the day
+        """
+        if self.rounds and any(m.score is None for m in self.rounds[-1]):
+            raise ValueError("The previous round is not finished")
+        waves = math.ceil(len(self.players) // 2 / self.courts)
+        if self._next_start + waves * self.match_minutes > 24 * 60:
+            raise ValueError(f"Round {len(self.rounds) + 1} doesn't fit into the day on {self.courts} courts")
+
+        ranked = [p.name for p in self.standings()]
+        bye = None
+        if len(ranked) % 2:
+            # Lowest-ranked player who hasn't had a bye yet
+            for name in reversed(ranked):
+                if name not in self._had_bye:
+                    bye = name
+                    break
+            else:
+                bye = ranked[-1]
+            ranked.remove(bye)
+            self._had_bye.add(bye)
+            self._add_points(bye, 1)
+
+        pairs = self._improve(self._greedy(ranked))
+        round_num = len(self.rounds) + 1
+        players = {p.name: p for p in self.players}
+        matches = []
+        for i, (a, b) in enumerate(pairs):
+            first, second = self._assign_sides(a, b)
+            self.sides[first] += 1
+            self.sides[second] -= 1
+            wave, court = divmod(i, self.courts)
+            matches.append(ScheduledMatch(
+                players[first], players[second],
+                minutes_to_time(self._next_start + wave * self.match_minutes),
+                court + 1, round_num, f"Swiss Round {round_num}"
+            ))
+
+        self._next_start += waves * self.match_minutes
+        self.rounds.append(matches)
+        self.byes.append(players[bye] if bye else None)
+        return matches
+
+    # ===== Results and tiebreaks =====
+
+    def _add_points(self, name: str, delta: int):
+        """Changes a player's points and the tiebreaks that depend on them"""
+        self.points[name] += delta
+        for opponent in self.opponents[name]:
+            self.buchholz[opponent] += delta
+        for opponent in self._lost_to[name]:
+            self.sonneborn_berger[opponent] += delta
+
+    def _link(self, winner: str, loser: str, sign: int):
+        """Adds (sign=1) or removes (sign=-1) a decided match between two players"""
+        if sign > 0:
+            self.opponents[winner].append(loser)
+            self.opponents[loser].append(winner)
+            self._lost_to[loser].append(winner)
+        else:
+            self.opponents[winner].remove(loser)
+            self.opponents[loser].remove(winner)
+            self._lost_to[loser].remove(winner)
+        self.buchholz[winner] += sign * self.points[loser]
+        self.buchholz[loser] += sign * self.points[winner]
+        self.sonneborn_berger[winner] += sign * self.points[loser]
+
+    def record(self, match: ScheduledMatch, p1_sets: int, p2_sets: int):
+        """
+        Records (or corrects) the result of a Swiss match
+
+        Only the two players and their opponents are updated.
+
+        Raises:
+            ValueError: Invalid score (valid: 2-0, 2-1, 0-2, 1-2)
+        """
+        if sorted((p1_sets, p2_sets)) not in ([0, 2], [1, 2]):
+            raise ValueError(f"Invalid score: {p1_sets}-{p2_sets}")
+        if match.winner is not None:
+            old_winner = match.winner.name
+            old_loser = match.player2.name if match.winner is match.player1 else match.player1.name
+            self._add_points(old_winner, -1)
+            self._link(old_winner, old_loser, -1)
+
+        match.play(p1_sets, p2_sets)
+
+        winner = match.winner.name
+        loser = match.player2.name if match.winner is match.player1 else match.player1.name
+        self._link(winner, loser, 1)
+        self._add_points(winner, 1)
+
+    def standings_table(self) -> List[Dict]:
+        return [
+            {
+                'rank': rank,
+                'name': player.name,
+                'points': self.points[player.name],
+                'buchholz': self.buchholz[player.name],
+                'sonneborn_berger': self.sonneborn_berger[player.name],
+            }
+            for rank, player in enumerate(self.standings(), 1)
+        ]
+
+
+def main(argv=None):
+    """Simulates a Swiss event from random player levels"""
+    from tournament_batch import LevelSimulator
+
+    parser = argparse.ArgumentParser(description="Simulate a Swiss-system event")
+    parser.add_argument('--players', type=int, default=300)
+    parser.add_argument('--rounds', type=int, help="Default: ceil(log2(players))")
+    parser.add_argument('--courts', type=int, help="Default: one wave of matches per round")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--top', type=int, default=10, help="Standings rows to print")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    players = [Player(f"Player {i + 1}", seed=i + 1, level=round(rng.uniform(2.0, 5.0) * 2) / 2)
+               for i in range(args.players)]
+    players.sort(key=lambda p: -p.level)
+    event = SwissTournament(players, courts=args.courts or len(players) // 2)
+    simulator = LevelSimulator(args.seed)
+
+    for _ in range(args.rounds or recommended_rounds(len(players))):
+        started = time.perf_counter()
+        try:
+            matches = event.pair_round()
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+        elapsed = (time.perf_counter() - started) * 1000
+        rematches = sum(m.player2.name in event.opponents[m.player1.name] for m in matches)
+        print(f"Round {len(event.rounds)}: {len(matches)} matches, {matches[0].time}-{matches[-1].time}, "
+              f"paired in {elapsed:.1f} ms, rematches: {rematches}")
+        for match in matches:
+            event.record(match, *simulator(match))
+
+    print()
+    for row in event.standings_table()[:args.top]:
+        print(f"{row['rank']:>3}. {row['name']:<12} {row['points']} pts  "
+              f"Bh {row['buchholz']}  SB {row['sonneborn_berger']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
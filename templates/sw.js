@@ -0,0 +1,109 @@
+// Service worker: precached static assets + stale-while-revalidate tournament data
+const CACHE_VERSION = '{{ version }}';
+const STATIC_CACHE = `static-${CACHE_VERSION}`;
+const PAGE_CACHE = 'pages';
+const API_CACHE = 'api';
+
+// Fingerprinted static files (their URLs change whenever their content does)
+const PRECACHE_URLS = {{ precache|tojson }};
+
+// API responses served from cache first and refreshed in the background
+const STALE_WHILE_REVALIDATE = ['/api/tournament/info', '/api/tournament/schedule'];
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(
+        caches.open(STATIC_CACHE)
+            .then(cache => cache.addAll(PRECACHE_URLS))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', (event) => {
+    // Drop static caches of previous versions
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys
+                    .filter(key => key.startsWith('static-') && key !== STATIC_CACHE)
+                    .map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (STALE_WHILE_REVALIDATE.includes(url.pathname)) {
+        // Explicitly fresh requests (e.g. right after an admin update) go to the network first
+        if (request.cache === 'no-cache' || request.cache === 'reload') {
+            event.respondWith(networkFirst(request, API_CACHE));
+        } else {
+            event.respondWith(staleWhileRevalidate(event, request));
+        }
+    } else if (request.mode === 'navigate') {
+        event.respondWith(networkFirst(request, PAGE_CACHE));
+    } else if (url.pathname.startsWith('/static/') && url.searchParams.has('v')) {
+        event.respondWith(cacheFirst(request));
+    }
+});
+
+async function cacheFirst(request) {
+    const cached = await caches.match(request);
+    if (cached) return cached;
+
+    const response = await fetch(request);
+    if (response.ok) {
+        const cache = await caches.open(STATIC_CACHE);
+        cache.put(request, response.clone());
+    }
+    return response;
+}
+
+async function networkFirst(request, cacheName) {
+    const cache = await caches.open(cacheName);
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            cache.put(request.url, response.clone());
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match(request.url);
+        if (cached) return cached;
+        throw error;
+    }
+}
+
+async function staleWhileRevalidate(event, request) {
+    const cache = await caches.open(API_CACHE);
+    const cached = await cache.match(request.url);
+
+    const refresh = fetch(request).then(async (response) => {
+        if (!response.ok) return response;
+
+        const body = await response.clone().text();
+        const previous = cached ? await cached.clone().text() : null;
+        await cache.put(request.url, response.clone());
+
+        // Tell open pages that newer data is available
+        if (previous !== null && previous !== body) {
+            const clients = await self.clients.matchAll();
+            clients.forEach(client => client.postMessage({
+                type: 'api-updated',
+                path: new URL(request.url).pathname
+            }));
+        }
+        return response;
+    });
+
+    if (cached) {
+        event.waitUntil(refresh.catch(() => {}));
+        return cached;
+    }
+    return refresh;
+}
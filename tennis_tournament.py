@@ -2,13 +2,30 @@
 Програма для проведення тенісного турніру в стилі Next Gen ATP Finals
 Кожен матч - два сети до 4 геймів, при 1-1 тайбрейк до 10
 """
+import argparse
 import random
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
+
+# Джерело результатів для неінтерактивного режиму: матч -> (сети гравця 1, сети гравця 2)
+ScoreProvider = Callable[['ScheduledMatch'], Tuple[int, int]]
+
+
+def time_to_minutes(time: str) -> int:
+    """Перетворює час у форматі "HH:MM" на кількість хвилин від півночі"""
+    hours, minutes = time.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def minutes_to_time(minutes: int) -> str:
+    """Перетворює кількість хвилин від півночі на рядок у форматі HH:MM"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
 
 
 class Player:
     """Клас для представлення гравця"""
 
+    __slots__ = ('name', 'seed', 'level', 'wins', 'losses', 'games_won', 'games_lost')
+
     def __init__(self, name: str, seed: int = 0, level: Optional[float] = None):
         self.name = name
         self.seed = seed  # Посів гравця (1-8)
@@ -51,6 +68,8 @@ class Player:
 class Match:
     """Клас для представлення матчу (один сет)"""
 
+    __slots__ = ('player1', 'player2', 'winner', 'score')
+
     def __init__(self, player1: Player, player2: Player):
         self.player1 = player1
         self.player2 = player2
@@ -97,6 +116,8 @@ class Match:
 class ScheduledMatch(Match):
     """Клас для матчу з розкладом"""
 
+    __slots__ = ('time', 'court', 'round_num', 'stage')
+
     def __init__(self, player1: Player, player2: Player, time: str, court: int, round_num: int = 0, stage: str = "Group Stage"):
         super().__init__(player1, player2)
         self.time = time
@@ -216,7 +237,13 @@ class Group:
 class Tournament:
     """Головний клас турніру"""
 
-    def __init__(self):
+    def __init__(self, score_provider: Optional[ScoreProvider] = None):
+        """
+        Args:
+            score_provider: Джерело результатів матчів. Якщо не задано,
+                рахунки вводяться з клавіатури
+        """
+        self.score_provider = score_provider
         self.players: List[Player] = []
         self.groups: List[Group] = []
         self.semifinals: List[Match] = []
@@ -446,21 +473,8 @@ class Tournament:
             # Введення результатів для кожного матчу в слоті
             for match in matches_in_slot:
                 print(f"\n🎾 Корт {match.court}: {match.player1.name} vs {match.player2.name}")
-
-                while True:
-                    try:
-                        score = input(f"Введіть рахунок по сетах (формат: X-Y, наприклад 2-0 або 2-1): ").strip()
-                        p1_sets, p2_sets = map(int, score.split('-'))
-
-                        if self._is_valid_tennis_score(p1_sets, p2_sets):
-                            match.play(p1_sets, p2_sets)
-                            print(f"✅ Результат: {match}")
-                            break
-                        else:
-                            print("Некоректний рахунок!")
-                            print("Валідні рахунки: 2-0, 2-1, 0-2, 1-2")
-                    except (ValueError, IndexError):
-                        print("Неправильний формат! Використовуйте формат X-Y")
+                self._play_match(match, "Введіть рахунок по сетах (формат: X-Y, наприклад 2-0 або 2-1): ")
+                print(f"✅ Результат: {match}")
 
             # Після кожного часового слоту показуємо оновлені таблиці
             print("\n" + "📊 ПОТОЧНІ ТАБЛИЦІ ГРУП 📊")
@@ -474,6 +488,32 @@ class Tournament:
         self.groups[0].display_standings()
         self.groups[1].display_standings()
 
+    def _play_match(self, match: ScheduledMatch,
+                    prompt: str = "Введіть рахунок по сетах (2-0, 2-1, 0-2, 1-2): "):
+        """Отримує рахунок матчу (від score_provider або з клавіатури) і записує його
+
+        Raises:
+            ValueError: Якщо score_provider повернув некоректний рахунок
+        """
+        if self.score_provider is not None:
+            p1_sets, p2_sets = self.score_provider(match)
+            if not self._is_valid_tennis_score(p1_sets, p2_sets):
+                raise ValueError(f"Некоректний рахунок {p1_sets}-{p2_sets} для матчу {match}")
+            match.play(p1_sets, p2_sets)
+            return
+
+        while True:
+            try:
+                score = input(prompt).strip()
+                p1_sets, p2_sets = map(int, score.split('-'))
+
+                if self._is_valid_tennis_score(p1_sets, p2_sets):
+                    match.play(p1_sets, p2_sets)
+                    return
+                print("Некоректний рахунок! Валідні: 2-0, 2-1, 0-2, 1-2")
+            except (ValueError, IndexError):
+                print("Неправильний формат! Використовуйте формат X-Y")
+
     def _is_valid_tennis_score(self, sets1: int, sets2: int) -> bool:
         """Перевіряє, чи є рахунок валідним для двосетового матчу (Next Gen формат)
 
@@ -537,24 +577,13 @@ class Tournament:
         for i, match in enumerate(self.scheduled_semifinals, 1):
             print(f"\n🎾 Корт {match.court} - Півфінал {i}: {match.player1.name} vs {match.player2.name}")
 
-            while True:
-                try:
-                    score = input(f"Введіть рахунок по сетах (2-0, 2-1, 0-2, 1-2): ").strip()
-                    p1_sets, p2_sets = map(int, score.split('-'))
-
-                    if self._is_valid_tennis_score(p1_sets, p2_sets):
-                        match.play(p1_sets, p2_sets)
-                        print(f"✅ Результат: {match}")
-                        print(f"🏆 Переможець: {match.winner.name}")
-
-                        winners.append(match.winner)
-                        loser = match.player2 if match.winner == match.player1 else match.player1
-                        losers.append(loser)
-                        break
-                    else:
-                        print("Некоректний рахунок! Валідні: 2-0, 2-1, 0-2, 1-2")
-                except (ValueError, IndexError):
-                    print("Неправильний формат! Використовуйте формат X-Y")
+            self._play_match(match)
+            print(f"✅ Результат: {match}")
+            print(f"🏆 Переможець: {match.winner.name}")
+
+            winners.append(match.winner)
+            loser = match.player2 if match.winner == match.player1 else match.player1
+            losers.append(loser)
 
         # МАТЧ ЗА 3 МІСЦЕ
         print("\n" + "="*70)
@@ -568,20 +597,9 @@ class Tournament:
         # Матч за 3 місце
         print(f"\n🥉 {self.scheduled_third_place.player1.name} vs {self.scheduled_third_place.player2.name}")
 
-        while True:
-            try:
-                score = input(f"Введіть рахунок по сетах (2-0, 2-1, 0-2, 1-2): ").strip()
-                p1_sets, p2_sets = map(int, score.split('-'))
-
-                if self._is_valid_tennis_score(p1_sets, p2_sets):
-                    self.scheduled_third_place.play(p1_sets, p2_sets)
-                    print(f"✅ Результат: {self.scheduled_third_place}")
-                    print(f"🥉 3 місце: {self.scheduled_third_place.winner.name}")
-                    break
-                else:
-                    print("Некоректний рахунок! Валідні: 2-0, 2-1, 0-2, 1-2")
-            except (ValueError, IndexError):
-                print("Неправильний формат! Використовуйте формат X-Y")
+        self._play_match(self.scheduled_third_place)
+        print(f"✅ Результат: {self.scheduled_third_place}")
+        print(f"🥉 3 місце: {self.scheduled_third_place.winner.name}")
 
         # ФІНАЛ
         print("\n" + "="*70)
@@ -593,19 +611,8 @@ class Tournament:
 
         print(f"\n🏆 ФІНАЛ: {self.scheduled_final.player1.name} vs {self.scheduled_final.player2.name}")
 
-        while True:
-            try:
-                score = input(f"Введіть рахунок по сетах (2-0, 2-1, 0-2, 1-2): ").strip()
-                p1_sets, p2_sets = map(int, score.split('-'))
-
-                if self._is_valid_tennis_score(p1_sets, p2_sets):
-                    self.scheduled_final.play(p1_sets, p2_sets)
-                    print(f"✅ Результат: {self.scheduled_final}")
-                    break
-                else:
-                    print("Некоректний рахунок! Валідні: 2-0, 2-1, 0-2, 1-2")
-            except (ValueError, IndexError):
-                print("Неправильний формат! Використовуйте формат X-Y")
+        self._play_match(self.scheduled_final)
+        print(f"✅ Результат: {self.scheduled_final}")
 
     def display_final_results(self):
         """Виводить підсумкові результати турніру"""
@@ -630,8 +637,9 @@ class Tournament:
         self.create_schedule_for_groups()
         self.display_full_schedule()
 
-        # Питаємо користувача чи готовий розпочати
-        input("\nНатисніть Enter, щоб розпочати турнір...")
+        # Питаємо користувача чи готовий розпочати (лише в інтерактивному режимі)
+        if self.score_provider is None:
+            input("\nНатисніть Enter, щоб розпочати турнір...")
 
         self.play_group_stage()
         self.setup_playoffs()
@@ -639,9 +647,26 @@ class Tournament:
         self.display_final_results()
 
 
-def main():
+def main(argv=None):
     """Головна функція програми"""
-    tournament = Tournament()
+    parser = argparse.ArgumentParser(description="Тенісний турнір Next Gen ATP Finals")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--results', metavar='FILE',
+                        help="Файл з рахунками матчів (по одному X-Y на рядок) замість введення з клавіатури")
+    source.add_argument('--simulate', action='store_true',
+                        help="Симулювати результати за рівнями гравців")
+    parser.add_argument('--seed', type=int, help="Seed генератора для --simulate")
+    args = parser.parse_args(argv)
+
+    score_provider = None
+    if args.results or args.simulate:
+        import tournament_batch
+        if args.results:
+            score_provider = tournament_batch.FileResults(args.results)
+        else:
+            score_provider = tournament_batch.LevelSimulator(args.seed)
+
+    tournament = Tournament(score_provider)
     tournament.run()
 
     print("\n" + "="*60)
@@ -0,0 +1,225 @@
+"""
+Headless tournament engine
+
+Runs the interactive Tournament from tennis_tournament.py without a keyboard:
+scores come from a file, any iterable, or are simulated from player levels,
+and console output is suppressed. run_many() plays thousands of simulated
+tournaments across a process pool and aggregates the outcomes.
+
+Usage:
+    python tournament_batch.py replay scores.txt
+    python tournament_batch.py simulate -n 10000 --workers 4 --seed 1
+"""
+import argparse
+import contextlib
+import math
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from tennis_tournament import ScheduledMatch, Tournament
+
+# Level assumed for players without one
+DEFAULT_LEVEL = 3.5
+
+# How strongly a level difference decides a set (logistic slope)
+LEVEL_STEEPNESS = 1.5
+
+# Tournaments simulated per worker task
+DEFAULT_CHUNK_SIZE = 200
+
+# Finishing positions tracked by run_many, in order
+PLACES = ('champion', 'runner_up', 'third', 'fourth')
+
+
+def parse_score(text: str) -> Tuple[int, int]:
+    """Parses "X-Y" into a pair of set counts
+
+    Raises:
+        ValueError: If the text is not a score
+    """
+    p1_sets, p2_sets = text.strip().split('-')
+    return int(p1_sets), int(p2_sets)
+
+
+class ScriptedResults:
+    """Score provider replaying scores in the order the engine asks for them
+
+    Items may be (p1_sets, p2_sets) tuples or "X-Y" strings.
+    """
+
+    def __init__(self, scores: Iterable[Union[str, Tuple[int, int]]]):
+        self._scores: Iterator = iter(scores)
+
+    def __call__(self, match: ScheduledMatch) -> Tuple[int, int]:
+        try:
+            score = next(self._scores)
+        except StopIteration:
+            raise ValueError(f"No score left for match {match}")
+        return parse_score(score) if isinstance(score, str) else tuple(score)
+
+
+class FileResults(ScriptedResults):
+    """Scores read from a text file, one per line
+
+    The score is the last token of a line, so lines may name the match
+    ("Masha vs Alex 2-1"); blank lines and lines starting with # are skipped.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+        super().__init__(
+            line.split()[-1] for line in lines if line and not line.startswith('#')
+        )
+
+
+class LevelSimulator:
+    """Score provider simulating matches from player levels
+
+    Each set is won with a logistic probability of the level difference; the
+    third set stands for the match tiebreak.
+    """
+
+    def __init__(self, seed=None, steepness: float = LEVEL_STEEPNESS):
+        self.rng = random.Random(seed)
+        self.steepness = steepness
+
+    def set_probability(self, match: ScheduledMatch) -> float:
+        """Probability that player 1 wins a set"""
+        level1 = match.player1.level if match.player1.level is not None else DEFAULT_LEVEL
+        level2 = match.player2.level if match.player2.level is not None else DEFAULT_LEVEL
+        return 1 / (1 + math.exp(-self.steepness * (level1 - level2)))
+
+    def __call__(self, match: ScheduledMatch) -> Tuple[int, int]:
+        p = self.set_probability(match)
+        p1_sets = p2_sets = 0
+        while p1_sets < 2 and p2_sets < 2:
+            if self.rng.random() < p:
+                p1_sets += 1
+            else:
+                p2_sets += 1
+        return p1_sets, p2_sets
+
+
+class _NullWriter:
+    """stdout replacement discarding everything"""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def run_tournament(score_provider, quiet: bool = True) -> Dict:
+    """
+    Plays a complete tournament with the given score provider
+
+    Returns:
+        Final placings and group standings (player names)
+    """
+    tournament = Tournament(score_provider)
+    output = _NullWriter() if quiet else sys.stdout
+    with contextlib.redirect_stdout(output):
+        tournament.run()
+
+    final = tournament.scheduled_final
+    third_place = tournament.scheduled_third_place
+    return {
+        'champion': final.winner.name,
+        'runner_up': (final.player2 if final.winner is final.player1 else final.player1).name,
+        'third': third_place.winner.name,
+        'fourth': (third_place.player2 if third_place.winner is third_place.player1
+                   else third_place.player1).name,
+        'groups': {
+            group.name: [p.name for p in group.get_standings()]
+            for group in tournament.groups
+        },
+    }
+
+
+def _simulate_chunk(start: int, count: int, seed) -> Dict[str, Counter]:
+    """Simulates tournaments start..start+count (worker entry point)"""
+    places = {place: Counter() for place in PLACES}
+    for i in range(start, start + count):
+        # Per-tournament seeds keep results independent of the chunking
+        provider = LevelSimulator(None if seed is None else f"{seed}:{i}")
+        result = run_tournament(provider)
+        for place in PLACES:
+            places[place][result[place]] += 1
+    return places
+
+
+def run_many(count: int, seed=None, workers: Optional[int] = None,
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Counter]:
+    """
+    Simulates many tournaments across a process pool
+
+    Args:
+        count: Number of tournaments
+        seed: Base seed; the same seed gives the same totals for any worker count
+        workers: Number of processes (CPU count by default; 1 runs in-process)
+        chunk_size: Tournaments per worker task
+
+    Returns:
+        For every place in PLACES, how many times each player finished there
+    """
+    totals = {place: Counter() for place in PLACES}
+    chunks = [(start, min(chunk_size, count - start), seed)
+              for start in range(0, count, chunk_size)]
+
+    if workers == 1:
+        results = (_simulate_chunk(*chunk) for chunk in chunks)
+        for places in results:
+            for place in PLACES:
+                totals[place].update(places[place])
+        return totals
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for places in executor.map(_simulate_chunk, *zip(*chunks)):
+            for place in PLACES:
+                totals[place].update(places[place])
+    return totals
+
+
+def main(argv=None):
+    """Command line interface for headless runs"""
+    parser = argparse.ArgumentParser(description="Headless tennis tournament runs")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    replay_parser = subparsers.add_parser('replay', help="Play a tournament from a score file")
+    replay_parser.add_argument('file')
+    replay_parser.add_argument('--verbose', action='store_true', help="Show the tournament output")
+
+    simulate_parser = subparsers.add_parser('simulate', help="Simulate tournaments from player levels")
+    simulate_parser.add_argument('-n', '--count', type=int, default=1000)
+    simulate_parser.add_argument('--seed', type=int)
+    simulate_parser.add_argument('--workers', type=int)
+    simulate_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'replay':
+        try:
+            result = run_tournament(FileResults(args.file), quiet=not args.verbose)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        for place in PLACES:
+            print(f"{place}: {result[place]}")
+        return 0
+
+    totals = run_many(args.count, args.seed, args.workers, args.chunk_size)
+    titles = totals['champion']
+    print(f"{'Player':<12} {'Titles':>8} {'Title %':>8} {'Final %':>8}")
+    for name, wins in titles.most_common():
+        finals = wins + totals['runner_up'][name]
+        print(f"{name:<12} {wins:>8} {wins / args.count:>8.1%} {finals / args.count:>8.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Compact, deduplicated snapshot of the tournament state
+
+Players are listed once and referenced by integer id (their index in
+Tournament.players); every match appears exactly once with a stable id.
+Used to embed the initial state into the main page and for delta sync of
+reconnecting clients.
+"""
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from tennis_tournament import Player, ScheduledMatch, Tournament
+
+
+def iter_matches(tournament: Tournament) -> Iterator[Tuple[str, ScheduledMatch, str, Optional[str]]]:
+    """Yields (match_id, match, type, group name or playoff type) in schedule order
+
+    Match ids are stable for the lifetime of a tournament: "A1".."A10" for
+    group matches, "SF1", "SF2", "F" and "3P" for the playoffs.
+    """
+    for group in tournament.groups:
+        for i, match in enumerate(group.scheduled_matches, 1):
+            yield f"{group.name}{i}", match, 'group', group.name
+
+    for i, match in enumerate(tournament.scheduled_semifinals, 1):
+        yield f"SF{i}", match, 'playoff', 'semifinal'
+    if tournament.scheduled_final:
+        yield "F", tournament.scheduled_final, 'playoff', 'final'
+    if tournament.scheduled_third_place:
+        yield "3P", tournament.scheduled_third_place, 'playoff', 'third_place'
+
+
+def player_ids(tournament: Tournament) -> Dict[str, int]:
+    """Maps player names to their ids"""
+    return {player.name: i for i, player in enumerate(tournament.players)}
+
+
+def serialize_player(player_id: int, player: Player) -> Dict:
+    return {
+        'id': player_id,
+        'name': player.name,
+        'seed': player.seed,
+        'level': player.level
+    }
+
+
+def serialize_standings_row(ids: Dict[str, int], player: Player) -> Dict:
+    return {
+        'id': ids[player.name],
+        'wins': player.wins,
+        'losses': player.losses,
+        'games_won': player.games_won,
+        'games_lost': player.games_lost
+    }
+
+
+def serialize_match(ids: Dict[str, int], match_id: str, match: ScheduledMatch,
+                    match_type: str, key: Optional[str]) -> Dict:
+    data = {
+        'id': match_id,
+        'type': match_type,
+        'time': match.time,
+        'court': match.court,
+        'stage': match.stage,
+        'p1': ids[match.player1.name],
+        'p2': ids[match.player2.name],
+        'score': match.score
+    }
+    if match_type == 'group':
+        data['group'] = key
+    else:
+        data['playoff_type'] = key
+    return data
+
+
+def serialize_groups(tournament: Tournament, ids: Dict[str, int], names=None):
+    """Serializes group standings (only the named groups, if given)"""
+    return [
+        {
+            'name': group.name,
+            'standings': [serialize_standings_row(ids, p) for p in group.get_standings()]
+        }
+        for group in tournament.groups
+        if names is None or group.name in names
+    ]
+
+
+def serialize_state(tournament: Tournament) -> Dict:
+    """Builds the full deduplicated state of a tournament"""
+    ids = player_ids(tournament)
+    return {
+        'players': [serialize_player(i, p) for i, p in enumerate(tournament.players)],
+        'groups': serialize_groups(tournament, ids),
+        'matches': [
+            serialize_match(ids, match_id, match, match_type, key)
+            for match_id, match, match_type, key in iter_matches(tournament)
+        ]
+    }
+
+
+def find_match_id(tournament: Tournament, target: ScheduledMatch) -> Optional[str]:
+    """Returns the id of a scheduled match"""
+    for match_id, match, _, _ in iter_matches(tournament):
+        if match is target:
+            return match_id
+    return None
+
+
+def get_match(tournament: Tournament, match_id: str) -> Optional[Tuple[ScheduledMatch, str, Optional[str]]]:
+    """Looks up (match, type, group name or playoff type) by id without a full scan"""
+    playoffs = {'F': (tournament.scheduled_final, 'final'),
+                '3P': (tournament.scheduled_third_place, 'third_place')}
+    if match_id in playoffs:
+        match, key = playoffs[match_id]
+        return (match, 'playoff', key) if match is not None else None
+    if match_id.startswith('SF') and match_id[2:].isdigit():
+        index = int(match_id[2:]) - 1
+        if 0 <= index < len(tournament.scheduled_semifinals):
+            return tournament.scheduled_semifinals[index], 'playoff', 'semifinal'
+        return None
+    for group in tournament.groups:
+        number = match_id[len(group.name):]
+        if match_id.startswith(group.name) and number.isdigit():
+            index = int(number) - 1
+            if 0 <= index < len(group.scheduled_matches):
+                return group.scheduled_matches[index], 'group', group.name
+    return None
+
+
+class PlayerMatchIndex:
+    """Player name -> the player's matches, kept in step with the ChangeLog
+
+    Answers "which matches does this player have" in O(matches of the
+    player). After a mutation only the changed match ids are re-indexed;
+    a full rebuild happens only when the change log can't say what changed.
+    """
+
+    def __init__(self, tournament: Tournament, revision: int):
+        self.tournament = tournament
+        self.revision = revision
+        # match id -> (match, type, group name or playoff type) as indexed
+        self._matches: Dict[str, Tuple[ScheduledMatch, str, Optional[str]]] = {}
+        # player name -> match ids (dict as an ordered set)
+        self._by_player: Dict[str, Dict[str, None]] = {}
+        # player name -> group
+        self.groups = {player.name: group for group in tournament.groups for player in group.players}
+        for match_id, match, match_type, key in iter_matches(tournament):
+            self._add(match_id, (match, match_type, key))
+
+    def _add(self, match_id: str, entry: Tuple[ScheduledMatch, str, Optional[str]]):
+        self._matches[match_id] = entry
+        match = entry[0]
+        for player in (match.player1, match.player2):
+            self._by_player.setdefault(player.name, {})[match_id] = None
+
+    def _remove(self, match_id: str):
+        match = self._matches.pop(match_id)[0]
+        for player in (match.player1, match.player2):
+            self._by_player[player.name].pop(match_id, None)
+
+    def update(self, match_ids):
+        """Re-indexes matches that were created, rebuilt or removed"""
+        for match_id in match_ids:
+            entry = get_match(self.tournament, match_id)
+            current = self._matches.get(match_id)
+            if current is not None and entry is not None and current[0] is entry[0]:
+                # Same match (a result or a new slot): players are unchanged
+                continue
+            if current is not None:
+                self._remove(match_id)
+            if entry is not None:
+                self._add(match_id, entry)
+
+    def sync(self, change_log: 'ChangeLog', revision: int) -> bool:
+        """
+        Catches up with the tournament revision
+
+        Returns:
+            False if the index is behind a reset and has to be rebuilt
+        """
+        if revision == self.revision:
+            return True
+        changes = change_log.changes_since(self.revision)
+        if changes is None:
+            return False
+        self.update(changes[0])
+        self.revision = revision
+        return True
+
+    def matches_of(self, name: str) -> List[Tuple[str, ScheduledMatch, str, Optional[str]]]:
+        """(match id, match, type, key) of a player's matches"""
+        return [(match_id, *self._matches[match_id]) for match_id in self._by_player.get(name, ())]
+
+
+class SectionCache:
+    """Payloads of parts of a tournament, kept until the ChangeLog says they changed
+
+    Keys are match ids (one match), "group:<name>" (a group's standings and
+    matches) and "playoffs". A result in group A drops "A3" and "group:A"
+    but leaves group B and the playoffs cached.
+    """
+
+    def __init__(self, tournament: Tournament, revision: int):
+        self.tournament = tournament
+        self.revision = revision
+        self._entries: Dict[str, object] = {}
+
+    def _section(self, match_id: str) -> str:
+        entry = get_match(self.tournament, match_id)
+        if entry is not None and entry[1] == 'group':
+            return f"group:{entry[2]}"
+        return 'playoffs'
+
+    def sync(self, change_log: 'ChangeLog', revision: int) -> bool:
+        """
+        Drops the entries changed since the cached revision
+
+        Returns:
+            False if the cache is behind a reset and has to be rebuilt
+        """
+        if revision == self.revision:
+            return True
+        changes = change_log.changes_since(self.revision)
+        if changes is None:
+            return False
+        matches, groups = changes
+        for match_id in matches:
+            self._entries.pop(match_id, None)
+            self._entries.pop(self._section(match_id), None)
+        for name in groups:
+            self._entries.pop(f"group:{name}", None)
+        self.revision = revision
+        return True
+
+    def get(self, key: str, build):
+        """Cached payload for a key, built on first use"""
+        if key not in self._entries:
+            self._entries[key] = build()
+        return self._entries[key]
+
+
+class ChangeLog:
+    """Bounded in-memory ring of what changed in each revision
+
+    Mutations first touch() the matches and groups they change, then commit()
+    files them under the new revision. Clients that are too far behind (or
+    behind a reset) get None from changes_since() and need a full snapshot.
+    """
+
+    def __init__(self, revision: int = 0, size: int = 256):
+        self._entries = deque(maxlen=size)
+        self._pending_matches = set()
+        self._pending_groups = set()
+        self._pending_reset = False
+        # Oldest revision a delta can start from
+        self._floor = revision
+
+    def touch(self, matches=(), groups=()):
+        """Marks matches (by id) and group standings (by name) as changed"""
+        self._pending_matches.update(matches)
+        self._pending_groups.update(groups)
+
+    def reset(self):
+        """Marks the whole state as replaced (e.g. a new tournament)"""
+        self._pending_reset = True
+
+    def commit(self, revision: int):
+        """Files pending changes under the given revision"""
+        if self._pending_reset:
+            self._entries.clear()
+            self._floor = revision
+        else:
+            self._entries.append((revision, frozenset(self._pending_matches),
+                                  frozenset(self._pending_groups)))
+        self._pending_matches = set()
+        self._pending_groups = set()
+        self._pending_reset = False
+
+    def changes_since(self, revision: int):
+        """Returns (match ids, group names) changed after a revision, or None if unknown"""
+        if revision < self._floor:
+            return None
+        if self._entries and self._entries[0][0] > revision + 1:
+            # The ring no longer covers every revision after the requested one
+            return None
+
+        matches, groups = set(), set()
+        for entry_revision, entry_matches, entry_groups in self._entries:
+            if entry_revision > revision:
+                matches |= entry_matches
+                groups |= entry_groups
+        return matches, groups